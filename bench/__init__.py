@@ -0,0 +1,7 @@
+"""Benchmarks de charge de storage.py.
+
+`python -m bench` génère une base synthétique, mesure les opérations principales
+(lecture, authentification, réservation, statistiques, suppressions en cascade)
+en mono-processus puis sous contention multi-processus, et écrit un rapport JSON
+(débit et latences p50/p95/p99) pour suivre les régressions.
+"""
@@ -0,0 +1,316 @@
+import argparse
+import builtins
+import contextlib
+import json
+import math
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import storage
+from bench.synthetic import PASSWORD, SyntheticConfig, generate
+from python.models import Utilisateur
+from python.stats import rebuild_stats
+
+
+# ----- Mesures -----
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Percentile `q` (0-100) par la méthode du rang le plus proche"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, math.ceil(q / 100 * len(sorted_values)) - 1)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(latencies: List[float], elapsed: float) -> Dict[str, Any]:
+    """Débit et latences (en ms) d'une série de mesures en secondes"""
+    values = sorted(latencies)
+    return {
+        'count': len(values),
+        'elapsed_s': round(elapsed, 4),
+        'throughput_per_s': round(len(values) / elapsed, 2) if elapsed > 0 else 0.0,
+        'mean_ms': round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+        'p50_ms': round(percentile(values, 50) * 1000, 3),
+        'p95_ms': round(percentile(values, 95) * 1000, 3),
+        'p99_ms': round(percentile(values, 99) * 1000, 3),
+        'max_ms': round(values[-1] * 1000, 3) if values else 0.0,
+    }
+
+
+def measure(fn: Callable[[], Any], iterations: int) -> Dict[str, Any]:
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def configure_storage(workdir: Path, backend: str) -> None:
+    """Fait pointer storage.py sur la base de benchmark (handle recréé)"""
+    storage.BACKEND = backend
+    storage.DB_PATH = workdir / 'db.json'
+    storage.SQLITE_PATH = workdir / 'db.sqlite3'
+    storage._database = None
+
+
+@contextlib.contextmanager
+def quiet_cli(answers: Iterable[str] = ()):
+    """Neutralise les entrées/sorties terminal des fonctions CLI (input, print, clear_screen).
+
+    `input` renvoie successivement les réponses de `answers`, puis des chaînes vides.
+    """
+    from python import visuals
+    saved_input, saved_clear = builtins.input, visuals.clear_screen
+    scripted = iter(answers)
+    builtins.input = lambda *args, **kwargs: next(scripted, '')
+    visuals.clear_screen = lambda: None
+    try:
+        with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+            yield
+    finally:
+        builtins.input, visuals.clear_screen = saved_input, saved_clear
+
+
+# ----- Opérations mesurées -----
+def booking_sequence(rng: random.Random, users: List[Utilisateur]) -> bool:
+    """Enchaînement de buy_ticket : film, horaire, resolve_showing (représentation, salle, plan) puis book_seats.
+
+    Retourne False si le plan est complet ou si les places ont été prises entre-temps.
+    """
+    film = rng.choice(storage.list_films())
+    horaire = rng.choice(film.horaires)
+    try:
+        showing = storage.resolve_showing(film.id, horaire)
+    except ValueError:
+        return False
+    representation = showing.representation
+    seat_map = showing.seating.seating_map
+    free = [f"{chr(65 + r)}{c + 1}" for r in range(seat_map.rows) for c in range(seat_map.cols)
+            if not seat_map.is_taken(r, c)]
+    if not free:
+        return False
+    seats = rng.sample(free, min(len(free), rng.randint(1, 3)))
+    try:
+        storage.book_seats(rng.choice(users).id, representation.id, seats)
+    except storage.SeatsUnavailableError:
+        return False
+    return True
+
+
+def measure_booking(rng: random.Random, users: List[Utilisateur], iterations: int) -> Dict[str, Any]:
+    outcomes = []
+    result = measure(lambda: outcomes.append(booking_sequence(rng, users)), iterations)
+    result['booked'] = sum(outcomes)
+    result['rejected'] = len(outcomes) - result['booked']
+    return result
+
+
+def measure_statistics(iterations: int) -> Dict[str, Any]:
+    try:
+        from python import admin_functions
+    except ImportError as e:
+        return {'skipped': f"dépendance manquante: {e.name}"}
+    with quiet_cli():
+        return measure(admin_functions.view_statistics, iterations)
+
+
+def measure_cascades(rng: random.Random, iterations: int) -> Dict[str, Any]:
+    """Cœur de remove_film / remove_representation (sans les invites) sur des éléments tirés au hasard"""
+    films = storage.list_films()
+    victims = rng.sample(films, min(iterations, len(films) // 2))
+    remove_film = measure(lambda: _remove_film(victims.pop()), len(victims))
+
+    representations = storage.list_representations()
+    victims_rep = rng.sample(representations, min(iterations, len(representations) // 2))
+    remove_representation = measure(lambda: storage.delete_representation(victims_rep.pop().id), len(victims_rep))
+    return {'remove_film': remove_film, 'remove_representation': remove_representation}
+
+
+def _remove_film(film) -> None:
+    storage.get_film_reservations(film.id)
+    storage.delete_film(film.id)
+
+
+def check_cli_purchase(users: List[Utilisateur]) -> Dict[str, Any]:
+    """Achat complet par buy_ticket (menu terminal) avec des réponses scriptées : film, horaire,
+    2 places, 'auto', proposition acceptée, confirmation. Vérifie que la réservation est enregistrée.
+    """
+    from python import user_functions
+    from python.seat_finder import SeatFinder
+    films = storage.list_films()
+    for film_index, film in enumerate(films, 1):
+        user = next((u for u in users if user_functions.verify_age_restriction(u, film)), None)
+        if user is None:
+            continue
+        for horaire_index, horaire in enumerate(film.horaires, 1):
+            try:
+                showing = storage.resolve_showing(film.id, horaire)
+            except ValueError:
+                continue
+            if SeatFinder(showing.seating.seating_map, showing.salle.nombre_rangees_vip).best_block(2) is None:
+                continue
+            before = len(storage.get_user_reservations(user.id))
+            answers = [str(film_index), str(horaire_index), '2', 'auto', '3', 'o', 'oui']
+            try:
+                with quiet_cli(answers):
+                    user_functions.buy_ticket(user)
+            except Exception as e:
+                return {'ok': False, 'error': repr(e)}
+            booked = len(storage.get_user_reservations(user.id)) - before
+            return {'ok': booked == 1, 'error': None if booked == 1 else f"{booked} réservation(s) enregistrée(s)"}
+    return {'ok': False, 'error': "aucune séance avec 2 places côte à côte"}
+
+
+# ----- Contention multi-processus -----
+def _contention_worker(workdir: str, backend: str, seed: int, operations: int,
+                       start: Any, results: Any) -> None:
+    latencies, booked, error = [], 0, None
+    try:
+        configure_storage(Path(workdir), backend)
+        rng = random.Random(seed)
+        users = storage.list_utilisateurs()
+        start.wait()
+        for _ in range(operations):
+            t0 = time.perf_counter()
+            booked += booking_sequence(rng, users)
+            latencies.append(time.perf_counter() - t0)
+    except Exception as e:
+        error = repr(e)
+    # Toujours répondre : le processus parent attend un résultat par worker
+    results.put({'latencies': latencies, 'booked': booked, 'error': error})
+
+
+def run_contention(workdir: Path, backend: str, processes: int, operations: int, seed: int) -> Dict[str, Any]:
+    """Lance `processes` processus qui réservent en même temps sur la même base"""
+    ctx = multiprocessing.get_context()
+    start = ctx.Event()
+    results = ctx.Queue()
+    workers = [
+        ctx.Process(target=_contention_worker,
+                    args=(str(workdir), backend, seed + i, operations, start, results))
+        for i in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    t0 = time.perf_counter()
+    start.set()
+    outputs = [results.get() for _ in workers]
+    elapsed = time.perf_counter() - t0
+    for worker in workers:
+        worker.join()
+
+    latencies = [latency for output in outputs for latency in output['latencies']]
+    result = summarize(latencies, elapsed)
+    result['processes'] = processes
+    result['booked'] = sum(output['booked'] for output in outputs)
+    result['rejected'] = len(latencies) - result['booked']
+    result['errors'] = [output['error'] for output in outputs if output['error']]
+    return result
+
+
+def check_consistency() -> Dict[str, Any]:
+    """Vérifie après la contention qu'aucune place n'a été vendue deux fois et que les compteurs de statistiques sont justes"""
+    seen = set()
+    duplicates = 0
+    for reservation in storage.list_reservations():
+        for place in reservation.places:
+            key = (reservation.representation_id, place)
+            duplicates += key in seen
+            seen.add(key)
+    return {'reserved_seats': len(seen), 'double_booked': duplicates,
+            'stats_mismatches': len(rebuild_stats(fix=False))}
+
+
+# ----- Point d'entrée -----
+def build_parser() -> argparse.ArgumentParser:
+    defaults = SyntheticConfig()
+    parser = argparse.ArgumentParser(prog='python -m bench', description="Benchmark de charge de storage.py")
+    parser.add_argument('--backend', choices=['json', 'sqlite'], default='json')
+    parser.add_argument('--films', type=int, default=defaults.films)
+    parser.add_argument('--rooms', type=int, default=defaults.rooms)
+    parser.add_argument('--representations-per-film', type=int, default=defaults.representations_per_film)
+    parser.add_argument('--users', type=int, default=defaults.users)
+    parser.add_argument('--reservations', type=int, default=defaults.reservations)
+    parser.add_argument('--iterations', type=int, default=200, help="Répétitions par opération")
+    parser.add_argument('--auth-iterations', type=int, default=20,
+                        help="Répétitions de authenticate_user (PBKDF2 volontairement lent)")
+    parser.add_argument('--processes', type=int, default=4, help="Processus concurrents pour la contention")
+    parser.add_argument('--operations', type=int, default=50, help="Réservations par processus")
+    parser.add_argument('--seed', type=int, default=defaults.seed)
+    parser.add_argument('--workdir', help="Dossier de la base synthétique (temporaire par défaut)")
+    parser.add_argument('--output', help="Fichier du rapport JSON (sortie standard par défaut)")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    config = SyntheticConfig(films=args.films, rooms=args.rooms,
+                             representations_per_film=args.representations_per_film,
+                             users=args.users, reservations=args.reservations, seed=args.seed)
+    workdir = Path(args.workdir) if args.workdir else Path(tempfile.mkdtemp(prefix='cynema-bench-'))
+    workdir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(args.seed)
+    try:
+        t0 = time.perf_counter()
+        dataset = generate(workdir / 'db.json', config)
+        if args.backend == 'sqlite':
+            storage.migrate_json_to_sqlite(workdir / 'db.json', workdir / 'db.sqlite3')
+        configure_storage(workdir, args.backend)
+        rebuild_stats()
+        storage.rebuild_availability()
+        setup_s = time.perf_counter() - t0
+
+        users = storage.list_utilisateurs()
+        tokens = [storage.start_session(user) for user in rng.sample(users, min(len(users), 100))]
+        single: Dict[str, Any] = {
+            'list_films': measure(storage.list_films, args.iterations),
+            'authenticate_user': measure(
+                lambda: storage.authenticate_user(rng.choice(dataset['emails']), PASSWORD), args.auth_iterations),
+            'resume_session': measure(
+                lambda: storage.resume_session(rng.choice(tokens)), args.iterations),
+            'get_user_reservations': measure(
+                lambda: storage.get_user_reservations(rng.choice(users).id), args.iterations),
+            'booking': measure_booking(rng, users, args.iterations),
+            'view_statistics': measure_statistics(max(1, args.iterations // 20)),
+        }
+        cli_purchase = check_cli_purchase(users)
+        contention = run_contention(workdir, args.backend, args.processes, args.operations, args.seed)
+        storage._database = None
+        contention.update(check_consistency())
+        single.update(measure_cascades(rng, max(1, args.iterations // 10)))
+
+        report = {
+            'meta': {
+                'date': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'backend': args.backend,
+                'journal': storage.JOURNAL_MODE,
+                'setup_s': round(setup_s, 3),
+            },
+            'dataset': dataset['counts'],
+            'single_process': single,
+            'cli_purchase': cli_purchase,
+            'contention': contention,
+        }
+    finally:
+        storage._database = None
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    payload = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(payload + '\n', encoding='utf-8')
+    else:
+        print(payload)
+    failed = contention['double_booked'] or contention['stats_mismatches'] or contention['errors']
+    return 1 if failed or not cli_purchase['ok'] else 0
@@ -0,0 +1,98 @@
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List
+
+from python.database import Database
+from python.models import Film, Salle_info, Utilisateur, Representation, Reservation, PlanSalle, SeatMap
+
+# Tous les utilisateurs synthétiques partagent ce mot de passe (un seul hash PBKDF2 calculé)
+PASSWORD = 'benchmark'
+CATEGORIES = ['Action', 'Comédie', 'Drame', 'Animation', 'Science-fiction', 'Horreur']
+
+
+@dataclass
+class SyntheticConfig:
+    films: int = 50
+    rooms: int = 10
+    representations_per_film: int = 4
+    users: int = 1000
+    reservations: int = 5000
+    rows: int = 10
+    cols: int = 15
+    vip_rows: int = 2
+    seed: int = 42
+
+
+def _horaire(minutes: int) -> str:
+    minutes %= 24 * 60
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def generate(path: Path, config: SyntheticConfig) -> Dict[str, Any]:
+    """Écrit une base synthétique dans `path` (snapshot db.json, sans journal).
+
+    Retourne un résumé : nombre d'enregistrements par collection et emails des utilisateurs.
+    """
+    rng = random.Random(config.seed)
+    template = Utilisateur(nom='', prenom='', date_naissance='')
+    template.set_password(PASSWORD)
+
+    films: List[Film] = []
+    for i in range(config.films):
+        horaires = [_horaire(10 * 60 + h * 150) for h in range(config.representations_per_film)]
+        films.append(Film(titre=f"Film {i}", duree=rng.randint(80, 180), categorie=rng.choice(CATEGORIES),
+                          age_min=rng.choice([0, 0, 12, 16, 18]), horaires=horaires))
+
+    salles = [Salle_info(numero=i + 1, nombre_rangees_total=config.rows, nombre_rangees_vip=config.vip_rows,
+                         nombre_colonnes=config.cols) for i in range(config.rooms)]
+
+    representations: List[Representation] = []
+    seating: Dict[str, PlanSalle] = {}
+    rep_salle: Dict[str, Salle_info] = {}
+    for film in films:
+        for h, horaire in enumerate(film.horaires):
+            rep = Representation(film_id=film.id, horaire=horaire, horaire_fin=_horaire(10 * 60 + h * 150 + film.duree))
+            salle = salles[len(representations) % len(salles)]
+            salle.id_representations.append(rep.id)
+            seating[rep.id] = PlanSalle(representation_id=rep.id, salle_id=salle.id,
+                                        seating_map=SeatMap(salle.nombre_rangees_total, salle.nombre_colonnes))
+            rep_salle[rep.id] = salle
+            representations.append(rep)
+
+    users = []
+    for i in range(config.users):
+        user = Utilisateur(nom=f"Nom{i}", prenom=f"Prenom{i}", date_naissance='1990-01-01',
+                           email=f"user{i}@bench.local", password_salt=template.password_salt,
+                           password_hash=template.password_hash, password_iterations=template.password_iterations)
+        users.append(user)
+
+    reservations: List[Reservation] = []
+    for _ in range(config.reservations if representations and users else 0):
+        rep = rng.choice(representations)
+        seat_map = seating[rep.id].seating_map
+        free = [(r, c) for r in range(seat_map.rows) for c in range(seat_map.cols) if not seat_map.is_taken(r, c)]
+        if not free:
+            continue
+        user = rng.choice(users)
+        places = []
+        for r, c in rng.sample(free, min(len(free), rng.randint(1, 4))):
+            seat_map.set_taken(r, c)
+            places.append(f"{chr(65 + r)}{c + 1}")
+        user.nombre_resa += 1
+        reservations.append(Reservation(utilisateur_id=user.id, salle_id=rep_salle[rep.id].id, film_id=rep.film_id,
+                                        representation_id=rep.id, horaire=rep.horaire, places=places))
+
+    data = {
+        'films': [f.to_dict() for f in films],
+        'salle_info': [s.to_dict() for s in salles],
+        'utilisateurs': [u.to_dict() for u in users],
+        'representations': [r.to_dict() for r in representations],
+        'reservations': [r.to_dict() for r in reservations],
+        'seat_maps': [s.to_dict() for s in seating.values()],
+    }
+    Database(Path(path), lambda: data, journal=False).save(data)
+    return {
+        'counts': {collection: len(records) for collection, records in data.items()},
+        'emails': [u.email for u in users],
+    }
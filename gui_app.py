@@ -1,8 +1,11 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog, font
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import storage
 from python.models import Film, Salle_info, Representation, Reservation, Utilisateur
+from python.intervals import interval
+from python.seat_finder import SeatFinder
 
 
 class ScrollableFrame(ttk.Frame):
@@ -23,7 +26,297 @@ class ScrollableFrame(ttk.Frame):
         scrollbar.pack(side="right", fill="y")
 
 
+class VirtualList(tk.Frame):
+    """Liste virtualisée : seules les lignes visibles sont dessinées sur un Canvas.
+
+    `columns` est une liste de (clé, titre, largeur en pixels) ; chaque ligne est un dict.
+    Un clic sur un en-tête appelle `on_sort(clé)` : le tri est fait par l'appelant,
+    qui redonne les lignes avec set_rows().
+    """
+    ROW_HEIGHT = 28
+    HEADER_HEIGHT = 32
+
+    def __init__(self, container, columns, on_sort=None, **kwargs):
+        super().__init__(container, bg='white', highlightthickness=1, highlightbackground='#e0e0e0', **kwargs)
+        self.columns = columns
+        self.on_sort = on_sort
+        self.rows = []
+        self.sort_key = None
+        self.sort_desc = False
+
+        self.header = tk.Canvas(self, height=self.HEADER_HEIGHT, bg='#fafafa', highlightthickness=0)
+        self.header.pack(fill='x')
+        self.header.bind('<Button-1>', self._on_header_click)
+
+        body = tk.Frame(self, bg='white')
+        body.pack(fill='both', expand=True)
+        self.canvas = tk.Canvas(body, bg='white', highlightthickness=0, yscrollincrement=self.ROW_HEIGHT)
+        self.scrollbar = ttk.Scrollbar(body, orient='vertical', command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_scroll)
+        self.scrollbar.pack(side='right', fill='y')
+        self.canvas.pack(side='left', fill='both', expand=True)
+
+        self.canvas.bind('<Configure>', lambda e: self._redraw())
+        for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            self.canvas.bind(sequence, self._on_wheel)
+        self._draw_header()
+
+    def set_rows(self, rows, sort_key=None, sort_desc=False):
+        """Remplace les lignes affichées et revient en haut de la liste"""
+        self.rows = rows
+        self.sort_key = sort_key
+        self.sort_desc = sort_desc
+        width = sum(w for _, _, w in self.columns)
+        self.canvas.configure(scrollregion=(0, 0, width, len(rows) * self.ROW_HEIGHT))
+        self.canvas.yview_moveto(0)
+        self._draw_header()
+        self._redraw()
+
+    def _draw_header(self):
+        self.header.delete('all')
+        x = 10
+        for key, title, width in self.columns:
+            if key == self.sort_key:
+                title += ' ▼' if self.sort_desc else ' ▲'
+            self.header.create_text(x, self.HEADER_HEIGHT // 2, anchor='w', text=title,
+                                    font=("Segoe UI", 10, 'bold'), fill='#333333')
+            x += width
+
+    def _redraw(self):
+        """Dessine uniquement les lignes comprises dans la zone visible"""
+        self.canvas.delete('row')
+        top = self.canvas.canvasy(0)
+        height = self.canvas.winfo_height()
+        first = max(0, int(top // self.ROW_HEIGHT))
+        last = min(len(self.rows), int((top + height) // self.ROW_HEIGHT) + 1)
+        full_width = max(self.canvas.winfo_width(), sum(w for _, _, w in self.columns))
+        for index in range(first, last):
+            y = index * self.ROW_HEIGHT
+            if index % 2:
+                self.canvas.create_rectangle(0, y, full_width, y + self.ROW_HEIGHT,
+                                             fill='#f7f9fc', outline='', tags='row')
+            x = 10
+            for key, _, width in self.columns:
+                self.canvas.create_text(x, y + self.ROW_HEIGHT // 2, anchor='w', tags='row',
+                                        text=self._cell_text(self.rows[index].get(key), width),
+                                        font=("Segoe UI", 10), fill='#1a1a1a')
+                x += width
+
+    @staticmethod
+    def _cell_text(value, width):
+        if value is None:
+            return ''
+        text = ', '.join(value) if isinstance(value, list) else str(value)
+        max_chars = max(4, width // 7)
+        return text if len(text) <= max_chars else text[:max_chars - 1] + '…'
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self._redraw()
+
+    def _on_wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.canvas.yview_scroll(-3, 'units')
+        else:
+            self.canvas.yview_scroll(3, 'units')
+
+    def _on_header_click(self, event):
+        x = 10
+        for key, _, width in self.columns:
+            if event.x < x + width:
+                if self.on_sort:
+                    self.on_sort(key)
+                return
+            x += width
+
+
+class SeatMapCanvas(tk.Frame):
+    """Plan de salle dessiné sur un seul Canvas (un rectangle par place).
+
+    Un clic est résolu par ses coordonnées (pas un widget par place) et un
+    changement de sélection ne recolore que le rectangle concerné. Zoom avec
+    zoom()/fit() ou Ctrl+molette ; défilement horizontal avec Maj+molette.
+    """
+    COLORS = {'normal': '#00d4ff', 'vip': '#d946ef', 'taken': '#ff3333', 'selected': '#ffed4e'}
+    MIN_CELL = 14
+    MAX_CELL = 64
+    DEFAULT_CELL = 48
+    MARGIN = 30  # place des lettres de rangée
+    TOP = 50  # écran et numéros de colonne
+
+    def __init__(self, container, seating_map, vip_rows, on_change=None, **kwargs):
+        super().__init__(container, bg='#f5f5f5', **kwargs)
+        self.seating_map = seating_map
+        self.rows = len(seating_map)
+        self.cols = len(seating_map[0]) if self.rows else 0
+        self.vip_rows = vip_rows
+        self.on_change = on_change
+        self.selected = set()
+        self.cell = self.DEFAULT_CELL
+        self._rects = {}
+        self._fitted = False
+
+        self.canvas = tk.Canvas(self, bg='#f5f5f5', highlightthickness=0)
+        ybar = ttk.Scrollbar(self, orient='vertical', command=self.canvas.yview)
+        xbar = ttk.Scrollbar(self, orient='horizontal', command=self.canvas.xview)
+        self.canvas.configure(yscrollcommand=ybar.set, xscrollcommand=xbar.set)
+        ybar.pack(side='right', fill='y')
+        xbar.pack(side='bottom', fill='x')
+        self.canvas.pack(side='left', fill='both', expand=True)
+
+        self.canvas.bind('<Button-1>', self._on_click)
+        self.canvas.bind('<Configure>', self._on_configure)
+        self.canvas.bind('<MouseWheel>', lambda e: self.canvas.yview_scroll(-1 if e.delta > 0 else 1, 'units'))
+        self.canvas.bind('<Shift-MouseWheel>', lambda e: self.canvas.xview_scroll(-1 if e.delta > 0 else 1, 'units'))
+        self.canvas.bind('<Control-MouseWheel>', lambda e: self.zoom(1.25 if e.delta > 0 else 0.8))
+        self.canvas.bind('<Button-4>', lambda e: self.canvas.yview_scroll(-1, 'units'))
+        self.canvas.bind('<Button-5>', lambda e: self.canvas.yview_scroll(1, 'units'))
+        self.canvas.bind('<Control-Button-4>', lambda e: self.zoom(1.25))
+        self.canvas.bind('<Control-Button-5>', lambda e: self.zoom(0.8))
+        self.draw()
+
+    def seat_label(self, r, c):
+        return f"{chr(65 + r)}{c + 1}"
+
+    def selected_labels(self):
+        return sorted(self.seat_label(r, c) for r, c in self.selected)
+
+    def _color(self, r, c):
+        if self.seating_map[r][c] == 'x':
+            return self.COLORS['taken']
+        if (r, c) in self.selected:
+            return self.COLORS['selected']
+        return self.COLORS['vip'] if r in self.vip_rows else self.COLORS['normal']
+
+    def draw(self):
+        """Redessine tout le plan (à l'ouverture et à chaque zoom uniquement)"""
+        canvas = self.canvas
+        canvas.delete('all')
+        self._rects = {}
+        pitch = self.cell
+        size = pitch - max(2, pitch // 8)
+        left, top = self.MARGIN, self.TOP
+        right = left + self.cols * pitch
+
+        canvas.create_rectangle(left, 6, right, 14, fill='#1a1a1a', outline='')
+        canvas.create_text((left + right) / 2, 26, text="ÉCRAN", font=("Segoe UI", 10, 'bold'), fill='#1a1a1a')
+
+        label_font = ("Segoe UI", max(7, min(10, pitch // 5)), 'bold')
+        show_labels = pitch >= 30
+        step = 1 if pitch >= 22 else 5
+        for c in range(0, self.cols, step):
+            canvas.create_text(left + c * pitch + size / 2, top - 8, text=str(c + 1),
+                               font=("Segoe UI", 8), fill='#666666')
+        for r in range(self.rows):
+            y = top + r * pitch
+            canvas.create_text(left / 2, y + size / 2, text=chr(65 + r), font=("Segoe UI", 9, 'bold'), fill='#666666')
+            for c in range(self.cols):
+                x = left + c * pitch
+                self._rects[(r, c)] = canvas.create_rectangle(x, y, x + size, y + size,
+                                                              fill=self._color(r, c), outline='')
+                if show_labels:
+                    taken = self.seating_map[r][c] == 'x'
+                    canvas.create_text(x + size / 2, y + size / 2, text=self.seat_label(r, c), font=label_font,
+                                       fill='white' if taken else '#1a1a1a', state='disabled')
+        canvas.configure(scrollregion=(0, 0, right + 10, top + self.rows * pitch + 10),
+                         xscrollincrement=pitch, yscrollincrement=pitch)
+
+    def seat_at(self, x, y):
+        """Place (rangée, colonne) sous le point (x, y) du canvas, ou None (marge ou espace entre places)"""
+        pitch = self.cell
+        size = pitch - max(2, pitch // 8)
+        dx, dy = x - self.MARGIN, y - self.TOP
+        if dx < 0 or dy < 0:
+            return None
+        r, c = int(dy // pitch), int(dx // pitch)
+        if r >= self.rows or c >= self.cols or dx - c * pitch >= size or dy - r * pitch >= size:
+            return None
+        return r, c
+
+    def toggle(self, r, c):
+        if self.seating_map[r][c] == 'x':
+            return
+        self.selected ^= {(r, c)}
+        self.canvas.itemconfig(self._rects[(r, c)], fill=self._color(r, c))
+        if self.on_change:
+            self.on_change()
+
+    def select(self, positions):
+        """Remplace la sélection par `positions` (liste de (rangée, colonne) libres)"""
+        changed = self.selected ^ set(positions)
+        self.selected = set(positions)
+        for r, c in changed:
+            self.canvas.itemconfig(self._rects[(r, c)], fill=self._color(r, c))
+        if self.on_change:
+            self.on_change()
+
+    def zoom(self, factor):
+        cell = max(self.MIN_CELL, min(self.MAX_CELL, int(round(self.cell * factor))))
+        if cell != self.cell:
+            self.cell = cell
+            self.draw()
+
+    def fit(self):
+        """Choisit la taille de place qui fait tenir toute la salle dans la zone visible"""
+        if not self.rows or not self.cols:
+            return
+        width = self.canvas.winfo_width() - self.MARGIN - 10
+        height = self.canvas.winfo_height() - self.TOP - 10
+        cell = min(width // self.cols, height // self.rows, self.DEFAULT_CELL)
+        self.cell = max(self.MIN_CELL, cell)
+        self.draw()
+
+    def _on_click(self, event):
+        seat = self.seat_at(self.canvas.canvasx(event.x), self.canvas.canvasy(event.y))
+        if seat is not None:
+            self.toggle(*seat)
+
+    def _on_configure(self, event):
+        # Ajustement automatique une seule fois, quand la taille réelle est connue
+        if not self._fitted and event.width > 1:
+            self._fitted = True
+            self.fit()
+
+
+class Spinner(tk.Label):
+    """Indicateur d'attente animé, affiché pendant les tâches lancées par GUIApp.run_async"""
+
+    FRAMES = '◐◓◑◒'
+    DELAY = 120  # ms entre deux images
+
+    def __init__(self, container, text='', **kwargs):
+        kwargs.setdefault('font', ("Segoe UI", 10, 'bold'))
+        kwargs.setdefault('bg', '#f5f5f5')
+        kwargs.setdefault('fg', '#00a8cc')
+        super().__init__(container, **kwargs)
+        self.text = text
+        self._index = 0
+        self._job = None
+
+    def start(self):
+        if self._job is None:
+            self._tick()
+
+    def stop(self):
+        if self._job is not None:
+            self.after_cancel(self._job)
+            self._job = None
+        if self.winfo_exists():
+            self.config(text='')
+
+    def _tick(self):
+        if not self.winfo_exists():
+            self._job = None
+            return
+        self.config(text=f"{self.FRAMES[self._index % len(self.FRAMES)]} {self.text}".rstrip())
+        self._index += 1
+        self._job = self.after(self.DELAY, self._tick)
+
+
 class GUIApp:
+    # Intervalle de scrutation des tâches en arrière-plan (ms)
+    POLL_DELAY = 50
+
     def __init__(self, root: tk.Tk):
         self.root = root
         root.title("CY-NEMA — Interface Graphique")
@@ -33,6 +326,10 @@ class GUIApp:
         self.setup_theme()
 
         self.user: Utilisateur | None = None
+        # Hachage des mots de passe et accès lents à la base : hors du thread Tk
+        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='cynema-gui')
+        # Jeton de session : les actions suivantes ne revérifient pas le mot de passe
+        self.session: str | None = None
 
         # Header with gradient-like effect
         self.header_frame = tk.Frame(root, bg='#1a1a1a', height=80)
@@ -194,6 +491,52 @@ class GUIApp:
         style.configure('TEntry', font=('Segoe UI', 10), padding=6)
         style.configure('Treeview', font=('Segoe UI', 9), rowheight=25)
 
+    def run_async(self, fn, *args, on_success, on_error=None, owner=None, spinner=None, widgets=()):
+        """Exécute fn(*args) dans le pool de threads sans bloquer la fenêtre.
+
+        Le résultat est récupéré par scrutation (root.after) puis passé à on_success,
+        ou l'exception à on_error (messagebox par défaut), dans le thread Tk.
+        Pendant l'attente, `spinner` tourne, les `widgets` sont désactivés et le
+        curseur de `owner` est un sablier. Si `owner` est fermé entre-temps, le
+        résultat est ignoré.
+        """
+        future = self.executor.submit(fn, *args)
+        target = owner or self.root
+        target.config(cursor='watch')
+        for widget in widgets:
+            widget.config(state='disabled')
+        if spinner is not None:
+            spinner.start()
+
+        def poll():
+            if not future.done():
+                self.root.after(self.POLL_DELAY, poll)
+                return
+            if owner is not None and not owner.winfo_exists():
+                return
+            target.config(cursor='')
+            if spinner is not None:
+                spinner.stop()
+            for widget in widgets:
+                if widget.winfo_exists():
+                    widget.config(state='normal')
+            error = future.exception()
+            if error is None:
+                on_success(future.result())
+            elif on_error is not None:
+                on_error(error)
+            else:
+                messagebox.showerror("Erreur", str(error))
+
+        self.root.after(self.POLL_DELAY, poll)
+        return future
+
+    @staticmethod
+    def _login(authenticate, email, password):
+        """Tâche de fond : vérifie le mot de passe puis ouvre une session"""
+        u = authenticate(email, password)
+        return u, (storage.start_session(u) if u else None)
+
     def clear_content(self):
         for w in self.content.winfo_children():
             w.destroy()
@@ -251,6 +594,22 @@ class GUIApp:
 
         self.show_films_home(parent=self.home_right)
 
+    def _horaires_labels(self, film):
+        """Horaires du film suivis des places restantes (lues dans l'index de disponibilité).
+
+        Lit la base : appelée hors du thread Tk (cf. _load_films).
+        """
+        disponibilites = storage.film_availability(film.id)
+        labels = []
+        for h in film.horaires:
+            label = storage.availability_label(disponibilites.get(h))
+            labels.append(f"{h} ({label})" if label else h)
+        return labels
+
+    def _load_films(self):
+        """Films et libellés de leurs horaires, chargés dans le pool de threads"""
+        return [(film, self._horaires_labels(film)) for film in storage.list_films()]
+
     def show_films_home(self, parent):
         """Affiche les films dans la sidebar de l'accueil (sans bouton retour)"""
         for w in parent.winfo_children():
@@ -271,7 +630,13 @@ class GUIApp:
         sf = ScrollableFrame(parent)
         sf.pack(fill='both', expand=True, padx=15, pady=15)
 
-        films = storage.list_films()
+        spinner = Spinner(sf.scrollable_frame, text="Chargement des films...")
+        spinner.pack(pady=40)
+        self.run_async(self._load_films, on_success=lambda films: self._fill_films_home(sf, spinner, films),
+                       owner=sf, spinner=spinner)
+
+    def _fill_films_home(self, sf, spinner, films):
+        spinner.destroy()
         if not films:
             no_films = tk.Label(
                 sf.scrollable_frame,
@@ -283,7 +648,7 @@ class GUIApp:
             no_films.pack(pady=40)
             return
 
-        for film in films:
+        for film, horaires in films:
             # Film card
             card = tk.Frame(sf.scrollable_frame, bg='white', relief='flat', bd=0)
             card.pack(fill='x', pady=8, padx=10)
@@ -313,7 +678,7 @@ class GUIApp:
             meta_label.pack(anchor='w', pady=(3, 0))
 
             if film.horaires:
-                horaires_text = "Horaires: " + ' • '.join(film.horaires[:2])
+                horaires_text = "Horaires: " + ' • '.join(horaires[:2])
                 horaires_label = tk.Label(
                     info_frame,
                     text=horaires_text,
@@ -383,7 +748,13 @@ class GUIApp:
         sf = ScrollableFrame(content_frame)
         sf.pack(fill='both', expand=True, padx=15, pady=15)
 
-        films = storage.list_films()
+        spinner = Spinner(sf.scrollable_frame, text="Chargement des films...")
+        spinner.pack(pady=40)
+        self.run_async(self._load_films, on_success=lambda films: self._fill_films(sf, spinner, films),
+                       owner=sf, spinner=spinner)
+
+    def _fill_films(self, sf, spinner, films):
+        spinner.destroy()
         if not films:
             no_films = tk.Label(
                 sf.scrollable_frame,
@@ -395,7 +766,7 @@ class GUIApp:
             no_films.pack(pady=40)
             return
 
-        for film in films:
+        for film, horaires in films:
             # Film card with shadow effect
             card = tk.Frame(sf.scrollable_frame, bg='white', relief='flat', bd=0)
             card.pack(fill='x', pady=10, padx=10)
@@ -427,7 +798,7 @@ class GUIApp:
             meta_label.pack(anchor='w', pady=(5, 0))
 
             if film.horaires:
-                horaires_text = "Horaires: " + ' • '.join(film.horaires)
+                horaires_text = "Horaires: " + ' • '.join(horaires)
                 horaires_label = tk.Label(
                     info_frame,
                     text=horaires_text,
@@ -502,36 +873,48 @@ class GUIApp:
             )
             horaires_title.pack(anchor='w', pady=(10, 10))
 
-            for h in film.horaires:
-                row = tk.Frame(frame, bg='white', highlightthickness=1, highlightbackground='#e0e0e0')
-                row.pack(fill='x', pady=5)
+            spinner = Spinner(frame, text="Chargement des horaires...")
+            spinner.pack(anchor='w')
+            # Ouverture du plan de salle après un clic sur « Réserver »
+            reserve_spinner = Spinner(frame, text="Ouverture du plan de salle...")
+            reserve_spinner.pack(side='bottom', anchor='w')
+
+            def loaded(disponibilites):
+                spinner.destroy()
+                for h in film.horaires:
+                    row = tk.Frame(frame, bg='white', highlightthickness=1, highlightbackground='#e0e0e0')
+                    row.pack(fill='x', pady=5)
                 
-                time_label = tk.Label(
-                    row,
-                    text=f"{h}",
-                    font=("Segoe UI", 11),
-                    bg='white',
-                    fg='#1a1a1a',
-                    padx=15,
-                    pady=10
-                )
-                time_label.pack(side='left', fill='x', expand=True)
+                    label = storage.availability_label(disponibilites.get(h))
+                    time_label = tk.Label(
+                        row,
+                        text=f"{h}  —  {label}" if label else f"{h}",
+                        font=("Segoe UI", 11),
+                        bg='white',
+                        fg='#1a1a1a',
+                        padx=15,
+                        pady=10
+                    )
+                    time_label.pack(side='left', fill='x', expand=True)
+
+                    reserve_btn = tk.Button(
+                        row,
+                        text="Réserver",
+                        command=lambda horaire=h, f=film: self.start_reservation(
+                            f, horaire, owner=win, spinner=reserve_spinner),
+                        font=("Segoe UI", 10, 'bold'),
+                        bg='#00d4ff',
+                        fg='#1a1a1a',
+                        border=0,
+                        padx=15,
+                        pady=10,
+                        cursor='hand2',
+                        activebackground='#00a8cc',
+                        activeforeground='white'
+                    )
+                    reserve_btn.pack(side='right', padx=10)
 
-                reserve_btn = tk.Button(
-                    row,
-                    text="Réserver",
-                    command=lambda horaire=h, f=film: self.start_reservation(f, horaire),
-                    font=("Segoe UI", 10, 'bold'),
-                    bg='#00d4ff',
-                    fg='#1a1a1a',
-                    border=0,
-                    padx=15,
-                    pady=10,
-                    cursor='hand2',
-                    activebackground='#00a8cc',
-                    activeforeground='white'
-                )
-                reserve_btn.pack(side='right', padx=10)
+            self.run_async(storage.film_availability, film.id, on_success=loaded, owner=win, spinner=spinner)
 
     def login_user(self):
         win = tk.Toplevel(self.root)
@@ -573,14 +956,20 @@ class GUIApp:
             if not email or not pwd:
                 messagebox.showerror("Erreur", "Tous les champs sont requis")
                 return
-            u = storage.authenticate_user(email, pwd)
-            if u:
-                self.user = u
-                messagebox.showinfo("Succès", f"Bienvenue {u.prenom} {u.nom}")
-                win.destroy()
-                self.build_user_dashboard()
-            else:
-                messagebox.showerror("Erreur", "Email ou mot de passe invalide")
+            
+            def done(result):
+                u, session = result
+                if u:
+                    self.user = u
+                    self.session = session
+                    messagebox.showinfo("Succès", f"Bienvenue {u.prenom} {u.nom}")
+                    win.destroy()
+                    self.build_user_dashboard()
+                else:
+                    messagebox.showerror("Erreur", "Email ou mot de passe invalide")
+            
+            self.run_async(self._login, storage.authenticate_user, email, pwd, on_success=done,
+                           owner=win, spinner=spinner, widgets=(login_btn,))
         
         # Buttons
         btn_frame = tk.Frame(main, bg='#f5f5f5')
@@ -617,6 +1006,9 @@ class GUIApp:
             activeforeground='white'
         )
         cancel_btn.pack(side='right', padx=(0, 5))
+        
+        spinner = Spinner(btn_frame, text="Vérification...")
+        spinner.pack(side='left')
 
     def login_admin(self):
         win = tk.Toplevel(self.root)
@@ -658,14 +1050,20 @@ class GUIApp:
             if not email or not pwd:
                 messagebox.showerror("Erreur", "Tous les champs sont requis")
                 return
-            u = storage.authenticate_admin(email, pwd)
-            if u:
-                self.user = u
-                messagebox.showinfo("Succès", f" Bienvenue admin {u.prenom} {u.nom}")
-                win.destroy()
-                self.build_admin_dashboard()
-            else:
-                messagebox.showerror("Erreur", "Email ou mot de passe admin invalide")
+            
+            def done(result):
+                u, session = result
+                if u:
+                    self.user = u
+                    self.session = session
+                    messagebox.showinfo("Succès", f" Bienvenue admin {u.prenom} {u.nom}")
+                    win.destroy()
+                    self.build_admin_dashboard()
+                else:
+                    messagebox.showerror("Erreur", "Email ou mot de passe admin invalide")
+            
+            self.run_async(self._login, storage.authenticate_admin, email, pwd, on_success=done,
+                           owner=win, spinner=spinner, widgets=(login_btn,))
         
         # Buttons
         btn_frame = tk.Frame(main, bg='#f5f5f5')
@@ -702,6 +1100,9 @@ class GUIApp:
             activeforeground='white'
         )
         cancel_btn.pack(side='right', padx=(0, 5))
+        
+        spinner = Spinner(btn_frame, text="Vérification...")
+        spinner.pack(side='left')
 
     def register_user(self):
         win = tk.Toplevel(self.root)
@@ -751,24 +1152,30 @@ class GUIApp:
             entries[key] = ent
         
         def submit():
-            try:
-                nom = entries["nom"].get().strip()
-                prenom = entries["prenom"].get().strip()
-                dob = entries["date"].get().strip()
-                email = entries["email"].get().strip()
-                pwd = entries["password"].get()
-                
-                if not (nom and prenom and dob and email and pwd):
-                    messagebox.showerror("Erreur", "Tous les champs sont requis")
-                    return
-                
+            nom = entries["nom"].get().strip()
+            prenom = entries["prenom"].get().strip()
+            dob = entries["date"].get().strip()
+            email = entries["email"].get().strip()
+            pwd = entries["password"].get()
+            
+            if not (nom and prenom and dob and email and pwd):
+                messagebox.showerror("Erreur", "Tous les champs sont requis")
+                return
+            
+            def create():
                 u = storage.create_user(nom=nom, prenom=prenom, date_naissance=dob, email=email, password=pwd)
+                return u, storage.start_session(u)
+            
+            def done(result):
+                u, session = result
                 messagebox.showinfo("Succès", f" Compte créé: {u.email}")
                 win.destroy()
                 self.user = u
+                self.session = session
                 self.build_user_dashboard()
-            except ValueError as e:
-                messagebox.showerror("Erreur", f"{str(e)}")
+            
+            self.run_async(create, on_success=done, on_error=lambda e: messagebox.showerror("Erreur", f"{str(e)}"),
+                           owner=win, spinner=spinner, widgets=(create_btn,))
         
         # Buttons
         btn_frame = tk.Frame(main, bg='#f5f5f5')
@@ -805,6 +1212,9 @@ class GUIApp:
             activeforeground='white'
         )
         cancel_btn.pack(side='right', padx=(0, 5))
+        
+        spinner = Spinner(btn_frame, text="Création...")
+        spinner.pack(side='left')
 
     def build_user_dashboard(self):
         self.clear_content()
@@ -929,6 +1339,7 @@ class GUIApp:
             (" Ajouter représentation", self.gui_add_representation),
             (" Assigner représentation", self.gui_assign_representation),
             (" Voir réservations", self.gui_view_all_reservations),
+            (" Statistiques", self.gui_view_statistics),
         ]
 
         for btn_text, cmd in nav_buttons:
@@ -967,52 +1378,65 @@ class GUIApp:
         self.show_films(parent=films_container)
 
     def logout(self):
+        if self.session:
+            # Le fichier des sessions éventuel est réécrit dans le pool de threads
+            self.run_async(storage.end_session, self.session, on_success=lambda _: None)
         self.user = None
+        self.session = None
         self.build_home()
 
-    # ----- User actions -----
-    def start_reservation(self, film: Film, horaire: str):
-        if not self.user:
-            messagebox.showinfo("Connexion requise", "Veuillez vous connecter pour réserver")
-            return
-        
-        # Vérifier l'âge minimum du film
-        user_age = self.user.calculate_age()
-        if user_age < film.age_min:
-            messagebox.showerror(
-                "Accès refusé",
-                f"Vous devez avoir au minimum {film.age_min} ans pour regarder ce film.\nVotre âge: {user_age} ans"
-            )
-            return
+    def refresh_session(self, on_ready, owner=None, spinner=None):
+        """Recharge l'utilisateur depuis sa session dans le pool de threads puis appelle on_ready().
 
-        # find representation
-        reps = storage.list_representations()
-        rep = None
-        for r in reps:
-            if r.film_id == film.id and r.horaire == horaire:
-                rep = r
-                break
-        if not rep:
-            messagebox.showerror("Erreur", "Aucune représentation trouvée pour cet horaire")
-            return
+        Si la session a expiré, `owner` est fermé et l'utilisateur déconnecté.
+        """
+        token = self.session
 
-        # find assigned salle
-        salles = storage.list_salles()
-        salle = None
-        for s in salles:
-            if rep.id in s.id_representations:
-                salle = s
-                break
-        if not salle:
-            messagebox.showerror("Erreur", "Aucune salle assignée à cette représentation")
-            return
+        def loaded(user):
+            if user is None:
+                if owner is not None:
+                    owner.destroy()
+                messagebox.showinfo("Session expirée", "Veuillez vous reconnecter")
+                self.logout()
+                return
+            self.user = user
+            on_ready()
 
-        salles_entry = storage.get_salle_seating(salle.id, rep.id)
-        if not salles_entry or not salles_entry.seating_map:
-            messagebox.showerror("Erreur", "Plan de salle non disponible")
+        self.run_async(lambda: storage.resume_session(token) if token else None, on_success=loaded,
+                       owner=owner, spinner=spinner)
+
+    # ----- User actions -----
+    def start_reservation(self, film: Film, horaire: str, owner=None, spinner=None):
+        if not self.user:
+            messagebox.showinfo("Connexion requise", "Veuillez vous connecter pour réserver")
             return
+        token = self.session
+
+        def load():
+            # Session (relue depuis la base) puis représentation, salle et plan de salle en une recherche indexée
+            user = storage.resume_session(token) if token else None
+            return user, storage.resolve_showing(film.id, horaire) if user else None
+
+        def loaded(result):
+            user, showing = result
+            if user is None:
+                messagebox.showinfo("Session expirée", "Veuillez vous reconnecter")
+                self.logout()
+                return
+            self.user = user
+
+            # Vérifier l'âge minimum du film
+            user_age = self.user.calculate_age()
+            if user_age < film.age_min:
+                messagebox.showerror(
+                    "Accès refusé",
+                    f"Vous devez avoir au minimum {film.age_min} ans pour regarder ce film.\nVotre âge: {user_age} ans"
+                )
+                return
+            self.open_seat_selection(film, showing.representation, showing.salle, showing.seating.seating_map)
 
-        self.open_seat_selection(film, rep, salle, salles_entry.seating_map)
+        self.run_async(load, on_success=loaded, on_error=lambda e: messagebox.showerror("Erreur", str(e)),
+                       owner=owner, spinner=spinner)
 
     def open_seat_selection(self, film, rep, salle, seating_map):
         win = tk.Toplevel(self.root)
@@ -1043,32 +1467,12 @@ class GUIApp:
         )
         info_label.pack(pady=(0, 10))
 
-        rows = len(seating_map)
-        cols = len(seating_map[0]) if rows else 0
-
-        sel = set()
-
-        canvas = tk.Canvas(win, bg='#f5f5f5', highlightthickness=0)
-        canvas.pack(side='left', fill='both', expand=True, padx=20, pady=20)
-        sbar = ttk.Scrollbar(win, orient='vertical', command=canvas.yview)
-        sbar.pack(side='right', fill='y', padx=(0, 20))
-        inner = ttk.Frame(canvas)
-        canvas.create_window((0, 0), window=inner, anchor='nw')
-
-        def on_config(e):
-            canvas.configure(scrollregion=canvas.bbox('all'))
-
-        inner.bind('<Configure>', on_config)
-        canvas.configure(yscrollcommand=sbar.set)
-
         # Legend
-        legend_frame = tk.Frame(inner, bg='#f5f5f5')
-        legend_frame.pack(pady=(0, 20))
-        
-        tk.Label(legend_frame, text="🖼️ ÉCRAN", font=("Segoe UI", 13, 'bold'), bg='#f5f5f5', fg='#1a1a1a').pack()
+        legend_frame = tk.Frame(win, bg='#f5f5f5')
+        legend_frame.pack(pady=(15, 5))
         
         legend_inner = tk.Frame(legend_frame, bg='#f5f5f5')
-        legend_inner.pack(pady=(10, 0))
+        legend_inner.pack()
         
         # Legend items with VIP
         legend_items = [
@@ -1087,73 +1491,8 @@ class GUIApp:
             price = f"  {item[2]}" if len(item) > 2 else ""
             tk.Label(row, text=text + price, font=("Segoe UI", 9), bg='#f5f5f5', fg='#1a1a1a').pack(side='left')
 
-        # Grid frame
-        grid_frame = tk.Frame(inner, bg='#f5f5f5')
-        grid_frame.pack(pady=20)
-
-        btns = {}
-        
-        # Déterminer les rangées VIP
-        vip_rows = set(range(salle.nombre_rangees_vip))
-
-        def toggle(r, c):
-            key = (r, c)
-            if seating_map[r][c] == 'x':
-                return
-            if key in sel:
-                sel.remove(key)
-                is_vip = r in vip_rows
-                bg_color = '#d946ef' if is_vip else '#00d4ff'
-                btns[key].config(bg=bg_color, activebackground='#00a8cc', fg='#1a1a1a')
-            else:
-                sel.add(key)
-                btns[key].config(bg='#ffed4e', activebackground='#fff59d', fg='#1a1a1a')
-
-        for r in range(rows):
-            for c in range(cols):
-                state = seating_map[r][c]
-                txt = f"{chr(65+r)}{c+1}"
-                is_vip = r in vip_rows
-                
-                if state == 'x':
-                    b = tk.Button(
-                        grid_frame,
-                        text=txt,
-                        width=6,
-                        height=2,
-                        font=("Segoe UI", 9, 'bold'),
-                        bg='#ff3333',
-                        fg='white',
-                        border=0,
-                        relief='raised',
-                        state='disabled',
-                        disabledforeground='white'
-                    )
-                else:
-                    bg_color = '#d946ef' if is_vip else '#00d4ff'
-                    active_bg = '#ffed4e' if is_vip else '#00a8cc'
-                    
-                    b = tk.Button(
-                        grid_frame,
-                        text=txt,
-                        width=6,
-                        height=2,
-                        font=("Segoe UI", 9, 'bold'),
-                        bg=bg_color,
-                        fg='#1a1a1a',
-                        border=0,
-                        relief='raised',
-                        cursor='hand2',
-                        activebackground=active_bg,
-                        command=lambda rr=r, cc=c: toggle(rr, cc)
-                    )
-                
-                b.grid(row=r, column=c, padx=3, pady=3)
-                btns[(r, c)] = b
-
         # Bottom frame with stats
-        bottom_frame = tk.Frame(inner, bg='#f5f5f5')
-        bottom_frame.pack(pady=(20, 0))
+        bottom_frame = tk.Frame(win, bg='#f5f5f5')
         
         selected_label = tk.Label(
             bottom_frame,
@@ -1174,8 +1513,9 @@ class GUIApp:
         price_label.pack(pady=(0, 15))
         
         def update_label():
+            sel = seat_view.selected
             if sel:
-                seats_list = sorted([f"{chr(65+r)}{c+1}" for (r, c) in sel])
+                seats_list = seat_view.selected_labels()
                 selected_label.config(text=f"✓ Sièges sélectionnés: {', '.join(seats_list)}", fg='#00d4ff')
                 
                 # Calculer le prix
@@ -1202,35 +1542,35 @@ class GUIApp:
                 price_label.config(text="")
 
         def confirm():
-            if not sel:
+            if not seat_view.selected:
                 self.show_error_popup('Erreur', 'Aucun siège sélectionné')
                 return
-            seats = sorted([f"{chr(65+r)}{c+1}" for (r, c) in sel])
+            seats = seat_view.selected_labels()
             
             # Calculer le prix total
             total_price = sum(15 if (ord(seat[0]) - 65) in vip_rows else 9 for seat in seats)
             
-            # create reservation
-            reservation = Reservation(
-                utilisateur_id=self.user.id,
-                salle_id=salle.id,
-                film_id=film.id,
-                horaire=rep.horaire,
-                places=seats
-            )
-            # mark seats
-            for (r, c) in sel:
-                seating_map[r][c] = 'x'
-            storage.update_salle_seating(salle.id, rep.id, seating_map)
-            storage.add_reservation(reservation)
-            self.user.nombre_resa += 1
-            storage.update_utilisateur(self.user)
+            user_id = self.user.id
             
-            self.show_success_popup('Réservation confirmée!', f'Places: {", ".join(seats)}\nPrix total: {total_price}€')
-            win.destroy()
+            def book():
+                storage.book_seats(user_id, rep.id, seats)
+                return storage.get_utilisateur(user_id).nombre_resa
+            
+            def done(nombre_resa):
+                self.user.nombre_resa = nombre_resa
+                self.show_success_popup('Réservation confirmée!', f'Places: {", ".join(seats)}\nPrix total: {total_price}€')
+                win.destroy()
+            
+            def failed(e):
+                if isinstance(e, storage.SeatsUnavailableError):
+                    self.show_error_popup('Places indisponibles', f'Déjà réservées entre-temps: {", ".join(e.seats)}')
+                    win.destroy()
+                else:
+                    self.show_error_popup('Erreur', str(e))
+            
+            self.run_async(book, on_success=done, on_error=failed, owner=win, spinner=spinner, widgets=(confirm_btn,))
 
-        btn_frame = tk.Frame(inner, bg='#f5f5f5')
-        btn_frame.pack(fill='x', pady=(10, 0))
+        btn_frame = tk.Frame(win, bg='#f5f5f5', padx=20)
         
         confirm_btn = tk.Button(
             btn_frame,
@@ -1264,10 +1604,72 @@ class GUIApp:
         )
         cancel_btn.pack(side='right', padx=(0, 5))
         
-        # Re-bind buttons with label update
-        for (r, c), b in btns.items():
-            if seating_map[r][c] != 'x':
-                b.config(command=lambda rr=r, cc=c: (toggle(rr, cc), update_label()))
+        spinner = Spinner(btn_frame, text="Réservation...")
+        spinner.pack(side='left')
+
+        # Les boutons et le récapitulatif restent visibles en bas, le plan prend le reste
+        btn_frame.pack(side='bottom', fill='x', pady=(0, 15))
+        bottom_frame.pack(side='bottom', pady=(10, 0))
+
+        # Zoom
+        zoom_frame = tk.Frame(win, bg='#f5f5f5', padx=20)
+        zoom_frame.pack(fill='x')
+
+        # Placement automatique d'un groupe : meilleur bloc de places côte à côte
+        tk.Label(zoom_frame, text="Places :", font=("Segoe UI", 10), bg='#f5f5f5', fg='#1a1a1a').pack(side='left')
+        group_size = tk.Spinbox(zoom_frame, from_=1, to=max(1, len(seating_map[0]) if len(seating_map) else 1),
+                                width=4, font=("Segoe UI", 10))
+        group_size.pack(side='left', padx=(5, 10))
+        vip_choice = ttk.Combobox(zoom_frame, values=['Indifférent', 'VIP', 'Normal'], state='readonly',
+                                  width=11, font=("Segoe UI", 10))
+        vip_choice.current(0)
+        vip_choice.pack(side='left', padx=(0, 10))
+
+        def best_seats():
+            try:
+                size = int(group_size.get())
+            except ValueError:
+                self.show_error_popup('Erreur', 'Nombre de places invalide')
+                return
+            if size < 1:
+                self.show_error_popup('Erreur', 'Nombre de places invalide')
+                return
+            prefer_vip = {'VIP': True, 'Normal': False}.get(vip_choice.get())
+            block = SeatFinder(seating_map, salle.nombre_rangees_vip).best_block(size, prefer_vip)
+            if block is None:
+                self.show_error_popup('Places indisponibles', f'Aucun bloc de {size} places côte à côte')
+                return
+            seat_view.select(block.positions)
+
+        tk.Button(
+            zoom_frame,
+            text="Meilleures places",
+            command=best_seats,
+            font=("Segoe UI", 10, 'bold'),
+            bg='#00d4ff',
+            fg='#1a1a1a',
+            border=0,
+            padx=10,
+            cursor='hand2'
+        ).pack(side='left')
+        for text, command in (("−", lambda: seat_view.zoom(0.8)), ("+", lambda: seat_view.zoom(1.25)),
+                              ("Ajuster", lambda: seat_view.fit())):
+            tk.Button(
+                zoom_frame,
+                text=text,
+                command=command,
+                font=("Segoe UI", 10, 'bold'),
+                bg='#e0e0e0',
+                fg='#1a1a1a',
+                border=0,
+                padx=10,
+                cursor='hand2'
+            ).pack(side='right', padx=(5, 0))
+
+        # Plan de salle : un seul canvas, quelle que soit la taille de la salle
+        vip_rows = set(range(salle.nombre_rangees_vip))
+        seat_view = SeatMapCanvas(win, seating_map, vip_rows, on_change=update_label)
+        seat_view.pack(fill='both', expand=True, padx=20, pady=(5, 0))
 
     def view_my_reservations(self):
         if not self.user:
@@ -1292,8 +1694,6 @@ class GUIApp:
         )
         header_label.pack(pady=20)
 
-        reservations = storage.get_user_reservations(self.user.id)
-        
         # Create scrollable frame
         canvas = tk.Canvas(win, bg='#f5f5f5', highlightthickness=0)
         scrollbar = ttk.Scrollbar(win, orient='vertical', command=canvas.yview)
@@ -1310,108 +1710,112 @@ class GUIApp:
         canvas.pack(side='left', fill='both', expand=True, padx=15, pady=15)
         scrollbar.pack(side='right', fill='y')
         
-        if not reservations:
-            no_res = tk.Label(
-                scrollable_frame,
-                text=' Aucune réservation pour le moment',
-                font=("Segoe UI", 13, 'bold'),
-                bg='#f5f5f5',
-                fg='#999999'
-            )
-            no_res.pack(pady=60)
-            return
+        user_id = self.user.id
+
+        def load():
+            # Réservations et titre de leur film, lus dans le pool de threads
+            reservations = []
+            for res in storage.get_user_reservations(user_id):
+                film = storage.get_film(res.film_id)
+                reservations.append((res, film.titre if film else 'Film inconnu'))
+            return reservations
+
+        spinner = Spinner(scrollable_frame, text="Chargement des réservations...")
+        spinner.pack(pady=60)
+
+        def loaded(reservations):
+            spinner.destroy()
+            if not reservations:
+                no_res = tk.Label(
+                    scrollable_frame,
+                    text=' Aucune réservation pour le moment',
+                    font=("Segoe UI", 13, 'bold'),
+                    bg='#f5f5f5',
+                    fg='#999999'
+                )
+                no_res.pack(pady=60)
+                return
 
-        for res in reservations:
-            card = tk.Frame(scrollable_frame, bg='white', highlightthickness=2, highlightbackground='#00d4ff')
-            card.pack(fill='x', pady=10)
+            for res, film_title in reservations:
+                card = tk.Frame(scrollable_frame, bg='white', highlightthickness=2, highlightbackground='#00d4ff')
+                card.pack(fill='x', pady=10)
             
-            # Header de la card
-            card_header = tk.Frame(card, bg='#00d4ff')
-            card_header.pack(fill='x')
+                # Header de la card
+                card_header = tk.Frame(card, bg='#00d4ff')
+                card_header.pack(fill='x')
             
-            content = tk.Frame(card, bg='white')
-            content.pack(fill='x', padx=15, pady=12)
+                content = tk.Frame(card, bg='white')
+                content.pack(fill='x', padx=15, pady=12)
 
-            film = storage.get_film(res.film_id)
-            film_title = film.titre if film else 'Film inconnu'
-            
-            title_label = tk.Label(
-                card_header,
-                text=f"  {film_title}",
-                font=("Segoe UI", 13, 'bold'),
-                bg='#00d4ff',
-                fg='#1a1a1a'
-            )
-            title_label.pack(anchor='w', padx=15, pady=8)
+                title_label = tk.Label(
+                    card_header,
+                    text=f"  {film_title}",
+                    font=("Segoe UI", 13, 'bold'),
+                    bg='#00d4ff',
+                    fg='#1a1a1a'
+                )
+                title_label.pack(anchor='w', padx=15, pady=8)
             
-            # Infos réservation
-            info_label = tk.Label(
-                content,
-                text=f"Horaire: {res.horaire}",
-                font=("Segoe UI", 11),
-                bg='white',
-                fg='#1a1a1a'
-            )
-            info_label.pack(anchor='w', pady=(0, 8))
+                # Infos réservation
+                info_label = tk.Label(
+                    content,
+                    text=f"Horaire: {res.horaire}",
+                    font=("Segoe UI", 11),
+                    bg='white',
+                    fg='#1a1a1a'
+                )
+                info_label.pack(anchor='w', pady=(0, 8))
             
-            places_label = tk.Label(
-                content,
-                text=f"Places: {', '.join(res.places)}",
-                font=("Segoe UI", 11),
-                bg='white',
-                fg='#1a1a1a'
-            )
-            places_label.pack(anchor='w', pady=(0, 12))
+                places_label = tk.Label(
+                    content,
+                    text=f"Places: {', '.join(res.places)}",
+                    font=("Segoe UI", 11),
+                    bg='white',
+                    fg='#1a1a1a'
+                )
+                places_label.pack(anchor='w', pady=(0, 12))
 
-            btn = tk.Button(
-                content,
-                text="Annuler cette réservation",
-                command=lambda r=res: self.cancel_reservation(r, win),
-                font=("Segoe UI", 10, 'bold'),
-                bg='#ff6b6b',
-                fg='white',
-                border=0,
-                padx=15,
-                pady=8,
-                cursor='hand2',
-                activebackground='#ff5252',
-                activeforeground='white'
-            )
-            btn.pack(anchor='e', pady=(5, 0))
+                btn = tk.Button(
+                    content,
+                    text="Annuler cette réservation",
+                    command=lambda r=res: self.cancel_reservation(r, win),
+                    font=("Segoe UI", 10, 'bold'),
+                    bg='#ff6b6b',
+                    fg='white',
+                    border=0,
+                    padx=15,
+                    pady=8,
+                    cursor='hand2',
+                    activebackground='#ff5252',
+                    activeforeground='white'
+                )
+                btn.pack(anchor='e', pady=(5, 0))
+
+        self.run_async(load, on_success=loaded, owner=win, spinner=spinner)
 
     def cancel_reservation(self, reservation: Reservation, parent_win=None):
         if not messagebox.askyesno('Confirmer', 'Voulez-vous annuler cette réservation ?'):
             return
-        # free seats
-        rep = None
-        for r in storage.list_representations():
-            if r.film_id == reservation.film_id and r.horaire == reservation.horaire:
-                rep = r
-                break
-        if rep:
-            salles_entry = storage.get_salle_seating(reservation.salle_id, rep.id)
-            if salles_entry and salles_entry.seating_map:
-                seating_map = salles_entry.seating_map
-                for seat in reservation.places:
-                    row_letter = seat[0]
-                    col_num = int(seat[1:])
-                    row_idx = ord(row_letter) - 65
-                    col_idx = col_num - 1
-                    if 0 <= row_idx < len(seating_map) and 0 <= col_idx < len(seating_map[0]):
-                        seating_map[row_idx][col_idx] = 'o'
-                storage.update_salle_seating(reservation.salle_id, rep.id, seating_map)
-
-        # remove reservation
-        db = storage.load_db()
-        db['reservations'] = [r for r in db.get('reservations', []) if r.get('id') != reservation.id]
-        storage.save_db(db)
-        # update user
-        self.user.nombre_resa = max(0, self.user.nombre_resa - 1)
-        storage.update_utilisateur(self.user)
-        messagebox.showinfo('Succès', 'Réservation annulée')
-        if parent_win:
-            parent_win.destroy()
-            self.view_my_reservations()
+        user_id = self.user.id
+        
+        def cancel():
+            # free seats, remove reservation and update stats in one transaction
+            if not storage.cancel_reservation(reservation.id):
+                return None
+            return storage.get_utilisateur(user_id)
+        
+        def done(stored_user):
+            if stored_user is None:
+                messagebox.showerror('Erreur', 'Réservation introuvable')
+                return
+            # update user
+            self.user.nombre_resa = stored_user.nombre_resa
+            messagebox.showinfo('Succès', 'Réservation annulée')
+            if parent_win:
+                parent_win.destroy()
+                self.view_my_reservations()
+        
+        self.run_async(cancel, on_success=done, owner=parent_win)
 
     def view_profile(self):
         """Affiche et permet de modifier le profil en une seule fenêtre"""
@@ -1419,11 +1823,6 @@ class GUIApp:
             messagebox.showerror("Erreur", "Vous devez être connecté pour voir votre profil")
             return
             
-        # Recharger l'utilisateur depuis la base de données
-        current_user = storage.find_user_by_email(self.user.email)
-        if current_user:
-            self.user = current_user
-        
         win = tk.Toplevel(self.root)
         win.title('Mon Profil')
         win.geometry('600x550')
@@ -1447,6 +1846,18 @@ class GUIApp:
         main_frm = tk.Frame(win, bg='#f5f5f5')
         main_frm.pack(fill='both', expand=True, padx=20, pady=20)
 
+        spinner = Spinner(main_frm, text="Chargement du profil...")
+        spinner.pack(pady=60)
+
+        def ready():
+            spinner.destroy()
+            self._fill_profile(win, main_frm)
+
+        # Recharger l'utilisateur depuis la base de données (via sa session)
+        self.refresh_session(ready, owner=win, spinner=spinner)
+
+    def _fill_profile(self, win, main_frm):
+        """Champs éditables et boutons du profil, une fois l'utilisateur rechargé"""
         # Dictionnaire pour stocker les Entry widgets
         entries = {}
 
@@ -1486,17 +1897,17 @@ class GUIApp:
         btn_frame = tk.Frame(main_frm, bg='#f5f5f5')
         btn_frame.pack(fill='x', pady=(30, 0))
 
+        spinner = Spinner(btn_frame)
+        spinner.pack(side='left')
+
         def save_profile():
-            try:
-                # Mettre à jour l'objet utilisateur
-                self.user.nom = entries['nom'].get().strip()
-                self.user.prenom = entries['prenom'].get().strip()
-                self.user.email = entries['email'].get().strip()
-                self.user.date_naissance = entries['date_naissance'].get().strip()
-                
-                # Sauvegarder dans la base de données
-                storage.update_utilisateur(self.user)
-                
+            # Mettre à jour l'objet utilisateur
+            self.user.nom = entries['nom'].get().strip()
+            self.user.prenom = entries['prenom'].get().strip()
+            self.user.email = entries['email'].get().strip()
+            self.user.date_naissance = entries['date_naissance'].get().strip()
+
+            def done(_):
                 # Message de succès
                 messagebox.showinfo('Succès', 'Profil mis à jour avec succès!')
                 win.destroy()
@@ -1506,8 +1917,11 @@ class GUIApp:
                     self.build_user_dashboard()
                 elif self.user.role == 'admin':
                     self.build_admin_dashboard()
-            except Exception as e:
-                messagebox.showerror('Erreur', f'Erreur lors de la sauvegarde: {str(e)}')
+
+            # Sauvegarder dans la base de données (pool de threads)
+            self.run_async(storage.update_utilisateur, self.user, on_success=done,
+                           on_error=lambda e: messagebox.showerror('Erreur', f'Erreur lors de la sauvegarde: {str(e)}'),
+                           owner=win, spinner=spinner, widgets=(save_btn, cancel_btn))
 
         # Bouton Enregistrer
         save_btn = tk.Button(
@@ -1611,9 +2025,12 @@ class GUIApp:
                 age_min = 0
             horaires = [h.strip() for h in entries['Horaires (séparés par ,)'].get().split(',') if h.strip()]
             film = Film(titre=titre, duree=duree, categorie=categorie, age_min=age_min, horaires=horaires)
-            storage.add_film(film)
-            messagebox.showinfo('Succès', f'Film "{titre}" ajouté')
-            win.destroy()
+
+            def done(_):
+                messagebox.showinfo('Succès', f'Film "{titre}" ajouté')
+                win.destroy()
+
+            self.run_async(storage.add_film, film, on_success=done, owner=win, spinner=spinner, widgets=(submit_btn,))
 
         submit_btn = tk.Button(
             frm,
@@ -1630,6 +2047,8 @@ class GUIApp:
             activeforeground='white'
         )
         submit_btn.pack(anchor='e', pady=(20, 0))
+        spinner = Spinner(frm)
+        spinner.pack(anchor='e', pady=(5, 0))
 
     def gui_add_room(self):
         win = tk.Toplevel(self.root)
@@ -1693,9 +2112,12 @@ class GUIApp:
                 messagebox.showerror('Erreur', 'Rangées VIP > total')
                 return
             salle = Salle_info(numero=numero, nombre_rangees_total=nbr_r, nombre_rangees_vip=nbr_vip, nombre_colonnes=nbr_col)
-            storage.add_salle(salle)
-            messagebox.showinfo('Succès', f'Salle {numero} ajoutée')
-            win.destroy()
+
+            def done(_):
+                messagebox.showinfo('Succès', f'Salle {numero} ajoutée')
+                win.destroy()
+
+            self.run_async(storage.add_salle, salle, on_success=done, owner=win, spinner=spinner, widgets=(submit_btn,))
 
         submit_btn = tk.Button(
             frm,
@@ -1712,6 +2134,8 @@ class GUIApp:
             activeforeground='white'
         )
         submit_btn.pack(anchor='e', pady=(20, 0))
+        spinner = Spinner(frm)
+        spinner.pack(anchor='e', pady=(5, 0))
 
     def gui_add_representation(self):
         win = tk.Toplevel(self.root)
@@ -1736,11 +2160,21 @@ class GUIApp:
         frm = tk.Frame(win, bg='#f5f5f5', padx=20, pady=20)
         frm.pack(fill='both', expand=True)
 
-        films = storage.list_films()
-        if not films:
-            messagebox.showerror('Erreur', 'Aucun film disponible')
-            return
+        spinner = Spinner(frm, text="Chargement des films...")
+        spinner.pack(pady=40)
+
+        def loaded(films):
+            spinner.destroy()
+            if not films:
+                win.destroy()
+                messagebox.showerror('Erreur', 'Aucun film disponible')
+                return
+            self._fill_add_representation(win, frm, films)
 
+        self.run_async(storage.list_films, on_success=loaded, owner=win, spinner=spinner)
+
+    def _fill_add_representation(self, win, frm, films):
+        """Formulaire d'ajout d'une représentation, une fois les films chargés"""
         # Film selection
         film_frame = tk.Frame(frm, bg='#f5f5f5')
         film_frame.pack(fill='x', pady=10)
@@ -1800,14 +2234,25 @@ class GUIApp:
                 messagebox.showerror('Erreur', 'Format d\'horaire invalide (HH:MM)')
                 return
             rep_id = f"{film.id}_{horaire}_{horaire_fin}"
-            if storage.get_representation(rep_id):
-                messagebox.showerror('Erreur', 'Représentation existe déjà')
-                return
             rep = Representation(film_id=film.id, horaire=horaire, id=rep_id, horaire_fin=horaire_fin)
-            storage.add_representation(rep)
-            messagebox.showinfo('Succès', 'Représentation ajoutée')
-            win.destroy()
-            self.build_admin_dashboard()  # Rafraîchir le tableau de bord admin
+
+            def add():
+                # Vérification et ajout dans la même transaction
+                with storage.transaction():
+                    if storage.get_representation(rep_id):
+                        return False
+                    storage.add_representation(rep)
+                return True
+
+            def done(added):
+                if not added:
+                    messagebox.showerror('Erreur', 'Représentation existe déjà')
+                    return
+                messagebox.showinfo('Succès', 'Représentation ajoutée')
+                win.destroy()
+                self.build_admin_dashboard()  # Rafraîchir le tableau de bord admin
+
+            self.run_async(add, on_success=done, owner=win, spinner=spinner, widgets=(submit_btn,))
 
         submit_btn = tk.Button(
             frm,
@@ -1824,6 +2269,8 @@ class GUIApp:
             activeforeground='white'
         )
         submit_btn.pack(anchor='e', pady=(30, 0))
+        spinner = Spinner(frm)
+        spinner.pack(anchor='e', pady=(5, 0))
 
     def gui_assign_representation(self):
         win = tk.Toplevel(self.root)
@@ -1848,12 +2295,28 @@ class GUIApp:
         frm = tk.Frame(win, bg='#f5f5f5', padx=20, pady=20)
         frm.pack(fill='both', expand=True)
 
-        reps = storage.list_representations()
-        salles = storage.list_salles()
-        if not reps or not salles:
-            messagebox.showerror('Erreur', 'Représentations ou salles manquantes')
-            return
+        def load():
+            # Représentations (avec le titre de leur film) et salles, lues dans le pool de threads
+            titres = {f.id: f.titre for f in storage.list_films()}
+            reps = [(r, f"{titres.get(r.film_id, 'Film inconnu')} — {r.horaire}") for r in storage.list_representations()]
+            return reps, storage.list_salles()
+
+        spinner = Spinner(frm, text="Chargement des représentations...")
+        spinner.pack(pady=40)
+
+        def loaded(result):
+            spinner.destroy()
+            reps, salles = result
+            if not reps or not salles:
+                win.destroy()
+                messagebox.showerror('Erreur', 'Représentations ou salles manquantes')
+                return
+            self._fill_assign_representation(win, frm, reps, salles)
 
+        self.run_async(load, on_success=loaded, owner=win, spinner=spinner)
+
+    def _fill_assign_representation(self, win, frm, reps, salles):
+        """Formulaire d'assignation, une fois représentations et salles chargées"""
         # Representation selection
         rep_frame = tk.Frame(frm, bg='#f5f5f5')
         rep_frame.pack(fill='x', pady=10)
@@ -1870,7 +2333,7 @@ class GUIApp:
         rep_var = tk.StringVar()
         rep_menu = ttk.Combobox(
             rep_frame,
-            values=[f"{storage.get_film(r.film_id).titre} — {r.horaire}" for r in reps],
+            values=[label for _, label in reps],
             textvariable=rep_var,
             state='readonly',
             font=("Segoe UI", 10)
@@ -1908,16 +2371,34 @@ class GUIApp:
                 return
             rep_idx = rep_menu.current()
             salle_idx = salle_menu.current()
-            rep = reps[rep_idx]
+            rep = reps[rep_idx][0]
             salle = salles[salle_idx]
-            success, err = storage.assign_representation_to_room(rep.id, salle.id)
-            if success:
-                messagebox.showinfo('Succès', 'Assignation effectuée')
-                win.destroy()
-                self.build_admin_dashboard()  # Rafraîchir le tableau de bord admin
-            else:
+
+            def assign():
+                success, err = storage.assign_representation_to_room(rep.id, salle.id)
+                if success:
+                    return success, err, []
+                try:
+                    debut, fin = interval(rep.horaire, rep.horaire_fin)
+                    creneaux = storage.find_free_slots(salle.id, fin - debut)
+                except ValueError:
+                    creneaux = []
+                return success, err, creneaux
+
+            def done(result):
+                success, err, creneaux = result
+                if success:
+                    messagebox.showinfo('Succès', 'Assignation effectuée')
+                    win.destroy()
+                    self.build_admin_dashboard()  # Rafraîchir le tableau de bord admin
+                    return
+                if creneaux:
+                    err += "\n\nCréneaux libres dans cette salle :\n" + "\n".join(
+                        f"  {ouverture} – {fermeture}" for ouverture, fermeture in creneaux)
                 messagebox.showerror('Erreur', f"{err}")
 
+            self.run_async(assign, on_success=done, owner=win, spinner=spinner, widgets=(submit_btn,))
+
         submit_btn = tk.Button(
             frm,
             text="Assigner",
@@ -1933,11 +2414,13 @@ class GUIApp:
             activeforeground='white'
         )
         submit_btn.pack(anchor='e', pady=(30, 0))
+        spinner = Spinner(frm)
+        spinner.pack(anchor='e', pady=(5, 0))
 
     def gui_view_all_reservations(self):
         win = tk.Toplevel(self.root)
         win.title('Toutes les réservations')
-        win.geometry('700x600')
+        win.geometry('800x650')
         win.config(bg='#f5f5f5')
 
         # Header
@@ -1957,8 +2440,18 @@ class GUIApp:
         frm = tk.Frame(win, bg='#f5f5f5', padx=15, pady=15)
         frm.pack(fill='both', expand=True)
 
-        reservations = storage.list_reservations()
-        if not reservations:
+        spinner = Spinner(frm, text="Chargement des réservations...")
+        spinner.pack(pady=40)
+
+        def loaded(all_rows):
+            spinner.destroy()
+            self._fill_reservations_view(frm, all_rows)
+
+        # Une seule jointure réservations + films + utilisateurs pour toute la liste
+        self.run_async(storage.list_reservation_details, on_success=loaded, owner=win, spinner=spinner)
+
+    def _fill_reservations_view(self, frm, all_rows):
+        if not all_rows:
             no_res = tk.Label(
                 frm,
                 text=' Aucune réservation',
@@ -1969,52 +2462,212 @@ class GUIApp:
             no_res.pack(pady=40)
             return
 
-        # Scrollable list
-        sf = ScrollableFrame(frm)
-        sf.pack(fill='both', expand=True)
+        page_size = 500
+        all_films = 'Tous les films'
+        state = {'sort_key': 'created_at', 'sort_desc': True, 'page': 0, 'rows': all_rows}
 
-        for r in reservations:
-            card = tk.Frame(sf.scrollable_frame, bg='white', highlightthickness=1, highlightbackground='#e0e0e0')
-            card.pack(fill='x', pady=8)
-            
-            content = tk.Frame(card, bg='white')
-            content.pack(fill='x', padx=15, pady=12)
+        # Filtres : film, date (AAAA-MM-JJ, début accepté) et utilisateur (nom ou email)
+        filters = tk.Frame(frm, bg='#f5f5f5')
+        filters.pack(fill='x', pady=(0, 10))
 
-            film = storage.get_film(r.film_id)
-            film_title = film.titre if film else 'Film inconnu'
-            
-            # Find user
-            user_obj = None
-            for u in storage.list_utilisateurs():
-                if u.id == r.utilisateur_id:
-                    user_obj = u
-                    break
-            
-            user_name = f"{user_obj.prenom} {user_obj.nom}" if user_obj else 'Utilisateur inconnu'
-            
-            title_label = tk.Label(
-                content,
-                text=f"{film_title}",
-                font=("Segoe UI", 12, 'bold'),
-                bg='white',
-                fg='#1a1a1a'
-            )
-            title_label.pack(anchor='w')
+        film_var = tk.StringVar(value=all_films)
+        date_var = tk.StringVar()
+        user_var = tk.StringVar()
+
+        tk.Label(filters, text="Film", font=("Segoe UI", 10, 'bold'), bg='#f5f5f5', fg='#1a1a1a').pack(side='left')
+        film_menu = ttk.Combobox(
+            filters,
+            values=[all_films] + sorted({row['film_titre'] for row in all_rows}),
+            textvariable=film_var,
+            state='readonly',
+            width=22,
+            font=("Segoe UI", 10)
+        )
+        film_menu.pack(side='left', padx=(5, 15))
+
+        tk.Label(filters, text="Date", font=("Segoe UI", 10, 'bold'), bg='#f5f5f5', fg='#1a1a1a').pack(side='left')
+        tk.Entry(filters, textvariable=date_var, width=12, font=("Segoe UI", 10), bg='white', fg='#1a1a1a',
+                 border=1, relief='solid').pack(side='left', padx=(5, 15))
+
+        tk.Label(filters, text="Utilisateur", font=("Segoe UI", 10, 'bold'), bg='#f5f5f5', fg='#1a1a1a').pack(side='left')
+        tk.Entry(filters, textvariable=user_var, width=18, font=("Segoe UI", 10), bg='white', fg='#1a1a1a',
+                 border=1, relief='solid').pack(side='left', padx=(5, 0))
+
+        def sort_value(row):
+            value = row.get(state['sort_key'])
+            if isinstance(value, list):
+                return len(value)
+            return value if value is not None else ''
+
+        def apply_filters(*_):
+            film = film_var.get()
+            date = date_var.get().strip()
+            user = user_var.get().strip().casefold()
+            rows = [
+                row for row in all_rows
+                if (film == all_films or row['film_titre'] == film)
+                and (not date or row['date'].startswith(date))
+                and (not user or user in row['utilisateur_nom'].casefold() or user in row['utilisateur_email'].casefold())
+            ]
+            rows.sort(key=sort_value, reverse=state['sort_desc'])
+            state['rows'] = rows
+            state['page'] = 0
+            show_page()
+
+        def on_sort(key):
+            if state['sort_key'] == key:
+                state['sort_desc'] = not state['sort_desc']
+            else:
+                state['sort_key'], state['sort_desc'] = key, False
+            apply_filters()
 
-            info_label = tk.Label(
-                content,
-                text=f"{user_name}  •  {r.horaire}  •  Places: {', '.join(r.places)}",
+        reservation_list = VirtualList(
+            frm,
+            columns=[
+                ('film_titre', 'Film', 190),
+                ('utilisateur_nom', 'Utilisateur', 160),
+                ('horaire', 'Horaire', 70),
+                ('places', 'Places', 150),
+                ('created_at', 'Réservé le', 150),
+            ],
+            on_sort=on_sort
+        )
+        reservation_list.pack(fill='both', expand=True)
+
+        # Pagination
+        pager = tk.Frame(frm, bg='#f5f5f5')
+        pager.pack(fill='x', pady=(10, 0))
+        page_label = tk.Label(pager, font=("Segoe UI", 10), bg='#f5f5f5', fg='#666666')
+
+        def page_count():
+            return max(1, -(-len(state['rows']) // page_size))
+
+        def show_page():
+            start = state['page'] * page_size
+            reservation_list.set_rows(state['rows'][start:start + page_size], state['sort_key'], state['sort_desc'])
+            page_label.config(text=f"Page {state['page'] + 1}/{page_count()}  •  {len(state['rows'])} réservation(s)")
+
+        def change_page(delta):
+            page = state['page'] + delta
+            if 0 <= page < page_count():
+                state['page'] = page
+                show_page()
+
+        for text, delta in (("◀ Précédent", -1), ("Suivant ▶", 1)):
+            tk.Button(
+                pager,
+                text=text,
+                command=lambda d=delta: change_page(d),
                 font=("Segoe UI", 10),
-                bg='white',
-                fg='#666666'
-            )
-            info_label.pack(anchor='w', pady=(5, 0))
+                bg='#ff9500',
+                fg='white',
+                border=0,
+                padx=10,
+                pady=4,
+                cursor='hand2',
+                activebackground='#cc7700',
+                activeforeground='white'
+            ).pack(side='left' if delta < 0 else 'right')
+        page_label.pack(side='left', expand=True)
+
+        film_menu.bind('<<ComboboxSelected>>', apply_filters)
+        date_var.trace_add('write', apply_filters)
+        user_var.trace_add('write', apply_filters)
+        apply_filters()
+
+    def gui_view_statistics(self):
+        from python.stats import compute_statistics
+
+        win = tk.Toplevel(self.root)
+        win.title('Statistiques du cinéma')
+        win.geometry('700x650')
+        win.config(bg='#f5f5f5')
+
+        # Header
+        header = tk.Frame(win, bg='#ff9500', height=60)
+        header.pack(fill='x')
+        header.pack_propagate(False)
+
+        header_label = tk.Label(
+            header,
+            text="Statistiques du cinéma",
+            font=("Segoe UI", 16, 'bold'),
+            bg='#ff9500',
+            fg='white'
+        )
+        header_label.pack(pady=15)
+
+        spinner = Spinner(win, text="Calcul des statistiques...")
+        spinner.pack(pady=40)
+
+        def loaded(stats):
+            spinner.destroy()
+            self._fill_statistics_view(win, stats)
+
+        # Un seul calcul pour toutes les sections
+        self.run_async(compute_statistics, on_success=loaded, owner=win, spinner=spinner)
+
+    def _fill_statistics_view(self, win, stats):
+        canvas = tk.Canvas(win, bg='#f5f5f5', highlightthickness=0)
+        scrollbar = ttk.Scrollbar(win, orient='vertical', command=canvas.yview)
+        frm = tk.Frame(canvas, bg='#f5f5f5', padx=20, pady=15)
+        frm.bind('<Configure>', lambda e: canvas.configure(scrollregion=canvas.bbox('all')))
+        canvas.create_window((0, 0), window=frm, anchor='nw')
+        canvas.configure(yscrollcommand=scrollbar.set)
+        canvas.pack(side='left', fill='both', expand=True)
+        scrollbar.pack(side='right', fill='y')
+
+        def section(title, lines):
+            tk.Label(
+                frm,
+                text=title,
+                font=("Segoe UI", 12, 'bold'),
+                bg='#f5f5f5',
+                fg='#1a1a1a'
+            ).pack(anchor='w', pady=(12, 4))
+            card = tk.Frame(frm, bg='white', relief='solid', border=1, padx=12, pady=8)
+            card.pack(fill='x')
+            for line in lines or ["Aucune donnée disponible"]:
+                tk.Label(card, text=line, font=("Segoe UI", 10), bg='white', fg='#333333',
+                         anchor='w', justify='left').pack(fill='x')
+
+        general = [
+            f"Films disponibles: {stats.nb_films}",
+            f"Salles: {stats.nb_salles}",
+            f"Représentations programmées: {stats.nb_representations}",
+            f"Utilisateurs inscrits: {stats.nb_utilisateurs}",
+            f"Réservations totales: {stats.nb_reservations}",
+            f"Capacité totale: {stats.capacite_totale} places",
+        ]
+        revenus = [
+            f"Revenus totaux: {stats.revenus_totaux:.2f}€",
+            f"Places réservées: {stats.places_reservees}",
+        ]
+        if stats.taux_occupation is not None:
+            revenus.append(f"Taux d'occupation moyen: {stats.taux_occupation:.1f}%")
+
+        section("📊 Statistiques générales", general)
+        section("💰 Revenus", revenus)
+        section("🎬 Films les plus populaires", [
+            f"{i}. {item.label} — {item.places} places — {item.revenus:.2f}€"
+            for i, item in enumerate(stats.top_films, 1)
+        ])
+        section("🎭 Catégories les plus populaires", [
+            f"{i}. {item.label}: {item.places} places" for i, item in enumerate(stats.top_categories, 1)
+        ])
+        section("⏰ Horaires les plus demandés", [
+            f"{i}. {item.label}: {item.places} places" for i, item in enumerate(stats.top_horaires, 1)
+        ])
+        section("👥 Utilisateurs les plus actifs", [
+            f"{i}. {item.label}: {item.places} réservation(s)" for i, item in enumerate(stats.top_utilisateurs, 1)
+        ])
 
 
 def main():
     root = tk.Tk()
     app = GUIApp(root)
     root.mainloop()
+    app.executor.shutdown(wait=False)
 
 
 if __name__ == '__main__':
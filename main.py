@@ -1,15 +1,18 @@
-from python.models import Film, Salle_info, Utilisateur
+# Démarrage rapide : storage et les menus ne sont importés qu'une fois l'option choisie
+# (python manage.py startup-report pour mesurer)
 from python.visuals import ascii_art, clear_screen
-from python.admin_gui import admin_menu
-from python.user_gui import user_menu
-import storage
 import getpass
 import time
 
+TITLE = "CY-NEMA  APP"
+GOODBYE = 'Au revoir!'
+# Textes des bannières, pré-calculables avec python manage.py precompute-banners
+BANNERS = (TITLE, GOODBYE)
+
 
 def print_header():
     clear_screen()
-    print(ascii_art("CY-NEMA  APP"))
+    print(ascii_art(TITLE))
 
 def menu():
 	while True:
@@ -23,6 +26,7 @@ def menu():
 		print('\n')
 		choix = input('Choix: ').strip()
 		if choix == '1':
+			import storage
 			films = storage.list_films()
 			if not films:
 				print('\n')
@@ -32,6 +36,8 @@ def menu():
 			print('\n')
 			input('Appuyez sur Entrée pour revenir au menu...')
 		elif choix == '2':
+			import storage
+			from python.user_gui import user_menu
 			email = input('Email: ')
 			pwd = getpass.getpass('Mot de passe (caché): ')
 			u = storage.authenticate_user(email, pwd)
@@ -43,6 +49,8 @@ def menu():
 				print('Email ou mot de passe invalide.')
 				input('Appuyez sur Entrée pour revenir au menu...')
 		elif choix == '3':
+			import storage
+			from python.user_gui import user_menu
 			nom = input('Nom: ')
 			prenom = input('Prénom: ')
 			dob = input('Date de naissance (YYYY-MM-DD): ')
@@ -57,6 +65,8 @@ def menu():
 				print('Erreur:', e)
 				input('Appuyez sur Entrée pour revenir au menu...')
 		elif choix == '4':
+			import storage
+			from python.admin_gui import admin_menu
 			email = input('Email: ')
 			pwd = getpass.getpass('Mot de passe (caché): ')
 			u = storage.authenticate_admin(email, pwd)
@@ -69,7 +79,7 @@ def menu():
 				input('Appuyez sur Entrée pour revenir au menu...')
 		elif choix == '0':
 			clear_screen()
-			print(ascii_art('Au revoir!'))
+			print(ascii_art(GOODBYE))
 			time.sleep(3)
 			clear_screen()
 			break
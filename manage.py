@@ -0,0 +1,219 @@
+"""Commandes de maintenance de la base (python manage.py <commande>)"""
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+import storage
+
+
+def cmd_migrate_sqlite(args) -> int:
+    target = Path(args.target) if args.target else storage.SQLITE_PATH
+    if target.exists() and not args.force:
+        print(f"❌ {target} existe déjà (utilisez --force pour l'écraser).")
+        return 1
+    counts = storage.migrate_json_to_sqlite(Path(args.source) if args.source else None, target)
+    print(f"✅ Base migrée vers {target}")
+    for collection, count in counts.items():
+        print(f"   - {collection}: {count}")
+    print("Activez le backend avec CYNEMA_BACKEND=sqlite.")
+    return 0
+
+
+def cmd_compact(args) -> int:
+    storage.compact()
+    print("✅ Journal intégré à la base.")
+    return 0
+
+
+def cmd_rebuild_stats(args) -> int:
+    from python.stats import rebuild_stats
+    differences = rebuild_stats(fix=not args.check)
+    if not differences:
+        print("✅ Compteurs de statistiques à jour.")
+        return 0
+    for key, stored, expected in differences:
+        print(f"   - {key}: enregistré {stored}, attendu {expected}")
+    if args.check:
+        print(f"❌ {len(differences)} compteur(s) incorrect(s).")
+        return 1
+    print(f"✅ {len(differences)} compteur(s) corrigé(s).")
+    return 0
+
+
+def cmd_migrate_seat_maps(args) -> int:
+    count = storage.migrate_seat_maps()
+    print(f"✅ {count} plan(s) de salle convertis vers la collection seat_maps.")
+    return 0
+
+
+def cmd_rebuild_availability(args) -> int:
+    count = storage.rebuild_availability()
+    print(f"✅ Places libres recalculées pour {count} représentation(s).")
+    return 0
+
+
+def cmd_plan_schedule(args) -> int:
+    from python.scheduler import plan_schedule, apply_schedule
+    demande = {}
+    for item in args.demande:
+        film_id, _, poids = item.partition('=')
+        try:
+            demande[film_id] = float(poids)
+        except ValueError:
+            print(f"❌ Demande invalide: {item} (format FILM_ID=poids)")
+            return 1
+    try:
+        shows = plan_schedule(args.ouverture, args.fermeture, demande=demande)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    for show in sorted(shows, key=lambda sh: (sh.salle_id, sh.horaire)):
+        print(f"   {show.salle_id}  {show.horaire} -> {show.horaire_fin}  {show.film_id} (~{show.places_attendues:.0f} places)")
+    print(f"{len(shows)} séance(s), {sum(sh.places_attendues for sh in shows):.0f} places attendues par jour.")
+    if args.apply and shows:
+        try:
+            created = apply_schedule(shows)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 1
+        print(f"✅ {len(created)} représentation(s) créée(s) et assignée(s).")
+    return 0
+
+
+def cmd_export(args) -> int:
+    from python.archive import export_ndjson, open_archive
+    with open_archive(args.output, 'w') as f:
+        counts = export_ndjson(f, args.collection or None)
+    # Sur la sortie standard, le résumé ne doit pas se mêler à l'archive
+    out = sys.stderr if args.output == '-' else sys.stdout
+    print(f"✅ {sum(counts.values())} enregistrement(s) exporté(s) vers {args.output}", file=out)
+    for collection, count in counts.items():
+        print(f"   - {collection}: {count}", file=out)
+    return 0
+
+
+def cmd_import(args) -> int:
+    from python.archive import import_ndjson, open_archive
+    try:
+        with open_archive(args.input, 'r') as f:
+            counts = import_ndjson(f, batch_size=args.batch_size, replace=args.replace, dry_run=args.check)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    verb = "valide(s)" if args.check else "importé(s)"
+    print(f"✅ {sum(counts.values())} enregistrement(s) {verb} depuis {args.input}")
+    for collection, count in counts.items():
+        print(f"   - {collection}: {count}")
+    return 0
+
+
+def cmd_precompute_banners(args) -> int:
+    from main import BANNERS
+    from python import visuals
+    count = visuals.precompute_banners(BANNERS)
+    print(f"✅ {count} bannière(s) enregistrée(s) dans {visuals.BANNER_CACHE_PATH}")
+    return 0
+
+
+# Exécuté dans un processus neuf : import de main puis premier affichage du menu
+_STARTUP_PROBE = (
+    "import sys, time\n"
+    "start = time.perf_counter()\n"
+    "import main\n"
+    "main.print_header()\n"
+    "sys.stderr.write(f'first-screen: {(time.perf_counter() - start) * 1e6:.0f}\\n')\n"
+)
+
+
+def parse_importtime(stderr: str):
+    """Lignes `-X importtime` -> liste de (module, temps propre µs, temps cumulé µs)"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # ligne d'en-tête
+        modules.append((parts[2].strip(), int(parts[0]), int(parts[1])))
+    return modules
+
+
+def cmd_startup_report(args) -> int:
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', _STARTUP_PROBE],
+                            cwd=Path(__file__).parent, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "❌ Échec du démarrage")
+        return 1
+    modules = parse_importtime(result.stderr)
+    first_screen = next((int(line.split(':')[1]) for line in result.stderr.splitlines()
+                         if line.startswith('first-screen:')), 0)
+    main_total = next((cumulative for name, _, cumulative in modules if name == 'main'), 0)
+    print(f"Démarrage de main.py : {first_screen / 1000:.1f} ms jusqu'au premier menu "
+          f"(import de main : {main_total / 1000:.1f} ms, {len(modules)} modules)")
+    print(f"\nModules les plus coûteux (temps propre) :")
+    for name, self_us, cumulative in sorted(modules, key=lambda m: m[1], reverse=True)[:args.top]:
+        print(f"   {self_us / 1000:7.2f} ms  (cumulé {cumulative / 1000:7.2f} ms)  {name}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Maintenance de la base CY-NEMA")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('migrate-sqlite', help="Convertit db.json en base SQLite")
+    p.add_argument('--source', help="Fichier JSON source (défaut: db.json)")
+    p.add_argument('--target', help="Fichier SQLite cible (défaut: db.sqlite3)")
+    p.add_argument('--force', action='store_true', help="Écrase la base cible si elle existe")
+    p.set_defaults(func=cmd_migrate_sqlite)
+
+    p = sub.add_parser('migrate-seat-maps', help="Convertit les plans de salle (salles) en un plan par représentation")
+    p.set_defaults(func=cmd_migrate_seat_maps)
+
+    p = sub.add_parser('export', help="Exporte la base en NDJSON (une ligne par enregistrement)")
+    p.add_argument('output', help="Fichier d'archive (.gz : compressé, - : sortie standard)")
+    p.add_argument('--collection', action='append', default=[], help="Collection à exporter (défaut: toutes)")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser('import', help="Importe une archive NDJSON par lots (un enregistrement remplace celui de même clé)")
+    p.add_argument('input', help="Fichier d'archive (.gz : compressé, - : entrée standard)")
+    p.add_argument('--batch-size', type=int, default=1000, help="Enregistrements écrits par transaction (défaut: 1000)")
+    p.add_argument('--replace', action='store_true', help="Vide la base avant l'import")
+    p.add_argument('--check', action='store_true', help="Valide seulement l'archive, sans rien écrire")
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser('compact', help="Intègre le journal des mutations dans la base")
+    p.set_defaults(func=cmd_compact)
+
+    p = sub.add_parser('rebuild-stats', help="Vérifie et corrige les compteurs de statistiques par un recomptage complet")
+    p.add_argument('--check', action='store_true', help="Vérifie seulement (code de retour 1 en cas d'écart)")
+    p.set_defaults(func=cmd_rebuild_stats)
+
+    p = sub.add_parser('rebuild-availability', help="Recalcule l'index des places libres de chaque représentation")
+    p.set_defaults(func=cmd_rebuild_availability)
+
+    p = sub.add_parser('plan-schedule', help="Calcule le programme quotidien des salles (--apply pour l'enregistrer)")
+    p.add_argument('--ouverture', default='10:00', help="Heure d'ouverture HH:MM (défaut: 10:00)")
+    p.add_argument('--fermeture', default='23:30', help="Heure de fermeture HH:MM (défaut: 23:30)")
+    p.add_argument('--demande', action='append', default=[], metavar='FILM_ID=POIDS',
+                   help="Taux de remplissage attendu de la première séance d'un film (défaut: 1.0)")
+    p.add_argument('--apply', action='store_true', help="Enregistre le programme en une transaction")
+    p.set_defaults(func=cmd_plan_schedule)
+
+    p = sub.add_parser('precompute-banners', help="Pré-calcule les bannières ASCII du menu terminal")
+    p.set_defaults(func=cmd_precompute_banners)
+
+    p = sub.add_parser('startup-report', help="Mesure le démarrage de main.py (python -X importtime)")
+    p.add_argument('--top', type=int, default=15, help="Nombre de modules affichés")
+    p.set_defaults(func=cmd_startup_report)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,6 +3,9 @@ from datetime import datetime, timedelta
 from collections import defaultdict
 from python.models import Film, Salle_info, Representation, Reservation, Salles
 from python.visuals import clear_screen
+from python.stats import compute_statistics
+from python.intervals import interval
+from python.scheduler import plan_schedule, apply_schedule
 import storage
 
 
@@ -43,8 +46,7 @@ def remove_film():
             film = films[choix - 1]
             
             # Vérifier s'il y a des réservations pour ce film
-            reservations = storage.list_reservations()
-            reservations_film = [r for r in reservations if r.film_id == film.id]
+            reservations_film = storage.get_film_reservations(film.id)
             
             if reservations_film:
                 print(f"\n⚠️ Attention: {len(reservations_film)} réservation(s) existe(nt) pour ce film.")
@@ -55,14 +57,8 @@ def remove_film():
                     input("Appuyez sur Entrée...")
                     return
             
-            # Supprimer le film
-            db = storage.load_db()
-            db['films'] = [f for f in db.get('films', []) if f.get('id') != film.id]
-            
-            # Supprimer les représentations associées
-            db['representations'] = [r for r in db.get('representations', []) if r.get('film_id') != film.id]
-            
-            storage.save_db(db)
+            # Supprimer le film et les représentations associées
+            storage.delete_film(film.id)
             print(f"\n✅ Film '{film.titre}' supprimé avec succès.")
         else:
             print("Choix invalide.")
@@ -125,10 +121,7 @@ def remove_room():
                     return
             
             # Supprimer la salle
-            db = storage.load_db()
-            db['salle_info'] = [s for s in db.get('salle_info', []) if s.get('id') != salle.id]
-            db['salles'] = [s for s in db.get('salles', []) if s.get('salle_id') != salle.id]
-            storage.save_db(db)
+            storage.delete_salle(salle.id)
             
             print(f"\n✅ Salle {salle.numero} supprimée avec succès.")
         else:
@@ -263,6 +256,18 @@ def assign_representation_to_room():
     else:
         print(f"\n❌ Erreur: {error_msg}")
         print("La représentation n'a pas pu être assignée à cette salle.")
+        try:
+            debut, fin = interval(representation.horaire, representation.horaire_fin)
+        except ValueError:
+            debut = fin = None
+        if debut is not None:
+            creneaux = storage.find_free_slots(salle.id, fin - debut)
+            if creneaux:
+                print(f"Créneaux libres dans la salle {salle.numero} (nettoyage de {storage.CLEANING_BUFFER} min compris):")
+                for ouverture, fermeture in creneaux:
+                    print(f"  - entre {ouverture} et {fermeture}")
+            else:
+                print(f"Aucun créneau libre de {fin - debut} min dans la salle {salle.numero}.")
     
     input("Appuyez sur Entrée pour revenir au menu...")
 
@@ -296,35 +301,8 @@ def remove_representation():
                 input("Appuyez sur Entrée...")
                 return
 
-            # Supprimer la représentation du DB
-            db = storage.load_db()
-            db['representations'] = [r for r in db.get('representations', []) if r.get('id') != rep.id]
-
-            # Supprimer les réservations associées
-            db['reservations'] = [r for r in db.get('reservations', []) if r.get('representation_id') != rep.id]
-
-            # Retirer la représentation des salles et des entrées de seating
-            for s in db.get('salle_info', []):
-                ids = s.get('id_representations', [])
-                if rep.id in ids:
-                    ids = [rid for rid in ids if rid != rep.id]
-                    s['id_representations'] = ids
-
-            # Supprimer les entrées de 'salles' (plans) qui référencent cette représentation
-            new_salles = []
-            for s in db.get('salles', []):
-                rep_ids = s.get('representation_id', [])
-                if rep.id in rep_ids:
-                    rep_ids = [rid for rid in rep_ids if rid != rep.id]
-                    if rep_ids:
-                        s['representation_id'] = rep_ids
-                        new_salles.append(s)
-                    # sinon, on supprime entièrement l'entrée
-                else:
-                    new_salles.append(s)
-            db['salles'] = new_salles
-
-            storage.save_db(db)
+            # Supprimer la représentation, ses réservations et ses plans de salle
+            storage.delete_representation(rep.id)
             print(f"\n✅ Représentation '{rep.id}' supprimée avec succès.")
         else:
             print("Choix invalide.")
@@ -333,6 +311,41 @@ def remove_representation():
 
     input("Appuyez sur Entrée...")
 
+
+def generate_schedule():
+    """Génère automatiquement le programme quotidien des salles puis l'enregistre après confirmation"""
+    ouverture = input("Heure d'ouverture (HH:MM, défaut 10:00) : ").strip() or '10:00'
+    fermeture = input("Heure de fermeture (HH:MM, défaut 23:30) : ").strip() or '23:30'
+    try:
+        shows = plan_schedule(ouverture, fermeture)
+    except ValueError as e:
+        print(f"\n❌ Erreur: {e}")
+        input("Appuyez sur Entrée...")
+        return
+    if not shows:
+        print("\nAucune séance ne peut être ajoutée (films, salles ou créneaux manquants).")
+        input("Appuyez sur Entrée...")
+        return
+
+    titres = {f.id: f.titre for f in storage.list_films()}
+    numeros = {s.id: s.numero for s in storage.list_salles()}
+    print("\n=== PROGRAMME PROPOSÉ ===\n")
+    for show in sorted(shows, key=lambda sh: (numeros.get(sh.salle_id, 0), sh.horaire)):
+        print(f"Salle {numeros.get(show.salle_id, '?')} : {show.horaire} -> {show.horaire_fin}  "
+              f"{titres.get(show.film_id, 'Film inconnu')} (~{show.places_attendues:.0f} places)")
+    print(f"\n{len(shows)} séance(s), {sum(sh.places_attendues for sh in shows):.0f} places attendues par jour.")
+
+    if input("\nEnregistrer ce programme ? (oui/non): ").strip().lower() != "oui":
+        print("Programme abandonné.")
+        input("Appuyez sur Entrée...")
+        return
+    try:
+        created = apply_schedule(shows)
+        print(f"\n✅ {len(created)} représentation(s) créée(s) et assignée(s).")
+    except ValueError as e:
+        print(f"\n❌ Erreur: {e}")
+    input("Appuyez sur Entrée...")
+
 def view_all_reservations():
     """Affiche toutes les réservations avec possibilité de les gérer"""
     from python.visuals import clear_screen
@@ -340,7 +353,8 @@ def view_all_reservations():
     clear_screen()
     print("=== TOUTES LES RÉSERVATIONS ===\n")
     
-    reservations = storage.list_reservations()
+    # Réservations déjà jointes avec film, salle et utilisateur (un seul passage)
+    reservations = storage.list_reservation_details()
     
     if not reservations:
         print("Aucune réservation enregistrée.")
@@ -350,50 +364,26 @@ def view_all_reservations():
     # Grouper par film
     reservations_par_film = defaultdict(list)
     for res in reservations:
-        reservations_par_film[res.film_id].append(res)
+        reservations_par_film[res['film_id']].append(res)
     
     total_places = 0
     total_revenus = 0.0
     
     for film_id, res_list in reservations_par_film.items():
-        film = storage.get_film(film_id)
-        film_titre = film.titre if film else "Film inconnu"
-        
-        print(f"\n🎞️ {film_titre}")
+        print(f"\n🎞️ {res_list[0]['film_titre']}")
         print("-" * 50)
         
         for res in res_list:
-            # Trouver l'utilisateur
-            users = storage.list_utilisateurs()
-            user = None
-            for u in users:
-                if u.id == res.utilisateur_id:
-                    user = u
-                    break
-            
-            user_nom = f"{user.nom} {user.prenom}" if user else "Utilisateur inconnu"
-            salle = storage.get_salle(res.salle_id)
-            salle_num = salle.numero if salle else "?"
-            
-            # Calculer le revenu pour cette réservation
-            revenu_res = 0.0
-            if salle:
-                for place in res.places:
-                    row_letter = place[0]
-                    row_idx = ord(row_letter) - 65
-                    if row_idx < salle.nombre_rangees_vip:
-                        revenu_res += 15.0  # Prix VIP
-                    else:
-                        revenu_res += 9.0  # Prix normal
+            salle_num = res['salle_numero'] if res['salle_numero'] is not None else "?"
             
-            print(f"  • {user_nom} ({user.email if user else 'N/A'})")
-            print(f"    Salle {salle_num} - Horaire: {res.horaire}")
-            print(f"    Places: {', '.join(res.places)} ({len(res.places)} place(s))")
-            print(f"    Revenu: {revenu_res:.2f}€")
-            print(f"    ID: {res.id}")
+            print(f"  • {res['utilisateur_nom']} ({res['utilisateur_email'] or 'N/A'})")
+            print(f"    Salle {salle_num} - Horaire: {res['horaire']}")
+            print(f"    Places: {', '.join(res['places'])} ({len(res['places'])} place(s))")
+            print(f"    Revenu: {res['revenu']:.2f}€")
+            print(f"    ID: {res['id']}")
             
-            total_places += len(res.places)
-            total_revenus += revenu_res
+            total_places += len(res['places'])
+            total_revenus += res['revenu']
     
     print("\n" + "=" * 50)
     print(f"TOTAL: {len(reservations)} réservations - {total_places} places - {total_revenus:.2f}€")
@@ -409,123 +399,60 @@ def view_statistics():
     clear_screen()
     print("=== STATISTIQUES DU CINÉMA ===\n")
     
-    films = storage.list_films()
-    salles = storage.list_salles()
-    representations = storage.list_representations()
-    reservations = storage.list_reservations()
-    utilisateurs = storage.list_utilisateurs()
+    stats = compute_statistics()
     
     # Statistiques générales
     print("📊 STATISTIQUES GÉNÉRALES")
     print("-" * 50)
-    print(f"Films disponibles: {len(films)}")
-    print(f"Salles: {len(salles)}")
-    print(f"Représentations programmées: {len(representations)}")
-    print(f"Utilisateurs inscrits: {len(utilisateurs)}")
-    print(f"Réservations totales: {len(reservations)}")
-    
-    # Capacité totale
-    capacite_totale = sum(s.nombre_rangees_total * s.nombre_colonnes for s in salles)
-    print(f"Capacité totale: {capacite_totale} places")
+    print(f"Films disponibles: {stats.nb_films}")
+    print(f"Salles: {stats.nb_salles}")
+    print(f"Représentations programmées: {stats.nb_representations}")
+    print(f"Utilisateurs inscrits: {stats.nb_utilisateurs}")
+    print(f"Réservations totales: {stats.nb_reservations}")
+    print(f"Capacité totale: {stats.capacite_totale} places")
     
     # Revenus
     print("\n💰 REVENUS")
     print("-" * 50)
-    
-    total_revenus = 0.0
-    total_places_reservees = 0
-    
-    for res in reservations:
-        salle = storage.get_salle(res.salle_id)
-        if salle:
-            for place in res.places:
-                row_letter = place[0]
-                row_idx = ord(row_letter) - 65
-                if row_idx < salle.nombre_rangees_vip:
-                    total_revenus += 15.0
-                else:
-                    total_revenus += 9.0
-        total_places_reservees += len(res.places)
-    
-    print(f"Revenus totaux: {total_revenus:.2f}€")
-    print(f"Places réservées: {total_places_reservees}")
-    if capacite_totale > 0 and len(representations) > 0:
-        taux_occupation = (total_places_reservees / (capacite_totale * len(representations))) * 100
-        print(f"Taux d'occupation moyen: {taux_occupation:.1f}%")
+    print(f"Revenus totaux: {stats.revenus_totaux:.2f}€")
+    print(f"Places réservées: {stats.places_reservees}")
+    if stats.taux_occupation is not None:
+        print(f"Taux d'occupation moyen: {stats.taux_occupation:.1f}%")
     
     # Films les plus populaires
     print("\n🎬 FILMS LES PLUS POPULAIRES")
     print("-" * 50)
-    
-    reservations_par_film = defaultdict(int)
-    revenus_par_film = defaultdict(float)
-    
-    for res in reservations:
-        reservations_par_film[res.film_id] += len(res.places)
-        
-        salle = storage.get_salle(res.salle_id)
-        if salle:
-            for place in res.places:
-                row_letter = place[0]
-                row_idx = ord(row_letter) - 65
-                prix = 15.0 if row_idx < salle.nombre_rangees_vip else 9.0
-                revenus_par_film[res.film_id] += prix
-    
-    # Trier par nombre de places réservées
-    films_tries = sorted(reservations_par_film.items(), key=lambda x: x[1], reverse=True)
-    
-    if films_tries:
-        for i, (film_id, nb_places) in enumerate(films_tries[:5], 1):
-            film = storage.get_film(film_id)
-            film_titre = film.titre if film else "Film inconnu"
-            revenu = revenus_par_film[film_id]
-            print(f"{i}. {film_titre}")
-            print(f"   Places réservées: {nb_places} - Revenus: {revenu:.2f}€")
+    if stats.top_films:
+        for i, item in enumerate(stats.top_films, 1):
+            print(f"{i}. {item.label}")
+            print(f"   Places réservées: {item.places} - Revenus: {item.revenus:.2f}€")
     else:
         print("Aucune donnée disponible")
     
     # Catégories les plus populaires
     print("\n🎭 CATÉGORIES LES PLUS POPULAIRES")
     print("-" * 50)
-    
-    categories = defaultdict(int)
-    for film_id, nb_places in reservations_par_film.items():
-        film = storage.get_film(film_id)
-        if film:
-            categories[film.categorie] += nb_places
-    
-    if categories:
-        categories_triees = sorted(categories.items(), key=lambda x: x[1], reverse=True)
-        for i, (cat, nb_places) in enumerate(categories_triees[:5], 1):
-            print(f"{i}. {cat}: {nb_places} places")
+    if stats.top_categories:
+        for i, item in enumerate(stats.top_categories, 1):
+            print(f"{i}. {item.label}: {item.places} places")
     else:
         print("Aucune donnée disponible")
     
     # Horaires les plus demandés
     print("\n⏰ HORAIRES LES PLUS DEMANDÉS")
     print("-" * 50)
-    
-    horaires = defaultdict(int)
-    for res in reservations:
-        horaires[res.horaire] += len(res.places)
-    
-    if horaires:
-        horaires_tries = sorted(horaires.items(), key=lambda x: x[1], reverse=True)
-        for i, (horaire, nb_places) in enumerate(horaires_tries[:5], 1):
-            print(f"{i}. {horaire}: {nb_places} places")
+    if stats.top_horaires:
+        for i, item in enumerate(stats.top_horaires, 1):
+            print(f"{i}. {item.label}: {item.places} places")
     else:
         print("Aucune donnée disponible")
     
     # Utilisateurs les plus actifs
     print("\n👥 UTILISATEURS LES PLUS ACTIFS")
     print("-" * 50)
-    
-    utilisateurs_tries = sorted(utilisateurs, key=lambda u: u.nombre_resa, reverse=True)
-    
-    if utilisateurs_tries:
-        for i, user in enumerate(utilisateurs_tries[:5], 1):
-            if user.nombre_resa > 0:
-                print(f"{i}. {user.prenom} {user.nom}: {user.nombre_resa} réservation(s)")
+    if stats.top_utilisateurs:
+        for i, item in enumerate(stats.top_utilisateurs, 1):
+            print(f"{i}. {item.label}: {item.places} réservation(s)")
     else:
         print("Aucun utilisateur actif")
     
@@ -8,7 +8,8 @@ from python.admin_functions import (
     view_statistics,
     remove_film,
     remove_room,
-    remove_representation
+    remove_representation,
+    generate_schedule
 )
 
 def admin_menu(user):
@@ -29,6 +30,8 @@ def admin_menu(user):
         print("\n=== RÉSERVATIONS ET STATISTIQUES ===")
         print("8) Voir toutes les réservations")
         print("9) Voir les statistiques")
+        print("\n=== PROGRAMMATION ===")
+        print("10) Générer le programme automatiquement")
         print("\n0) Retour au menu principal")
         print("\n")
         choix = input("Choix: ").strip()
@@ -51,6 +54,8 @@ def admin_menu(user):
             view_all_reservations()
         elif choix == "9":
             view_statistics()
+        elif choix == "10":
+            generate_schedule()
         elif choix == "0":
             break
         else:
@@ -0,0 +1,169 @@
+"""Export et import de la base au format NDJSON (une ligne JSON par enregistrement).
+
+Chaque ligne est un objet {"collection": ..., "record": {...}}. Les deux sens sont
+des pipelines de générateurs qui ne gardent en mémoire qu'une ligne (export) ou
+qu'un lot de `batch_size` enregistrements (import) : la taille de l'archive n'a
+pas d'effet sur la mémoire utilisée. Avec le backend JSON, la base elle-même reste
+chargée en mémoire (cf. Database) ; avec SQLite, l'export lit par lots.
+
+À l'import, chaque enregistrement d'une collection ayant un modèle passe par son
+`from_dict` (valeurs par défaut des champs absents), les types des champs sont
+vérifiés, puis il est écrit par lots, une transaction par lot. Les collections
+dérivées (compteurs de statistiques, places libres) de l'archive sont ignorées :
+elles sont recalculées à partir des données importées.
+"""
+import gzip
+import json
+import sys
+from contextlib import contextmanager
+from dataclasses import fields
+from itertools import islice
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import storage
+from python.database import record_key
+from python.stats import rebuild_stats
+from python.models import Film, PlanSalle, Representation, Reservation, Salle_info, Salles, Utilisateur
+
+BATCH_SIZE = 1000
+
+# Modèle de chaque collection ; les autres (stats, availability, ...) sont importées telles quelles
+MODELS = {
+    'films': Film,
+    'salle_info': Salle_info,
+    'utilisateurs': Utilisateur,
+    'representations': Representation,
+    'reservations': Reservation,
+    'salles': Salles,
+    'seat_maps': PlanSalle,
+}
+
+# Collections recalculées après l'import plutôt que copiées depuis l'archive
+DERIVED = (storage.STATS_COLLECTION, storage.AVAILABILITY_COLLECTION)
+
+Record = Tuple[str, Dict[str, Any]]
+
+
+@contextmanager
+def open_archive(path: str, mode: str) -> Iterator[IO[str]]:
+    """Ouvre une archive en texte ('r' ou 'w') : '-' pour l'entrée/la sortie standard, compressée si elle finit par .gz"""
+    if path == '-':
+        yield sys.stdin if mode == 'r' else sys.stdout
+    elif path.endswith('.gz'):
+        with gzip.open(path, mode + 't', encoding='utf-8') as f:
+            yield f
+    else:
+        with open(path, mode, encoding='utf-8') as f:
+            yield f
+
+
+# ----- Export -----
+def export_lines(collections: Optional[Iterable[str]] = None) -> Iterator[Tuple[str, str]]:
+    """Couples (collection, ligne NDJSON) de tous les enregistrements"""
+    for collection, record in storage.iter_records(collections):
+        line = json.dumps({'collection': collection, 'record': record}, ensure_ascii=False, separators=(',', ':'))
+        yield collection, line + '\n'
+
+
+def export_ndjson(stream: IO[str], collections: Optional[Iterable[str]] = None) -> Dict[str, int]:
+    """Écrit la base dans `stream` et retourne le nombre d'enregistrements exportés par collection"""
+    counts: Dict[str, int] = {}
+    for collection, line in export_lines(collections):
+        stream.write(line)
+        counts[collection] = counts.get(collection, 0) + 1
+    return counts
+
+
+# ----- Import -----
+def parse_lines(lines: Iterable[str]) -> Iterator[Tuple[int, str, Dict[str, Any]]]:
+    """Triplets (numéro de ligne, collection, enregistrement) ; ValueError sur une ligne mal formée"""
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"Ligne {number}: JSON invalide ({e})")
+        if (not isinstance(entry, dict) or not isinstance(entry.get('collection'), str)
+                or not entry['collection'] or not isinstance(entry.get('record'), dict)):
+            raise ValueError(f"Ligne {number}: objet {{\"collection\": ..., \"record\": {{...}}}} attendu")
+        yield number, entry['collection'], entry['record']
+
+
+def _check_fields(obj: Any) -> None:
+    for f in fields(obj):
+        value = getattr(obj, f.name)
+        if f.type is int:
+            valid = isinstance(value, int) and not isinstance(value, bool)
+        elif f.type is str:
+            valid = isinstance(value, str)
+        elif f.type == List[str]:
+            valid = isinstance(value, list) and all(isinstance(item, str) for item in value)
+        else:
+            continue
+        if not valid:
+            raise ValueError(f"champ {f.name} invalide: {value!r}")
+
+
+def validate(entries: Iterable[Tuple[int, str, Dict[str, Any]]]) -> Iterator[Record]:
+    """Couples (collection, enregistrement) validés et normalisés par le from_dict du modèle"""
+    for number, collection, record in entries:
+        # Vérifiée avant from_dict, qui génère un id pour un enregistrement qui n'en a pas
+        if not record_key(collection, record):
+            raise ValueError(f"Ligne {number}: enregistrement {collection} sans identifiant")
+        model = MODELS.get(collection)
+        if model is not None:
+            try:
+                obj = model.from_dict(record)
+                _check_fields(obj)
+            except (TypeError, ValueError, AttributeError) as e:
+                raise ValueError(f"Ligne {number}: enregistrement {collection} invalide ({e})")
+            record = obj.to_dict()
+        yield collection, record
+
+
+def batched(records: Iterable[Record], size: int) -> Iterator[List[Record]]:
+    iterator = iter(records)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def import_ndjson(lines: Iterable[str], batch_size: int = BATCH_SIZE, replace: bool = False,
+                  dry_run: bool = False) -> Dict[str, int]:
+    """Importe une archive NDJSON et retourne le nombre d'enregistrements par collection.
+
+    Un enregistrement remplace celui de même clé. Avec `replace`, la base est vidée
+    dans la transaction du premier lot ; avec `dry_run`, l'archive est seulement
+    validée. Chaque lot est écrit dans sa propre transaction : si une ligne est
+    invalide, ValueError est levée et les lots précédents restent importés (valider
+    d'abord avec dry_run). Les enregistrements des collections DERIVED sont ignorés ;
+    dès qu'un lot a été écrit, compteurs et places libres sont recalculés.
+    """
+    if batch_size < 1:
+        raise ValueError("La taille des lots doit être positive")
+    counts: Dict[str, int] = {}
+    records = ((collection, record) for collection, record in validate(parse_lines(lines))
+               if collection not in DERIVED)
+    written = False
+    try:
+        for batch in batched(records, batch_size):
+            if not dry_run:
+                with storage.transaction() as db:
+                    if replace and not written:
+                        # Vidée seulement une fois le premier lot validé, dans sa transaction
+                        for collection in db.collections():
+                            for record in list(db.all(collection)):
+                                db.delete(collection, record_key(collection, record))
+                    for collection, record in batch:
+                        db.insert(collection, record)
+                written = True
+            for collection, _ in batch:
+                counts[collection] = counts.get(collection, 0) + 1
+    finally:
+        if written:
+            rebuild_stats(fix=True)
+            storage.rebuild_availability()
+    return counts
@@ -0,0 +1,518 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de verrou inter-processus
+    fcntl = None
+
+
+DbDict = Dict[str, List[Dict[str, Any]]]
+
+
+def record_key(collection: str, record: Dict[str, Any]) -> str:
+    """Clé identifiant un enregistrement dans sa collection"""
+    if collection == 'salles':
+        # Les plans de salle n'ont pas d'id propre : salle + représentations assignées
+        return '|'.join([record.get('salle_id', '')] + list(record.get('representation_id', [])))
+    if collection == 'seat_maps':
+        return record.get('representation_id', '')
+    return record.get('id', '')
+
+
+def _fsync_dir(directory: Path) -> None:
+    """Rend durable un renommage dans `directory` (sans effet sous Windows)"""
+    if os.name == 'nt':
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path: Path, payload: bytes) -> None:
+    """Écrit `payload` dans un fichier temporaire du même dossier, le synchronise puis le renomme sur `path`.
+
+    Un lecteur voit toujours soit l'ancien fichier complet, soit le nouveau.
+    """
+    path = Path(path)
+    fd, tmp_name = tempfile.mkstemp(prefix=f'.{path.name}.', suffix='.tmp', dir=path.parent)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
+    _fsync_dir(path.parent)
+
+
+class FileLock:
+    """Verrou lecteurs/rédacteur inter-processus (fcntl.flock) posé sur un fichier .lock.
+
+    `shared()` laisse passer plusieurs lecteurs, `exclusive()` sérialise les rédacteurs.
+    Le verrou est réentrant dans le processus : un `shared()` imbriqué dans un
+    `exclusive()` ne fait rien, l'inverse (promotion) lève RuntimeError.
+    Sans fcntl (Windows), seul le verrou entre threads est appliqué.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._fd: Optional[int] = None
+        self._pid = os.getpid()
+        self._depth = 0
+        self._exclusive = False
+        self._lock = threading.RLock()
+
+    @contextmanager
+    def shared(self) -> Iterator[None]:
+        with self._hold(exclusive=False):
+            yield
+
+    @contextmanager
+    def exclusive(self) -> Iterator[None]:
+        with self._hold(exclusive=True):
+            yield
+
+    @contextmanager
+    def _hold(self, exclusive: bool) -> Iterator[None]:
+        with self._lock:
+            if self._depth == 0:
+                self._acquire(exclusive)
+            elif exclusive and not self._exclusive:
+                # flock ne convertit pas un verrou partagé de façon atomique
+                raise RuntimeError("Impossible de passer d'un verrou partagé à un verrou exclusif")
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._release()
+
+    def _acquire(self, exclusive: bool) -> None:
+        self._exclusive = exclusive
+        if fcntl is None:
+            return
+        if self._fd is None or self._pid != os.getpid():
+            # Après un fork, le descripteur hérité partagerait le verrou du parent
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            self._pid = os.getpid()
+        fcntl.flock(self._fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+
+    def _release(self) -> None:
+        if fcntl is not None and self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+
+# Index secondaires maintenus à chaque mutation : collection -> champs indexés
+SECONDARY_INDEXES = {
+    'reservations': ('utilisateur_id', 'representation_id', 'film_id', 'salle_id'),
+    'representations': ('film_id',),
+    'salles': ('representation_id', 'salle_id'),
+    'salle_info': ('id_representations',),  # représentation -> salle assignée
+    'seat_maps': ('salle_id',),
+}
+
+
+class Database:
+    """Handle en mémoire sur db.json.
+
+    Le fichier est lu une seule fois puis gardé en cache ; il n'est relu que si
+    sa date de modification ou sa taille change (écriture par un autre processus).
+
+    Chaque collection est gardée comme un dictionnaire ordonné `clé -> enregistrement`
+    (index de clé primaire), complété d'un index `email -> utilisateur` : les accès
+    par id ou par email sont en O(1). Les champs de SECONDARY_INDEXES ont en plus un
+    index `valeur -> clés` (une entrée par élément pour les champs de type liste).
+
+    En mode journal, chaque mutation (insert/update/delete) est ajoutée comme une
+    ligne JSON à db.json.wal au lieu de réécrire toute la base ; le journal est
+    rejoué au chargement et compacté dans db.json toutes les `compact_every` écritures.
+
+    Le snapshot est écrit de façon atomique (fichier temporaire + fsync + os.replace) ;
+    avec `backups` > 0, les `backups` derniers snapshots sont gardés en db.json.1, .2, ...
+
+    Les processus se coordonnent par un verrou sur db.json.lock : partagé pour relire
+    le disque, exclusif pour écrire. `transaction()` regroupe plusieurs mutations sous
+    le verrou exclusif et les écrit en une seule ligne du journal (tout ou rien).
+    """
+
+    def __init__(self, path: Path, empty_factory: Callable[[], DbDict],
+                 journal: bool = True, compact_every: int = 500, backups: int = 0):
+        self.path = Path(path)
+        self.journal_path = self.path.with_name(self.path.name + '.wal')
+        self.journal = journal
+        self.compact_every = compact_every
+        self.backups = backups
+        self._empty_factory = empty_factory
+        self._tables: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None
+        self._emails: Dict[str, str] = {}
+        self._secondary: Dict[Tuple[str, str], Dict[Any, Dict[str, None]]] = {}
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._journal_stamp: Optional[Tuple[int, int]] = None
+        self._journal_offset = 0
+        self._journal_entries = 0
+        self._pending: Optional[List[Dict[str, Any]]] = None
+        self._generation = 0
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(self.path.with_name(self.path.name + '.lock'))
+
+    @staticmethod
+    def _stat(path: Path) -> Optional[Tuple[int, int]]:
+        """Retourne (mtime_ns, taille) du fichier, ou None s'il n'existe pas"""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    # ----- Lecture -----
+    def _refresh(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Recharge le cache seulement si db.json ou le journal ont changé"""
+        with self._lock:
+            if self._tables is not None and not self._changed():
+                return self._tables
+            if self._stat(self.path) is None and self._stat(self.journal_path) is None:
+                with self._file_lock.exclusive():  # création du fichier
+                    self._reload()
+            else:
+                with self._file_lock.shared():
+                    self._reload()
+            return self._tables
+
+    def _changed(self) -> bool:
+        if self._stat(self.path) != self._stamp:
+            return True
+        return self.journal and self._stat(self.journal_path) != self._journal_stamp
+
+    def _reload(self) -> None:
+        stamp = self._stat(self.path)
+        if stamp is None and self._stat(self.journal_path) is None:
+            self.save(self._empty_factory())
+        elif self._tables is None or stamp != self._stamp:
+            self._load_snapshot(stamp)
+        if self.journal and self._stat(self.journal_path) != self._journal_stamp:
+            self._replay_journal()
+
+    @property
+    def generation(self) -> int:
+        """Numéro de version du cache, incrémenté à chaque mutation ou rechargement.
+
+        Permet aux index dérivés (plannings des salles, ...) de savoir s'ils sont à jour.
+        """
+        with self._lock:
+            self._refresh()
+            return self._generation
+
+    def data(self) -> DbDict:
+        """Retourne toutes les collections sous forme de listes (enregistrements partagés avec le cache)"""
+        with self._lock:
+            return {collection: list(table.values()) for collection, table in self._refresh().items()}
+
+    def all(self, collection: str) -> List[Dict[str, Any]]:
+        """Retourne les enregistrements d'une collection, dans l'ordre d'insertion"""
+        with self._lock:
+            return list(self._refresh().get(collection, {}).values())
+
+    def collections(self) -> List[str]:
+        """Noms des collections de la base"""
+        with self._lock:
+            return list(self._refresh())
+
+    def iter_records(self, collections: Optional[Iterable[str]] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Parcourt les couples (collection, enregistrement), collection par collection.
+
+        Les tables sont déjà en mémoire : seule la liste des références de chaque
+        collection est copiée sous le verrou, ce qui donne une vue cohérente de la base.
+        """
+        with self._lock:
+            tables = self._refresh()
+            names = list(tables) if collections is None else list(collections)
+            snapshot = [(name, list(tables.get(name, {}).values())) for name in names]
+        for name, records in snapshot:
+            for record in records:
+                yield name, record
+
+    def get(self, collection: str, key: str) -> Optional[Dict[str, Any]]:
+        """Retourne l'enregistrement de clé `key`, ou None"""
+        with self._lock:
+            return self._refresh().get(collection, {}).get(key)
+
+    def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        """Retourne l'utilisateur dont l'email correspond (sans tenir compte de la casse)"""
+        with self._lock:
+            tables = self._refresh()
+            key = self._emails.get(email.casefold())
+            return tables.get('utilisateurs', {}).get(key) if key is not None else None
+
+    def find(self, collection: str, field: str, value: Any) -> List[Dict[str, Any]]:
+        """Retourne les enregistrements dont `field` vaut (ou contient) `value`, via l'index secondaire"""
+        with self._lock:
+            tables = self._refresh()
+            if field not in SECONDARY_INDEXES.get(collection, ()):
+                raise KeyError(f"Pas d'index sur {collection}.{field}")
+            table = tables.get(collection, {})
+            keys = self._secondary.get((collection, field), {}).get(value, {})
+            return [table[key] for key in keys]
+
+    def _load_snapshot(self, stamp: Optional[Tuple[int, int]]) -> None:
+        if stamp is None:
+            raw = self._empty_factory()
+        else:
+            with self.path.open('r', encoding='utf-8') as f:
+                raw = json.load(f)
+        self._build(raw)
+        # stat pris avant la lecture : au pire on relira une fois de trop
+        self._stamp = stamp
+        self._journal_stamp = None
+        self._journal_offset = 0
+        self._journal_entries = 0
+
+    def _build(self, raw: DbDict) -> None:
+        """Construit les tables indexées à partir des listes de db.json"""
+        self._generation += 1
+        self._tables = {}
+        self._emails = {}
+        self._secondary = {}
+        for collection, records in raw.items():
+            table = self._tables.setdefault(collection, {})
+            for record in records:
+                key = record_key(collection, record)
+                # Doublons (anciens plans de salle) : le premier fait foi, comme à la lecture
+                if key not in table:
+                    self._put(collection, key, record)
+
+    def _replay_journal(self) -> None:
+        """Applique les lignes du journal écrites depuis la dernière lecture"""
+        try:
+            f = self.journal_path.open('rb')
+        except FileNotFoundError:
+            self._journal_stamp = None
+            self._journal_offset = 0
+            return
+        with f:
+            st = os.fstat(f.fileno())
+            if st.st_size < self._journal_offset:
+                # Journal compacté par un autre processus : repartir du snapshot
+                self._load_snapshot(self._stat(self.path))
+            f.seek(self._journal_offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # ligne en cours d'écriture, relue au prochain accès
+                self._journal_offset += len(line)
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                self._apply(entry)
+                self._journal_entries += 1
+            self._journal_stamp = (st.st_mtime_ns, st.st_size)
+
+    # ----- Écriture -----
+    def save(self, data: DbDict) -> None:
+        """Écrit toute la base sur disque, vide le journal et met à jour le cache"""
+        with self._lock, self._file_lock.exclusive():
+            if self._pending is not None:
+                self._pending.clear()  # le snapshot remplace les mutations en attente
+            try:
+                payload = json.dumps(data, ensure_ascii=False, indent=2, separators=(',', ':')).encode('utf-8')
+                if self.backups > 0:
+                    self._rotate_backups()
+                atomic_write(self.path, payload)
+                # Le journal n'est vidé qu'une fois le snapshot durable (rejouer est idempotent)
+                if self._stat(self.journal_path) is not None:
+                    with self.journal_path.open('wb') as f:
+                        os.fsync(f.fileno())
+            except Exception:
+                self.invalidate()
+                raise
+            self._build(data)
+            self._stamp = self._stat(self.path)
+            self._journal_stamp = self._stat(self.journal_path)
+            self._journal_offset = 0
+            self._journal_entries = 0
+
+    def backup_path(self, n: int) -> Path:
+        """Chemin du n-ième snapshot de sauvegarde (1 = le plus récent)"""
+        return self.path.with_name(f'{self.path.name}.{n}')
+
+    def _rotate_backups(self) -> None:
+        """Décale db.json.1 -> db.json.2 ... et garde une copie du snapshot courant en db.json.1"""
+        if not self.path.exists():
+            return
+        for n in range(self.backups - 1, 0, -1):
+            if self.backup_path(n).exists():
+                os.replace(self.backup_path(n), self.backup_path(n + 1))
+        # Lien dur si possible (pas de copie), sinon copie : db.json reste en place pour les lecteurs
+        try:
+            os.link(self.path, self.backup_path(1))
+        except OSError:
+            shutil.copy2(self.path, self.backup_path(1))
+
+    def compact(self) -> None:
+        """Réécrit le snapshot db.json à partir du cache et tronque le journal"""
+        with self._lock, self._file_lock.exclusive():
+            self.save(self.data())
+
+    def insert(self, collection: str, record: Dict[str, Any]) -> None:
+        """Ajoute un enregistrement (remplace celui de même clé s'il existe)"""
+        self._mutate({'op': 'insert', 'collection': collection, 'record': record})
+
+    def update(self, collection: str, key: str, record: Dict[str, Any]) -> None:
+        """Remplace l'enregistrement de clé `key` (ignoré s'il n'existe pas)"""
+        self._mutate({'op': 'update', 'collection': collection, 'key': key, 'record': record})
+
+    def delete(self, collection: str, key: str) -> None:
+        """Supprime l'enregistrement de clé `key` s'il existe"""
+        self._mutate({'op': 'delete', 'collection': collection, 'key': key})
+
+    @contextmanager
+    def transaction(self) -> Iterator['Database']:
+        """Regroupe lectures et mutations sous le verrou exclusif.
+
+        Le cache est relu depuis le disque à l'ouverture ; les mutations sont écrites
+        ensemble à la sortie du bloc le plus externe. Si une exception en sort, rien
+        n'est écrit et le cache est relu depuis le disque (les blocs imbriqués font
+        partie de la transaction englobante).
+        """
+        with self._lock, self._file_lock.exclusive():
+            outer = self._pending is None
+            if outer:
+                self._refresh()
+                self._pending = []
+            try:
+                yield self
+            except BaseException:
+                if outer:
+                    pending, self._pending = self._pending, None
+                    if pending:
+                        self.invalidate()  # le cache contient des mutations non écrites
+                raise
+            if outer:
+                pending, self._pending = self._pending, None
+                try:
+                    self._commit(pending)
+                except BaseException:
+                    self.invalidate()
+                    raise
+
+    def _mutate(self, entry: Dict[str, Any]) -> None:
+        with self.transaction():
+            self._apply(entry)
+            self._pending.append(entry)
+
+    def _commit(self, pending: List[Dict[str, Any]]) -> None:
+        if not pending:
+            return
+        if not self.journal:
+            self.compact()
+            return
+        # Une seule ligne par transaction : une ligne tronquée est ignorée en entier au rejeu
+        self._append(pending[0] if len(pending) == 1 else {'ops': pending})
+        if self._journal_entries >= self.compact_every:
+            self.compact()
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        payload = (json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+        with self.journal_path.open('ab') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+            self._journal_offset = f.tell()
+        self._journal_stamp = self._stat(self.journal_path)
+        self._journal_entries += 1
+
+    def _apply(self, entry: Dict[str, Any]) -> None:
+        """Applique une entrée du journal au cache (opérations idempotentes)"""
+        self._generation += 1
+        if 'ops' in entry:
+            for op_entry in entry['ops']:
+                self._apply(op_entry)
+            return
+        collection = entry.get('collection')
+        table = self._tables.setdefault(collection, {})
+        op = entry.get('op')
+        if op == 'insert':
+            record = entry['record']
+            self._put(collection, record_key(collection, record), record)
+        elif op == 'update':
+            key = entry['key']
+            if key in table:
+                record = entry['record']
+                new_key = record_key(collection, record)
+                if new_key != key:
+                    self._remove(collection, key)
+                self._put(collection, new_key, record)
+        elif op == 'delete':
+            self._remove(collection, entry['key'])
+
+    # ----- Index -----
+    def _put(self, collection: str, key: str, record: Dict[str, Any]) -> None:
+        table = self._tables.setdefault(collection, {})
+        old = table.get(key)
+        if old is not None:
+            self._unindex(collection, key, old, record)
+        table[key] = record
+        if collection == 'utilisateurs' and record.get('email'):
+            self._emails[record['email'].casefold()] = key
+        for field in SECONDARY_INDEXES.get(collection, ()):
+            index = self._secondary.setdefault((collection, field), {})
+            for value in self._index_values(record.get(field)):
+                index.setdefault(value, {})[key] = None
+
+    def _remove(self, collection: str, key: str) -> None:
+        old = self._tables.setdefault(collection, {}).pop(key, None)
+        if old is not None:
+            self._unindex(collection, key, old)
+
+    def _unindex(self, collection: str, key: str, record: Dict[str, Any],
+                 replacement: Optional[Dict[str, Any]] = None) -> None:
+        """Retire `record` des index (sauf les valeurs conservées par `replacement`, pour garder l'ordre)"""
+        if collection == 'utilisateurs' and record.get('email'):
+            email = record['email'].casefold()
+            if self._emails.get(email) == key:
+                del self._emails[email]
+        for field in SECONDARY_INDEXES.get(collection, ()):
+            kept = self._index_values(replacement.get(field)) if replacement is not None else ()
+            index = self._secondary.get((collection, field), {})
+            for value in self._index_values(record.get(field)):
+                if value in kept:
+                    continue
+                keys = index.get(value)
+                if keys is not None:
+                    keys.pop(key, None)
+                    if not keys:
+                        del index[value]
+
+    @staticmethod
+    def _index_values(value: Any) -> Tuple[Any, ...]:
+        if value is None:
+            return ()
+        if isinstance(value, list):
+            return tuple(value)
+        return (value,)
+
+    def invalidate(self) -> None:
+        """Vide le cache : la prochaine lecture relira le fichier"""
+        with self._lock:
+            self._generation += 1
+            self._tables = None
+            self._emails = {}
+            self._secondary = {}
+            self._stamp = None
+            self._journal_stamp = None
+            self._journal_offset = 0
+            self._journal_entries = 0
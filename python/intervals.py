@@ -0,0 +1,136 @@
+"""Index d'intervalles horaires pour détecter les conflits de planning d'une salle.
+
+Les horaires 'HH:MM' sont convertis en minutes depuis minuit ; une séance qui se
+termine après minuit (fin <= début) s'étend au-delà de DAY. Les intervalles sont
+semi-ouverts [début, fin) : une séance peut commencer à la minute où la
+précédente se termine (plus le tampon de nettoyage éventuel).
+
+IntervalIndex garde les intervalles triés par début avec, pour chaque position,
+la plus grande fin des intervalles précédents. Une requête fait une recherche
+dichotomique puis remonte les candidats tant que cette fin maximale dépasse le
+début cherché : O(log n + k), k étant le nombre d'intervalles parcourus. k compte
+les séances qui chevauchent le créneau, plus celles qui commencent après une
+séance plus longue encore en cours ; au pire O(n).
+"""
+from bisect import bisect_left, bisect_right
+from typing import Hashable, Iterable, List, Optional, Tuple
+
+DAY = 24 * 60  # minutes
+
+
+def parse_horaire(horaire: str) -> int:
+    """Convertit 'HH:MM' en minutes depuis minuit (ValueError si le format est invalide)"""
+    try:
+        heures, minutes = horaire.strip().split(':')
+        h, m = int(heures), int(minutes)
+    except (AttributeError, ValueError):
+        raise ValueError(f"Horaire invalide: {horaire!r} (format attendu HH:MM)")
+    if not (0 <= h < 24 and 0 <= m < 60):
+        raise ValueError(f"Horaire invalide: {horaire!r} (format attendu HH:MM)")
+    return h * 60 + m
+
+
+def format_horaire(minutes: int) -> str:
+    """Convertit des minutes (éventuellement au-delà de minuit) en 'HH:MM'"""
+    minutes %= DAY
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def interval(horaire: str, horaire_fin: str) -> Tuple[int, int]:
+    """Intervalle [début, fin) en minutes d'une séance ; la fin passe au lendemain si elle précède le début"""
+    start, end = parse_horaire(horaire), parse_horaire(horaire_fin)
+    if end <= start:
+        end += DAY
+    return start, end
+
+
+class IntervalIndex:
+    """Intervalles [début, fin) d'une salle, triés par début, avec la fin maximale cumulée"""
+
+    def __init__(self, intervals: Iterable[Tuple[int, int, Hashable]] = ()):
+        items = sorted(intervals, key=lambda item: (item[0], item[1]))
+        self._starts: List[int] = [s for s, _, _ in items]
+        self._ends: List[int] = [e for _, e, _ in items]
+        self._ids: List[Hashable] = [i for _, _, i in items]
+        self._max_end: List[int] = []
+        self._rebuild_max(0)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __iter__(self):
+        return iter(zip(self._starts, self._ends, self._ids))
+
+    def _rebuild_max(self, position: int) -> None:
+        del self._max_end[position:]
+        current = self._max_end[-1] if self._max_end else float('-inf')
+        for end in self._ends[position:]:
+            current = max(current, end)
+            self._max_end.append(current)
+
+    def add(self, start: int, end: int, item_id: Hashable) -> None:
+        if end <= start:
+            raise ValueError("La fin d'un intervalle doit suivre son début")
+        position = bisect_right(self._starts, start)
+        self._starts.insert(position, start)
+        self._ends.insert(position, end)
+        self._ids.insert(position, item_id)
+        self._rebuild_max(position)
+
+    def remove(self, item_id: Hashable) -> bool:
+        """Retire l'intervalle `item_id` ; retourne False s'il n'est pas dans l'index"""
+        try:
+            position = self._ids.index(item_id)
+        except ValueError:
+            return False
+        del self._starts[position], self._ends[position], self._ids[position]
+        self._rebuild_max(position)
+        return True
+
+    def _collect(self, lo: int, hi: int, found: List[Hashable], first_only: bool) -> None:
+        # Candidats : les intervalles qui commencent avant hi ; ils chevauchent [lo, hi) si leur fin dépasse lo
+        j = bisect_left(self._starts, hi) - 1
+        while j >= 0 and self._max_end[j] > lo:
+            if self._ends[j] > lo:
+                found.append(self._ids[j])
+                if first_only:
+                    return
+            j -= 1
+
+    def _overlaps(self, start: int, end: int, buffer: int, exclude: Optional[Hashable], first_only: bool) -> List[Hashable]:
+        found: List[Hashable] = []
+        # Décalages d'un jour : une séance après minuit gêne celles du début de journée et inversement
+        for shift in (0, DAY, -DAY):
+            self._collect(start + shift - buffer, end + shift + buffer, found, first_only and exclude is None)
+            found = [i for i in found if i != exclude]
+            if first_only and found:
+                break
+        return list(dict.fromkeys(found))
+
+    def overlaps(self, start: int, end: int, buffer: int = 0, exclude: Optional[Hashable] = None) -> List[Hashable]:
+        """Identifiants des intervalles à moins de `buffer` minutes de [start, end)"""
+        return self._overlaps(start, end, buffer, exclude, first_only=False)
+
+    def is_free(self, start: int, end: int, buffer: int = 0, exclude: Optional[Hashable] = None) -> bool:
+        return not self._overlaps(start, end, buffer, exclude, first_only=True)
+
+    def free_slots(self, duration: int, buffer: int = 0, day_start: int = 0,
+                   day_end: int = DAY) -> List[Tuple[int, int]]:
+        """Fenêtres libres (début, fin) de [day_start, day_end] pouvant accueillir une séance de `duration` minutes.
+
+        Chaque séance existante est élargie de `buffer` minutes de chaque côté :
+        toute séance placée entièrement dans une fenêtre respecte le tampon.
+        """
+        busy = sorted((s + shift - buffer, e + shift + buffer)
+                      for s, e in zip(self._starts, self._ends) for shift in (-DAY, 0, DAY))
+        slots: List[Tuple[int, int]] = []
+        cursor = day_start
+        for start, end in busy:
+            if start >= day_end:
+                break
+            if start - cursor >= duration:
+                slots.append((cursor, start))
+            cursor = max(cursor, end)
+        if day_end - cursor >= duration:
+            slots.append((cursor, day_end))
+        return slots
@@ -1,8 +1,10 @@
 from dataclasses import dataclass, field, asdict
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 import uuid
 import os
+import base64
 import hashlib
+import hmac
 import binascii
 from datetime import datetime
 
@@ -14,9 +16,17 @@ def gen_id() -> str:
 
 # Constants
 SALT_LENGTH = 16
-ITERATIONS = 100_000
+# Coût PBKDF2 des nouveaux hash (surchargeable par CYNEMA_PASSWORD_ITERATIONS) ;
+# les hash plus faibles sont recalculés à la connexion suivante
+ITERATIONS = int(os.environ.get('CYNEMA_PASSWORD_ITERATIONS', 100_000))
+# Coût des hash enregistrés avant que password_iterations existe
+LEGACY_ITERATIONS = 100_000
 PASSWORD_ALGORITHM = 'sha256'
 
+# Tarifs des places (€)
+PRIX_NORMAL = 9.0
+PRIX_VIP = 15.0
+
 
 @dataclass
 class Film:
@@ -77,6 +87,7 @@ class Utilisateur:
     password_salt: str = ''  # hex
     password_hash: str = ''  # hex
     id: str = field(default_factory=gen_id)
+    password_iterations: int = LEGACY_ITERATIONS
 
     def to_dict(self) -> dict:
         return asdict(self)
@@ -93,16 +104,18 @@ class Utilisateur:
             password_salt=d.get('password_salt', ''),
             password_hash=d.get('password_hash', ''),
             id=d.get('id', gen_id()),
+            password_iterations=d.get('password_iterations', LEGACY_ITERATIONS),
         )
 
     def set_password(self, password: str) -> None:
-        """Hash and set password using PBKDF2-HMAC-SHA256."""
+        """Hash and set password using PBKDF2-HMAC-SHA256 (ITERATIONS tours)."""
         if not password or len(password) < 6:
             raise ValueError("Le mot de passe doit contenir au moins 6 caractères")
         salt = os.urandom(SALT_LENGTH)
         key = hashlib.pbkdf2_hmac(PASSWORD_ALGORITHM, password.encode('utf-8'), salt, ITERATIONS)
         self.password_salt = binascii.hexlify(salt).decode('ascii')
         self.password_hash = binascii.hexlify(key).decode('ascii')
+        self.password_iterations = ITERATIONS
 
     def verify_password(self, password: str) -> bool:
         """Vérifie si le mot de passe fourni correspond au hash stocké"""
@@ -110,10 +123,14 @@ class Utilisateur:
             return False
         try:
             salt = binascii.unhexlify(self.password_salt)
-            key = hashlib.pbkdf2_hmac(PASSWORD_ALGORITHM, password.encode('utf-8'), salt, ITERATIONS)
-            return binascii.hexlify(key).decode('ascii') == self.password_hash
+            key = hashlib.pbkdf2_hmac(PASSWORD_ALGORITHM, password.encode('utf-8'), salt, self.password_iterations)
+            return hmac.compare_digest(binascii.hexlify(key).decode('ascii'), self.password_hash)
         except Exception:
             return False
+
+    def needs_rehash(self) -> bool:
+        """Vrai si le hash a été calculé avec moins de tours que ITERATIONS"""
+        return self.password_iterations < ITERATIONS
     
     def calculate_age(self) -> int:
         """Calcule l'âge de l'utilisateur à partir de sa date de naissance (format YYYY-MM-DD)"""
@@ -137,17 +154,186 @@ class Utilisateur:
     def is_admin(self) -> bool:
         """Vérifie si l'utilisateur est administrateur"""
         return self.role == 'admin'
-    
+
+
+class SeatRow:
+    """Vue sur une rangée d'un SeatMap : row[c] vaut 'o' (libre) ou 'x' (occupée)"""
+    __slots__ = ('_map', '_row')
+
+    def __init__(self, seat_map: 'SeatMap', row: int):
+        self._map = seat_map
+        self._row = row
+
+    def __len__(self) -> int:
+        return self._map.cols
+
+    def __getitem__(self, col: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(col, slice):
+            return [self[c] for c in range(*col.indices(len(self)))]
+        return SeatMap.TAKEN if self._map.is_taken(self._row, self._index(col)) else SeatMap.FREE
+
+    def __setitem__(self, col: int, value: str) -> None:
+        self._map.set_taken(self._row, self._index(col), SeatMap.parse_state(value))
+
+    def __iter__(self) -> Iterator[str]:
+        for col in range(len(self)):
+            yield self[col]
+
+    def __eq__(self, other: Any) -> bool:
+        return list(self) == list(other) if isinstance(other, (list, SeatRow)) else NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+    def _index(self, col: int) -> int:
+        if col < 0:
+            col += len(self)
+        if not 0 <= col < len(self):
+            raise IndexError("Colonne hors du plan de salle")
+        return col
+
+    def count(self, value: str) -> int:
+        """Nombre de places dans l'état `value` ('o' ou 'x') sur la rangée"""
+        taken = self._map.row_taken_count(self._row)
+        return taken if SeatMap.parse_state(value) else len(self) - taken
+
+
+class SeatMap:
+    """Plan de salle compact : un bit par place (1 = occupée) dans un bytearray.
+
+    Chaque rangée occupe un nombre entier d'octets. Le plan s'utilise comme
+    l'ancienne liste de listes (`plan[r][c]`, `plan[r][c] = 'x'`, `len`, itération)
+    et se sérialise en {'rows', 'cols', 'bits' (base64)}.
+    """
+    FREE = 'o'
+    TAKEN = 'x'
+    __slots__ = ('rows', 'cols', '_stride', '_bits')
+
+    def __init__(self, rows: int = 0, cols: int = 0, bits: Optional[bytes] = None):
+        self.rows = max(0, int(rows))
+        self.cols = max(0, int(cols))
+        self._stride = (self.cols + 7) // 8
+        size = self.rows * self._stride
+        if bits is not None and len(bits) != size:
+            raise ValueError("Taille du plan de salle incohérente")
+        self._bits = bytearray(bits) if bits is not None else bytearray(size)
+
+    @staticmethod
+    def parse_state(value: str) -> bool:
+        """'x' -> True (occupée), 'o' -> False (libre)"""
+        state = str(value).lower()
+        if state == SeatMap.TAKEN:
+            return True
+        if state == SeatMap.FREE:
+            return False
+        raise ValueError(f"État de place invalide: {value}")
+
+    # ----- Construction / sérialisation -----
+    @classmethod
+    def from_rows(cls, rows: List[List[str]]) -> 'SeatMap':
+        """Construit un plan depuis l'ancien format liste de listes de 'o'/'x'"""
+        seat_map = cls(len(rows), max((len(row) for row in rows), default=0))
+        for r, row in enumerate(rows):
+            for c in range(seat_map.cols):
+                # Rangées incomplètes : les cases manquantes ne sont pas des places libres
+                if c >= len(row) or row[c] != cls.FREE:
+                    seat_map.set_taken(r, c)
+        return seat_map
+
+    @classmethod
+    def from_value(cls, value: Any) -> 'SeatMap':
+        """Accepte un SeatMap, le format sérialisé (dict) ou l'ancien format liste de listes"""
+        if isinstance(value, SeatMap):
+            return value.copy()
+        if not value:
+            return cls()
+        if isinstance(value, dict):
+            return cls(value.get('rows', 0), value.get('cols', 0), base64.b64decode(value.get('bits', '')))
+        return cls.from_rows(value)
+
+    def to_dict(self) -> dict:
+        return {'rows': self.rows, 'cols': self.cols, 'bits': base64.b64encode(bytes(self._bits)).decode('ascii')}
+
+    def to_rows(self) -> List[List[str]]:
+        return [list(row) for row in self]
+
+    def copy(self) -> 'SeatMap':
+        return SeatMap(self.rows, self.cols, self._bits)
+
+    def __deepcopy__(self, memo: dict) -> 'SeatMap':
+        return self.copy()
+
+    # ----- Accès aux places -----
+    def is_taken(self, row: int, col: int) -> bool:
+        return bool(self._bits[row * self._stride + (col >> 3)] & (1 << (col & 7)))
+
+    def set_taken(self, row: int, col: int, taken: bool = True) -> None:
+        index = row * self._stride + (col >> 3)
+        if taken:
+            self._bits[index] |= 1 << (col & 7)
+        else:
+            self._bits[index] &= ~(1 << (col & 7)) & 0xFF
+
+    def row_taken_count(self, row: int) -> int:
+        start = row * self._stride
+        return bin(int.from_bytes(self._bits[start:start + self._stride], 'little')).count('1')
+
+    def free_runs(self, row: int) -> List[Tuple[int, int]]:
+        """Suites de places libres consécutives d'une rangée : (colonne de début, longueur)"""
+        start = row * self._stride
+        free = ~int.from_bytes(self._bits[start:start + self._stride], 'little') & ((1 << self.cols) - 1)
+        runs = []
+        while free:
+            col = (free & -free).bit_length() - 1
+            shifted = free >> col
+            length = ((shifted + 1) & ~shifted).bit_length() - 1  # position du premier bit occupé
+            runs.append((col, length))
+            free &= ~(((1 << length) - 1) << col)
+        return runs
+
+    def taken_count(self) -> int:
+        return bin(int.from_bytes(self._bits, 'little')).count('1')
+
+    def available_count(self) -> int:
+        return self.rows * self.cols - self.taken_count()
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __getitem__(self, row: int) -> SeatRow:
+        if row < 0:
+            row += self.rows
+        if not 0 <= row < self.rows:
+            raise IndexError("Rangée hors du plan de salle")
+        return SeatRow(self, row)
+
+    def __iter__(self) -> Iterator[SeatRow]:
+        for row in range(self.rows):
+            yield SeatRow(self, row)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, SeatMap):
+            return (self.rows, self.cols, self._bits) == (other.rows, other.cols, other._bits)
+        if isinstance(other, list):
+            return self.to_rows() == [list(row) for row in other]
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"SeatMap(rows={self.rows}, cols={self.cols}, libres={self.available_count()})"
+
+
 @dataclass
 class Representation:
     film_id: str
     horaire: str
     horaire_fin: str
     id: str = field(default_factory=gen_id)
-    seating_map: List[List[str]] = field(default_factory=list)
+    seating_map: SeatMap = field(default_factory=SeatMap)
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        d = asdict(self)
+        d['seating_map'] = self.seating_map.to_dict()
+        return d
 
     @staticmethod
     def from_dict(d: dict) -> 'Representation':
@@ -156,20 +342,18 @@ class Representation:
             horaire=d.get('horaire', ''),
             horaire_fin=d.get('horaire_fin', ''),
             id=d.get('id', gen_id()),
-            seating_map=d.get('seating_map', []),
+            seating_map=SeatMap.from_value(d.get('seating_map')),
         )
 
     def generate_map_from_salle(self, salle: 'Salle_info') -> None:
         """Crée une grille de places à partir de la configuration de la salle"""
         rows = max(0, int(salle.nombre_rangees_total))
         cols = max(0, int(salle.nombre_colonnes))
-        self.seating_map = [['o' for _ in range(cols)] for _ in range(rows)]
+        self.seating_map = SeatMap(rows, cols)
     
     def get_available_seats_count(self) -> int:
         """Compte le nombre de places disponibles"""
-        if not self.seating_map:
-            return 0
-        return sum(row.count('o') for row in self.seating_map)
+        return self.seating_map.available_count()
     
     def get_seat_label(self, row: int, col: int) -> str:
         """Retourne le label d'une place (ex: A1, B5)"""
@@ -231,16 +415,39 @@ class Reservation:
 class Salles:
     salle_id: str
     representation_id: List[str] = field(default_factory=list)
-    # seating_map is stored as a 2D list (rows x cols) of 'O'/'X'
-    seating_map: List[List[str]] = field(default_factory=list)
+    # seating_map: plan compact (cf. SeatMap), lu aussi depuis l'ancien format 2D de 'o'/'x'
+    seating_map: SeatMap = field(default_factory=SeatMap)
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        d = asdict(self)
+        d['seating_map'] = self.seating_map.to_dict()
+        return d
 
     @staticmethod
     def from_dict(d: dict) -> 'Salles':
         return Salles(
             salle_id=d.get('salle_id', ''),
             representation_id=d.get('representation_id', []),
-            seating_map=d.get('seating_map', {}),
+            seating_map=SeatMap.from_value(d.get('seating_map')),
+        )
+
+
+@dataclass
+class PlanSalle:
+    """Plan de salle d'une représentation (collection seat_maps, une entrée par représentation)"""
+    representation_id: str
+    salle_id: str
+    seating_map: SeatMap = field(default_factory=SeatMap)
+
+    def to_dict(self) -> dict:
+        d = asdict(self)
+        d['seating_map'] = self.seating_map.to_dict()
+        return d
+
+    @staticmethod
+    def from_dict(d: dict) -> 'PlanSalle':
+        return PlanSalle(
+            representation_id=d.get('representation_id', ''),
+            salle_id=d.get('salle_id', ''),
+            seating_map=SeatMap.from_value(d.get('seating_map')),
         )
\ No newline at end of file
@@ -0,0 +1,164 @@
+"""Génération automatique du programme des salles.
+
+Le modèle ne connaît pas de dates : une représentation est un horaire
+quotidien. Le générateur construit donc le programme d'une journée type
+(répété chaque jour de la semaine) : des représentations sans conflit, placées
+dans les salles entre l'ouverture et la fermeture.
+
+Heuristique gloutonne : la salle libre le plus tôt (la plus grande d'abord à
+égalité) reçoit le film qui rapporte le plus de spectateurs attendus par minute
+occupée. Une séance de film remplit `capacité x demande` places, et chaque
+séance supplémentaire du même film voit sa demande multipliée par DECAY.
+Les séances déjà assignées aux salles sont conservées et contournées.
+"""
+import heapq
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+import storage
+from python.intervals import DAY, IntervalIndex, format_horaire, parse_horaire
+from python.models import Film, Representation, Salle_info
+
+# Part de la demande restante pour chaque séance supplémentaire d'un même film
+DECAY = 0.7
+# Les séances commencent sur un multiple de PAS minutes
+PAS = 5
+
+
+@dataclass
+class ScheduledShow:
+    film_id: str
+    salle_id: str
+    horaire: str
+    horaire_fin: str
+    places_attendues: float = 0.0
+
+    @property
+    def representation_id(self) -> str:
+        return f"{self.film_id}_{self.horaire}_{self.horaire_fin}"
+
+
+def _expected(capacite: int, demande: float, deja_programmees: int) -> float:
+    return capacite * min(1.0, demande * DECAY ** deja_programmees)
+
+
+def plan_schedule(ouverture: str = '10:00', fermeture: str = '23:30',
+                  demande: Optional[Dict[str, float]] = None, buffer: Optional[int] = None,
+                  films: Optional[List[Film]] = None, salles: Optional[List[Salle_info]] = None) -> List[ScheduledShow]:
+    """Calcule un programme sans conflit pour la journée (rien n'est écrit).
+
+    `demande` associe à un film son taux de remplissage attendu pour sa première
+    séance (1.0 par défaut). Une fermeture antérieure à l'ouverture se situe le
+    lendemain. `buffer` est le nettoyage entre deux séances (CLEANING_BUFFER par défaut).
+    """
+    buffer = storage.CLEANING_BUFFER if buffer is None else buffer
+    debut = parse_horaire(ouverture)
+    fin = parse_horaire(fermeture)
+    if fin <= debut:
+        fin += DAY
+    demande = demande or {}
+    films = [f for f in (storage.list_films() if films is None else films) if f.duree > 0]
+    salles = storage.list_salles() if salles is None else salles
+    if not films:
+        return []
+    plus_court = min(f.duree for f in films)
+
+    # Identifiants déjà pris : un film ne peut pas commencer deux fois au même horaire
+    pris: Set[str] = {r.id for r in storage.list_representations()}
+    programmees: Dict[str, int] = {f.id: 0 for f in films}
+    plannings: Dict[str, IntervalIndex] = {}
+    file: List[Tuple[int, int, str]] = []
+    capacites: Dict[str, int] = {}
+    for salle in salles:
+        capacite = salle.nombre_rangees_total * salle.nombre_colonnes
+        if capacite <= 0:
+            continue
+        capacites[salle.id] = capacite
+        plannings[salle.id] = IntervalIndex(storage.room_schedule(salle.id))
+        heapq.heappush(file, (debut, -capacite, salle.id))
+
+    shows: List[ScheduledShow] = []
+    while file:
+        curseur, _, salle_id = heapq.heappop(file)
+        planning = plannings[salle_id]
+        fenetres = planning.free_slots(plus_court, buffer, day_start=curseur, day_end=fin)
+        if not fenetres:
+            continue
+        a, b = fenetres[0]
+        start = -(-a // PAS) * PAS
+        meilleur: Optional[Tuple[float, str, Film]] = None
+        for film in films:
+            if start + film.duree > b:
+                continue
+            show = ScheduledShow(film.id, salle_id, format_horaire(start), format_horaire(start + film.duree))
+            if show.representation_id in pris:
+                continue
+            score = _expected(capacites[salle_id], demande.get(film.id, 1.0), programmees[film.id]) / (film.duree + buffer)
+            if meilleur is None or (score, film.id) > (meilleur[0], meilleur[1]):
+                meilleur = (score, film.id, film)
+        if meilleur is None:
+            # Aucun film ne tient dans cette fenêtre : on passe à la suivante
+            heapq.heappush(file, (b, -capacites[salle_id], salle_id))
+            continue
+        film = meilleur[2]
+        show = ScheduledShow(film.id, salle_id, format_horaire(start), format_horaire(start + film.duree),
+                             _expected(capacites[salle_id], demande.get(film.id, 1.0), programmees[film.id]))
+        planning.add(start, start + film.duree, show.representation_id)
+        pris.add(show.representation_id)
+        programmees[film.id] += 1
+        shows.append(show)
+        heapq.heappush(file, (start + film.duree, -capacites[salle_id], salle_id))
+    return shows
+
+
+def apply_schedule(shows: List[ScheduledShow], buffer: Optional[int] = None) -> List[Representation]:
+    """Crée les représentations du programme et les assigne à leurs salles en une seule transaction.
+
+    Les horaires sont revérifiés sous le verrou : si une séance est entrée en
+    conflit entre-temps, ValueError est levée et rien n'est écrit.
+    """
+    buffer = storage.CLEANING_BUFFER if buffer is None else buffer
+    created: List[Representation] = []
+    with storage.transaction() as db:
+        plannings = {salle_id: IntervalIndex(storage.room_schedule(salle_id))
+                     for salle_id in {show.salle_id for show in shows}}
+        salles: Dict[str, Salle_info] = {}
+        films: Dict[str, Film] = {}
+        for show in shows:
+            if show.salle_id not in salles:
+                salle = storage.get_salle(show.salle_id)
+                if salle is None:
+                    raise ValueError(f"Salle non trouvée: {show.salle_id}")
+                salles[show.salle_id] = salle
+            if show.film_id not in films:
+                film = storage.get_film(show.film_id)
+                if film is None:
+                    raise ValueError(f"Film non trouvé: {show.film_id}")
+                films[show.film_id] = film
+            rep = Representation(film_id=show.film_id, horaire=show.horaire, horaire_fin=show.horaire_fin,
+                                 id=show.representation_id)
+            if db.get('representations', rep.id) is not None:
+                raise ValueError(f"La représentation {rep.id} existe déjà")
+            start = parse_horaire(rep.horaire)
+            end = start + films[show.film_id].duree
+            conflits = plannings[show.salle_id].overlaps(start, end, buffer)
+            if conflits:
+                raise ValueError(f"Conflit d'horaire pour {rep.id} avec: {', '.join(map(str, conflits))}")
+            plannings[show.salle_id].add(start, end, rep.id)
+
+            salle = salles[show.salle_id]
+            rep.generate_map_from_salle(salle)
+            storage.add_representation(rep)
+            storage.update_salle_seating(salle.id, rep.id, rep.seating_map)
+            salle.id_representations = salle.id_representations + [rep.id]
+            film = films[show.film_id]
+            if rep.horaire not in film.horaires:
+                film.horaires = film.horaires + [rep.horaire]
+            created.append(rep)
+
+        for salle in salles.values():
+            db.update('salle_info', salle.id, salle.to_dict())
+        for film in films.values():
+            film.horaires = sorted(film.horaires)
+            db.update('films', film.id, film.to_dict())
+    return created
@@ -0,0 +1,121 @@
+"""Recherche des meilleures places contiguës pour un groupe.
+
+SeatFinder précalcule, pour chaque rangée du plan, ses suites de places libres
+(début, longueur) et la plus longue d'entre elles. Une recherche parcourt les
+rangées du milieu vers les bords, ignore celles qui sont trop pleines, s'arrête
+dès qu'aucune rangée restante ne peut faire mieux et n'évalue que quelques
+positions par suite : le coût ne dépend pas du nombre de places de la salle.
+
+Score d'un bloc (plus petit = meilleur) :
+- distance au centre : écart à l'axe du centre de l'écran, et écart de la
+  rangée au milieu de la salle (l'écran est devant la rangée A) ;
+- préférence VIP : pénalité si le type de rangée ne correspond pas au choix ;
+- fragmentation : pénalité si le bloc laisse une place isolée dans sa suite
+  (difficile à vendre) ou coupe une suite en deux.
+"""
+from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple
+
+from python.models import SeatMap
+
+WEIGHT_COLUMN = 1.0  # écart à l'axe de l'écran
+WEIGHT_ROW = 0.6  # écart au milieu de la salle
+VIP_PENALTY = 2.0
+ORPHAN_PENALTY = 0.5  # par place isolée laissée dans la rangée
+SPLIT_PENALTY = 0.05
+
+
+@dataclass
+class SeatBlock:
+    row: int
+    start: int
+    size: int
+    vip: bool
+    score: float
+
+    @property
+    def positions(self) -> List[Tuple[int, int]]:
+        return [(self.row, col) for col in range(self.start, self.start + self.size)]
+
+    @property
+    def seats(self) -> List[str]:
+        """Places au format de réservation ('B7', ...)"""
+        return [f"{chr(65 + self.row)}{col + 1}" for col in range(self.start, self.start + self.size)]
+
+
+class SeatFinder:
+    """Tables des places libres d'un plan de salle, par rangée"""
+
+    def __init__(self, seating_map: Any, nombre_rangees_vip: int = 0):
+        seat_map = seating_map if isinstance(seating_map, SeatMap) else SeatMap.from_value(seating_map)
+        self.rows = seat_map.rows
+        self.cols = seat_map.cols
+        self.nombre_rangees_vip = nombre_rangees_vip
+        self._runs = [seat_map.free_runs(row) for row in range(self.rows)]
+        self._longest = [max((length for _, length in runs), default=0) for runs in self._runs]
+        centre_row = (self.rows - 1) / 2
+        # Rangées du milieu vers les bords, avec la part du score due à leur position
+        self._row_order = sorted(
+            (WEIGHT_ROW * abs(row - centre_row) / max(1.0, self.rows / 2), row) for row in range(self.rows))
+
+    def take(self, row: int, col: int) -> None:
+        """Marque une place comme prise (ex. déjà choisie à la main) et met à jour la rangée"""
+        runs = []
+        for start, length in self._runs[row]:
+            if start <= col < start + length:
+                runs.extend(run for run in ((start, col - start), (col + 1, start + length - col - 1)) if run[1])
+            else:
+                runs.append((start, length))
+        self._runs[row] = runs
+        self._longest[row] = max((length for _, length in runs), default=0)
+
+    def _score(self, row_score: float, start: int, size: int, run: Tuple[int, int]) -> float:
+        block_centre = start + (size - 1) / 2
+        score = row_score + WEIGHT_COLUMN * abs(block_centre - (self.cols - 1) / 2) / max(1.0, self.cols / 2)
+        left = start - run[0]
+        right = run[0] + run[1] - start - size
+        score += ORPHAN_PENALTY * ((left == 1) + (right == 1))
+        if left and right:
+            score += SPLIT_PENALTY
+        return score
+
+    def best_block(self, size: int, prefer_vip: Optional[bool] = None) -> Optional[SeatBlock]:
+        """Meilleur bloc de `size` places contiguës d'une même rangée, ou None s'il n'y en a pas.
+
+        `prefer_vip` : True pour les rangées VIP, False pour les rangées normales,
+        None sans préférence.
+        """
+        if size < 1:
+            raise ValueError("Le nombre de places doit être positif")
+        best: Optional[SeatBlock] = None
+        ideal = round((self.cols - 1) / 2 - (size - 1) / 2)
+        for position_score, row in self._row_order:
+            if best is not None and position_score >= best.score:
+                break  # les rangées suivantes sont plus loin du milieu
+            if self._longest[row] < size:
+                continue
+            row_score = position_score
+            if prefer_vip is not None and (row < self.nombre_rangees_vip) != prefer_vip:
+                row_score += VIP_PENALTY
+                if best is not None and row_score >= best.score:
+                    continue
+            for run in self._runs[row]:
+                first, last = run[0], run[0] + run[1] - size
+                if last < first:
+                    continue
+                # Le score est minimal au bord de la suite, au plus près du centre ou juste à côté
+                # d'une position qui laisserait une place isolée
+                candidates = {first, last, first + 2, last - 2, ideal - 1, ideal, ideal + 1}
+                for start in candidates:
+                    if first <= start <= last:
+                        score = self._score(row_score, start, size, run)
+                        if best is None or score < best.score:
+                            best = SeatBlock(row, start, size, row < self.nombre_rangees_vip, score)
+        return best
+
+
+def find_best_seats(seating_map: Any, nombre_rangees_vip: int, size: int,
+                    prefer_vip: Optional[bool] = None) -> Optional[List[str]]:
+    """Places ('B7', ...) du meilleur bloc contigu de `size` places, ou None"""
+    block = SeatFinder(seating_map, nombre_rangees_vip).best_block(size, prefer_vip)
+    return block.seats if block else None
@@ -0,0 +1,135 @@
+"""Jetons de session : évitent de revérifier le mot de passe (PBKDF2) à chaque action.
+
+Après une authentification réussie, storage.start_session émet un jeton aléatoire.
+Le SessionStore associe ce jeton à l'utilisateur pour une durée de vie glissante
+(TTL, prolongée à chaque utilisation) et évince les sessions les moins récemment
+utilisées au-delà de `max_sessions`. Avec `path`, les sessions sont aussi écrites
+sur disque pour survivre à un redémarrage ; seule l'empreinte SHA-256 des jetons
+y est enregistrée, jamais le jeton lui-même. Prolonger une session ne réécrit le
+fichier qu'au plus une fois par `persist_interval` secondes : reprendre une session
+reste une lecture, et après un redémarrage une session peut expirer jusqu'à
+`persist_interval` secondes plus tôt.
+"""
+import hashlib
+import json
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from python.database import atomic_write
+
+DEFAULT_TTL = 30 * 60  # secondes
+DEFAULT_MAX_SESSIONS = 1000
+PERSIST_INTERVAL = 60  # secondes entre deux écritures dues à la seule prolongation des sessions
+
+
+class SessionStore:
+    """Sessions en mémoire : empreinte du jeton -> (id utilisateur, expiration), dans l'ordre LRU"""
+
+    def __init__(self, ttl: float = DEFAULT_TTL, max_sessions: int = DEFAULT_MAX_SESSIONS,
+                 path: Optional[Path] = None, clock: Callable[[], float] = time.time,
+                 persist_interval: float = PERSIST_INTERVAL):
+        if ttl <= 0 or max_sessions <= 0:
+            raise ValueError("ttl et max_sessions doivent être positifs")
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.path = Path(path) if path else None
+        self.persist_interval = persist_interval
+        self._clock = clock
+        self._persisted_at = clock()
+        self._lock = threading.RLock()
+        self._sessions: 'OrderedDict[str, Tuple[str, float]]' = OrderedDict()
+        if self.path is not None and self.path.exists():
+            self._load()
+
+    @staticmethod
+    def _digest(token: str) -> str:
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def create(self, user_id: str) -> str:
+        """Ouvre une session pour `user_id` et retourne son jeton"""
+        token = secrets.token_urlsafe(32)
+        with self._lock:
+            now = self._clock()
+            self._purge(now)
+            self._sessions[self._digest(token)] = (user_id, now + self.ttl)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            self._persist()
+        return token
+
+    def get(self, token: str) -> Optional[str]:
+        """Retourne l'id utilisateur du jeton (et prolonge la session), ou None si inconnu ou expiré"""
+        digest = self._digest(token)
+        with self._lock:
+            entry = self._sessions.get(digest)
+            if entry is None:
+                return None
+            user_id, expires = entry
+            now = self._clock()
+            if expires <= now:
+                # Pas d'écriture : les sessions expirées sont ignorées au chargement
+                del self._sessions[digest]
+                return None
+            self._sessions[digest] = (user_id, now + self.ttl)
+            self._sessions.move_to_end(digest)
+            if now - self._persisted_at >= self.persist_interval:
+                self._persist()
+            return user_id
+
+    def revoke(self, token: str) -> bool:
+        """Ferme une session ; retourne False si elle n'existait pas"""
+        with self._lock:
+            if self._sessions.pop(self._digest(token), None) is None:
+                return False
+            self._persist()
+            return True
+
+    def revoke_user(self, user_id: str) -> int:
+        """Ferme toutes les sessions d'un utilisateur (ex. après un changement de mot de passe)"""
+        with self._lock:
+            digests = [d for d, (uid, _) in self._sessions.items() if uid == user_id]
+            for digest in digests:
+                del self._sessions[digest]
+            if digests:
+                self._persist()
+            return len(digests)
+
+    def purge(self) -> int:
+        """Supprime les sessions expirées et retourne leur nombre"""
+        with self._lock:
+            removed = self._purge(self._clock())
+            if removed:
+                self._persist()
+            return removed
+
+    def _purge(self, now: float) -> int:
+        expired = [d for d, (_, expires) in self._sessions.items() if expires <= now]
+        for digest in expired:
+            del self._sessions[digest]
+        return len(expired)
+
+    # ----- Persistance optionnelle -----
+    def _load(self) -> None:
+        try:
+            raw: Dict[str, list] = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return  # fichier illisible : on repart sans sessions
+        now = self._clock()
+        entries = sorted(((d, (uid, float(exp))) for d, (uid, exp) in raw.items() if float(exp) > now),
+                         key=lambda item: item[1][1])
+        self._sessions = OrderedDict(entries[-self.max_sessions:])
+
+    def _persist(self) -> None:
+        self._persisted_at = self._clock()
+        if self.path is None:
+            return
+        payload = {digest: [user_id, expires] for digest, (user_id, expires) in self._sessions.items()}
+        atomic_write(self.path, json.dumps(payload).encode('utf-8'))
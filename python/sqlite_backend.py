@@ -0,0 +1,305 @@
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from python.database import DbDict, SECONDARY_INDEXES, record_key
+
+
+# Colonnes de chaque table : (nom, type) dans l'ordre des champs des modèles.
+# Les champs JSON (listes, plans de salle) sont stockés sérialisés.
+TABLES: Dict[str, List[Tuple[str, str]]] = {
+    'films': [
+        ('titre', 'TEXT'), ('duree', 'INTEGER'), ('categorie', 'TEXT'), ('age_min', 'INTEGER'),
+        ('horaires', 'JSON'), ('id', 'TEXT'),
+    ],
+    'salle_info': [
+        ('numero', 'INTEGER'), ('nombre_rangees_total', 'INTEGER'), ('nombre_rangees_vip', 'INTEGER'),
+        ('nombre_colonnes', 'INTEGER'), ('id_representations', 'JSON'), ('id', 'TEXT'),
+    ],
+    'utilisateurs': [
+        ('nom', 'TEXT'), ('prenom', 'TEXT'), ('date_naissance', 'TEXT'), ('nombre_resa', 'INTEGER'),
+        ('role', 'TEXT'), ('email', 'TEXT'), ('password_salt', 'TEXT'), ('password_hash', 'TEXT'),
+        ('id', 'TEXT'),
+    ],
+    'representations': [
+        ('film_id', 'TEXT'), ('horaire', 'TEXT'), ('horaire_fin', 'TEXT'), ('id', 'TEXT'),
+        ('seating_map', 'JSON'),
+    ],
+    'reservations': [
+        ('utilisateur_id', 'TEXT'), ('salle_id', 'TEXT'), ('film_id', 'TEXT'), ('horaire', 'TEXT'),
+        ('representation_id', 'TEXT'), ('places', 'JSON'), ('id', 'TEXT'), ('created_at', 'TEXT'),
+    ],
+    'salles': [
+        ('salle_id', 'TEXT'), ('representation_id', 'JSON'), ('seating_map', 'JSON'),
+    ],
+    'seat_maps': [
+        ('representation_id', 'TEXT'), ('salle_id', 'TEXT'), ('seating_map', 'JSON'),
+    ],
+}
+
+# Les collections inconnues sont rangées dans une table générique (collection, clé, document JSON)
+DOCUMENTS_TABLE = 'documents'
+
+
+class SqliteDatabase:
+    """Backend SQLite avec la même interface que Database (all/get/find/insert/update/delete).
+
+    Chaque collection a sa table avec une colonne `_key` (clé primaire, cf. record_key),
+    les champs indexés de SECONDARY_INDEXES ont un index SQL et les emails sont
+    indexés en minuscules (casefold) pour find_user_by_email.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        self._writes = 0
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._create_schema()
+
+    def _create_schema(self) -> None:
+        with self._lock:
+            for table, columns in TABLES.items():
+                cols = ', '.join(f'"{name}" {"TEXT" if kind == "JSON" else kind}' for name, kind in columns)
+                extra = ', email_key TEXT' if table == 'utilisateurs' else ''
+                self._conn.execute(
+                    f'CREATE TABLE IF NOT EXISTS "{table}" (_key TEXT PRIMARY KEY, {cols}{extra}, _extra TEXT)'
+                )
+                for field in SECONDARY_INDEXES.get(table, ()):
+                    if dict(columns).get(field) != 'JSON':
+                        self._conn.execute(
+                            f'CREATE INDEX IF NOT EXISTS "idx_{table}_{field}" ON "{table}" ("{field}")'
+                        )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_utilisateurs_email ON utilisateurs (email_key)')
+            self._conn.execute(
+                f'CREATE TABLE IF NOT EXISTS {DOCUMENTS_TABLE} '
+                '(collection TEXT NOT NULL, _key TEXT NOT NULL, data TEXT NOT NULL, PRIMARY KEY (collection, _key))'
+            )
+
+    # ----- Conversion enregistrement <-> ligne -----
+    @staticmethod
+    def _columns(collection: str) -> List[str]:
+        columns = ['_key'] + [name for name, _ in TABLES[collection]]
+        if collection == 'utilisateurs':
+            columns.append('email_key')
+        columns.append('_extra')
+        return columns
+
+    @staticmethod
+    def _row_values(collection: str, record: Dict[str, Any]) -> List[Any]:
+        columns = TABLES[collection]
+        names = {name for name, _ in columns}
+        values: List[Any] = [record_key(collection, record)]
+        for name, kind in columns:
+            value = record.get(name)
+            if kind == 'JSON' and value is not None:
+                value = json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+            values.append(value)
+        if collection == 'utilisateurs':
+            values.append(record['email'].casefold() if record.get('email') else None)
+        extra = {k: v for k, v in record.items() if k not in names}
+        values.append(json.dumps(extra, ensure_ascii=False) if extra else None)
+        return values
+
+    @staticmethod
+    def _record(collection: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        record: Dict[str, Any] = {}
+        for name, kind in TABLES[collection]:
+            value = row[name]
+            if value is None:
+                continue
+            record[name] = json.loads(value) if kind == 'JSON' else value
+        if row['_extra']:
+            record.update(json.loads(row['_extra']))
+        return record
+
+    def _select(self, collection: str, where: str = '', params: Tuple[Any, ...] = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            if collection not in TABLES:
+                clause = f'AND {where}' if where else ''
+                rows = self._conn.execute(
+                    f'SELECT data FROM {DOCUMENTS_TABLE} WHERE collection = ? {clause} ORDER BY rowid',
+                    (collection,) + params,
+                ).fetchall()
+                return [json.loads(r[0]) for r in rows]
+            cursor = self._conn.execute(
+                f'SELECT * FROM "{collection}" {"WHERE " + where if where else ""} ORDER BY rowid', params
+            )
+            names = [d[0] for d in cursor.description]
+            return [self._record(collection, dict(zip(names, row))) for row in cursor.fetchall()]
+
+    # ----- Lecture -----
+    def data(self) -> DbDict:
+        """Retourne toutes les collections sous forme de listes"""
+        with self._lock:
+            db: DbDict = {collection: self._select(collection) for collection in TABLES}
+            for (collection,) in self._conn.execute(f'SELECT DISTINCT collection FROM {DOCUMENTS_TABLE}'):
+                db[collection] = self._select(collection)
+            return db
+
+    @property
+    def generation(self) -> Tuple[int, int]:
+        """Version de la base : écritures des autres connexions (PRAGMA data_version) et de celle-ci"""
+        with self._lock:
+            return self._conn.execute('PRAGMA data_version').fetchone()[0], self._writes
+
+    def all(self, collection: str) -> List[Dict[str, Any]]:
+        """Retourne les enregistrements d'une collection, dans l'ordre d'insertion"""
+        return self._select(collection)
+
+    def collections(self) -> List[str]:
+        """Noms des collections de la base (tables puis collections de la table générique)"""
+        with self._lock:
+            rows = self._conn.execute(f'SELECT DISTINCT collection FROM {DOCUMENTS_TABLE} ORDER BY collection')
+            return list(TABLES) + [collection for (collection,) in rows]
+
+    def iter_records(self, collections: Optional[Iterable[str]] = None,
+                     batch_size: int = 1000) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Parcourt les couples (collection, enregistrement) sans charger les collections en mémoire.
+
+        La lecture passe par une connexion dédiée, dans une transaction de lecture :
+        le parcours voit un instantané cohérent de la base (WAL) sans bloquer les
+        écritures, et ne garde que `batch_size` lignes à la fois.
+        """
+        names = self.collections() if collections is None else list(collections)
+        conn = sqlite3.connect(str(self.path))
+        try:
+            conn.execute('BEGIN')
+            for collection in names:
+                if collection in TABLES:
+                    cursor = conn.execute(f'SELECT * FROM "{collection}" ORDER BY rowid')
+                    columns = [d[0] for d in cursor.description]
+                else:
+                    cursor = conn.execute(
+                        f'SELECT data FROM {DOCUMENTS_TABLE} WHERE collection = ? ORDER BY rowid', (collection,)
+                    )
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        if collection in TABLES:
+                            yield collection, self._record(collection, dict(zip(columns, row)))
+                        else:
+                            yield collection, json.loads(row[0])
+        finally:
+            conn.close()
+
+    def get(self, collection: str, key: str) -> Optional[Dict[str, Any]]:
+        """Retourne l'enregistrement de clé `key`, ou None"""
+        rows = self._select(collection, '_key = ?', (key,))
+        return rows[0] if rows else None
+
+    def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        """Retourne l'utilisateur dont l'email correspond (sans tenir compte de la casse)"""
+        rows = self._select('utilisateurs', 'email_key = ?', (email.casefold(),))
+        return rows[0] if rows else None
+
+    def find(self, collection: str, field: str, value: Any) -> List[Dict[str, Any]]:
+        """Retourne les enregistrements dont `field` vaut (ou contient) `value`"""
+        if field not in SECONDARY_INDEXES.get(collection, ()):
+            raise KeyError(f"Pas d'index sur {collection}.{field}")
+        if dict(TABLES[collection]).get(field) == 'JSON':
+            return self._select(
+                collection, f'EXISTS (SELECT 1 FROM json_each("{field}") WHERE json_each.value = ?)', (value,)
+            )
+        return self._select(collection, f'"{field}" = ?', (value,))
+
+    # ----- Écriture -----
+    @contextmanager
+    def transaction(self) -> Iterator['SqliteDatabase']:
+        """Regroupe lectures et mutations dans une transaction SQLite (BEGIN IMMEDIATE).
+
+        Le verrou d'écriture est pris dès l'ouverture ; une exception annule tout
+        (ROLLBACK). Les blocs imbriqués font partie de la transaction englobante.
+        """
+        with self._lock:
+            outer = not self._conn.in_transaction
+            if outer:
+                self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield self
+            except BaseException:
+                if outer:
+                    self._conn.execute('ROLLBACK')
+                raise
+            if outer:
+                self._conn.execute('COMMIT')
+
+    def save(self, data: DbDict) -> None:
+        """Remplace tout le contenu de la base en une transaction"""
+        with self.transaction():
+            self._writes += 1
+            for collection in TABLES:
+                self._conn.execute(f'DELETE FROM "{collection}"')
+            self._conn.execute(f'DELETE FROM {DOCUMENTS_TABLE}')
+            for collection, records in data.items():
+                for record in records:
+                    self._write(collection, record)
+
+    def compact(self) -> None:
+        """Intègre le WAL SQLite dans le fichier principal"""
+        with self._lock:
+            self._conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+    def insert(self, collection: str, record: Dict[str, Any]) -> None:
+        """Ajoute un enregistrement (remplace celui de même clé s'il existe)"""
+        with self._lock:
+            self._writes += 1
+            self._write(collection, record)
+
+    def update(self, collection: str, key: str, record: Dict[str, Any]) -> None:
+        """Remplace l'enregistrement de clé `key` (ignoré s'il n'existe pas)"""
+        with self._lock:
+            self._writes += 1
+            if collection not in TABLES:
+                self._conn.execute(
+                    f'UPDATE {DOCUMENTS_TABLE} SET _key = ?, data = ? WHERE collection = ? AND _key = ?',
+                    (record_key(collection, record), json.dumps(record, ensure_ascii=False), collection, key),
+                )
+                return
+            assignments = ', '.join(f'"{name}" = ?' for name in self._columns(collection))
+            self._conn.execute(
+                f'UPDATE "{collection}" SET {assignments} WHERE _key = ?',
+                self._row_values(collection, record) + [key],
+            )
+
+    def delete(self, collection: str, key: str) -> None:
+        """Supprime l'enregistrement de clé `key` s'il existe"""
+        with self._lock:
+            self._writes += 1
+            if collection not in TABLES:
+                self._conn.execute(
+                    f'DELETE FROM {DOCUMENTS_TABLE} WHERE collection = ? AND _key = ?', (collection, key)
+                )
+            else:
+                self._conn.execute(f'DELETE FROM "{collection}" WHERE _key = ?', (key,))
+
+    def _write(self, collection: str, record: Dict[str, Any]) -> None:
+        if collection not in TABLES:
+            self._conn.execute(
+                f'INSERT INTO {DOCUMENTS_TABLE} (collection, _key, data) VALUES (?, ?, ?) '
+                'ON CONFLICT (collection, _key) DO UPDATE SET data = excluded.data',
+                (collection, record_key(collection, record), json.dumps(record, ensure_ascii=False)),
+            )
+            return
+        columns = self._columns(collection)
+        names = ', '.join(f'"{name}"' for name in columns)
+        placeholders = ', '.join('?' for _ in columns)
+        updates = ', '.join(f'"{name}" = excluded."{name}"' for name in columns[1:])
+        self._conn.execute(
+            f'INSERT INTO "{collection}" ({names}) VALUES ({placeholders}) '
+            f'ON CONFLICT (_key) DO UPDATE SET {updates}',
+            self._row_values(collection, record),
+        )
+
+    def invalidate(self) -> None:
+        """Rien à invalider : SQLite relit toujours l'état courant"""
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
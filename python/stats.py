@@ -0,0 +1,252 @@
+"""Statistiques du cinéma.
+
+Les réservations alimentent des compteurs (collection `stats` de la base) mis à
+jour par storage.book_seats, storage.cancel_reservation et les suppressions en
+cascade : revenus et places par film et par catégorie, places par représentation
+et par horaire, totaux globaux. Le compteur global tient aussi le nombre de films,
+salles, représentations et utilisateurs et la capacité des salles (ajouts et
+suppressions de storage), et `top_utilisateurs` le classement par nombre_resa.
+compute_statistics ne lit que ces compteurs, plus le film ou l'utilisateur de
+chaque ligne des classements : il ne parcourt aucune autre collection.
+
+rebuild_stats recompte tout en un seul passage pour vérifier (et corriger) les
+compteurs : les réservations sont converties en colonnes (indice du film, de la
+représentation et de l'horaire, nombre de places, revenu), puis agrégées avec
+NumPy (bincount) s'il est installé, en Python pur sinon.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import storage
+from storage import STATS_COLLECTION, STATS_COUNTS, STATS_GLOBAL, STATS_TOP_USERS, stats_key
+
+try:
+    import numpy as np
+except ImportError:  # NumPy est optionnel
+    np = None
+
+
+@dataclass
+class TopItem:
+    """Une ligne de classement : libellé, places réservées et revenus associés"""
+    label: str
+    places: int
+    revenus: float = 0.0
+
+
+@dataclass
+class CinemaStats:
+    nb_films: int = 0
+    nb_salles: int = 0
+    nb_representations: int = 0
+    nb_utilisateurs: int = 0
+    nb_reservations: int = 0
+    capacite_totale: int = 0
+    places_reservees: int = 0
+    revenus_totaux: float = 0.0
+    taux_occupation: Optional[float] = None  # en %, None si aucune salle ou représentation
+    top_films: List[TopItem] = field(default_factory=list)
+    top_categories: List[TopItem] = field(default_factory=list)
+    top_horaires: List[TopItem] = field(default_factory=list)
+    top_utilisateurs: List[TopItem] = field(default_factory=list)  # places = nombre de réservations
+
+
+@dataclass
+class _Columns:
+    film_idx: List[int] = field(default_factory=list)
+    representation_idx: List[int] = field(default_factory=list)
+    horaire_idx: List[int] = field(default_factory=list)
+    places: List[int] = field(default_factory=list)
+    revenus: List[float] = field(default_factory=list)
+
+
+def _build_columns(reservations: List[Dict[str, Any]], salles: Dict[str, Dict[str, Any]],
+                   indexes: Tuple[Dict[str, int], Dict[str, int], Dict[str, int]]) -> _Columns:
+    """Unique passage sur les réservations : une valeur par colonne et par réservation.
+
+    `indexes` contient les dictionnaires valeur -> indice des films, représentations
+    et horaires ; chaque nouvelle valeur y reçoit l'indice suivant.
+    """
+    film_index, representation_index, horaire_index = indexes
+    cols = _Columns()
+    for res in reservations:
+        places = res.get('places', [])
+        salle = salles.get(res.get('salle_id'))
+        # Salle supprimée : prix inconnu, revenu nul
+        revenu = storage.reservation_revenue(places, salle.get('nombre_rangees_vip', 0)) if salle else 0.0
+        cols.film_idx.append(film_index.setdefault(res.get('film_id', ''), len(film_index)))
+        cols.representation_idx.append(
+            representation_index.setdefault(res.get('representation_id', ''), len(representation_index)))
+        cols.horaire_idx.append(horaire_index.setdefault(res.get('horaire', ''), len(horaire_index)))
+        cols.places.append(len(places))
+        cols.revenus.append(revenu)
+    return cols
+
+
+def _aggregate_numpy(cols: _Columns, sizes: Tuple[int, int, int]) -> Tuple[List[int], List[float], List[int], List[int]]:
+    nb_films, nb_representations, nb_horaires = sizes
+    places = np.asarray(cols.places, dtype=np.float64)
+    film_idx = np.asarray(cols.film_idx, dtype=np.intp)
+    film_places = np.bincount(film_idx, weights=places, minlength=nb_films)
+    film_revenus = np.bincount(film_idx, weights=np.asarray(cols.revenus, dtype=np.float64), minlength=nb_films)
+    representation_places = np.bincount(np.asarray(cols.representation_idx, dtype=np.intp),
+                                        weights=places, minlength=nb_representations)
+    horaire_places = np.bincount(np.asarray(cols.horaire_idx, dtype=np.intp), weights=places, minlength=nb_horaires)
+    return ([int(v) for v in film_places.tolist()], film_revenus.tolist(),
+            [int(v) for v in representation_places.tolist()], [int(v) for v in horaire_places.tolist()])
+
+
+def _aggregate_python(cols: _Columns, sizes: Tuple[int, int, int]) -> Tuple[List[int], List[float], List[int], List[int]]:
+    nb_films, nb_representations, nb_horaires = sizes
+    film_places = [0] * nb_films
+    film_revenus = [0.0] * nb_films
+    representation_places = [0] * nb_representations
+    horaire_places = [0] * nb_horaires
+    for film, representation, horaire, places, revenu in zip(
+            cols.film_idx, cols.representation_idx, cols.horaire_idx, cols.places, cols.revenus):
+        film_places[film] += places
+        film_revenus[film] += revenu
+        representation_places[representation] += places
+        horaire_places[horaire] += places
+    return film_places, film_revenus, representation_places, horaire_places
+
+
+def recount_counters(use_numpy: Optional[bool] = None) -> Dict[str, Dict[str, Any]]:
+    """Recalcule tous les compteurs à partir des réservations (un passage).
+
+    `use_numpy` force (True) ou désactive (False) NumPy ; par défaut il est utilisé s'il est installé.
+    """
+    if use_numpy and np is None:
+        raise RuntimeError("NumPy n'est pas installé")
+    numpy_enabled = np is not None if use_numpy is None else use_numpy
+
+    db = storage.get_database()
+    salles = {s['id']: s for s in db.all('salle_info')}
+    films = {f['id']: f for f in db.all('films')}
+    reservations = db.all('reservations')
+    indexes: Tuple[Dict[str, int], Dict[str, int], Dict[str, int]] = ({}, {}, {})
+    cols = _build_columns(reservations, salles, indexes)
+    aggregate = _aggregate_numpy if numpy_enabled else _aggregate_python
+    film_places, film_revenus, representation_places, horaire_places = aggregate(
+        cols, tuple(len(index) for index in indexes))
+
+    counters = {STATS_GLOBAL: {'id': STATS_GLOBAL, 'reservations': len(reservations),
+                               'places': sum(film_places), 'revenus': sum(film_revenus),
+                               'capacite': sum(storage.salle_capacity(s) for s in salles.values())}}
+    for collection, field_name in STATS_COUNTS.items():
+        counters[STATS_GLOBAL][field_name] = len(db.all(collection))
+    film_index, representation_index, horaire_index = indexes
+    for film_id, i in film_index.items():
+        if film_places[i] or film_revenus[i]:
+            key = stats_key('film', film_id)
+            counters[key] = {'id': key, 'places': film_places[i], 'revenus': film_revenus[i]}
+            # Catégories : seulement les films existants
+            if film_id in films:
+                key = stats_key('categorie', films[film_id].get('categorie', ''))
+                counter = counters.setdefault(key, {'id': key, 'places': 0, 'revenus': 0.0})
+                counter['places'] += film_places[i]
+                counter['revenus'] += film_revenus[i]
+    for kind, index, places in (('representation', representation_index, representation_places),
+                                ('horaire', horaire_index, horaire_places)):
+        for value, i in index.items():
+            if places[i]:
+                key = stats_key(kind, value)
+                counters[key] = {'id': key, 'places': places[i]}
+    return counters
+
+
+def _same(stored: Optional[Dict[str, Any]], expected: Optional[Dict[str, Any]]) -> bool:
+    fields = set(stored or {}) | set(expected or {})
+    fields.discard('id')
+    return all(abs((stored or {}).get(f, 0) - (expected or {}).get(f, 0)) < 1e-6 for f in fields)
+
+
+def rebuild_stats(fix: bool = True, use_numpy: Optional[bool] = None) -> List[Tuple[str, Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]:
+    """Compare les compteurs enregistrés à un recomptage complet.
+
+    Retourne les écarts (clé, compteur enregistré, valeur attendue) ; avec `fix`,
+    les compteurs faux, manquants ou en trop sont corrigés dans la même transaction.
+    Le classement des utilisateurs n'est pas comparé (son seuil n'est qu'un majorant),
+    il est recalculé avec `fix`.
+    """
+    with storage.transaction() as db:
+        stored = {r['id']: r for r in db.all(STATS_COLLECTION) if r['id'] != STATS_TOP_USERS}
+        expected = recount_counters(use_numpy)
+        differences = [(key, stored.get(key), expected.get(key)) for key in sorted(set(stored) | set(expected))
+                       if not _same(stored.get(key), expected.get(key))]
+        if fix:
+            for key, _, record in differences:
+                if record is None:
+                    db.delete(STATS_COLLECTION, key)
+                else:
+                    db.insert(STATS_COLLECTION, record)
+            db.insert(STATS_COLLECTION, storage.user_ranking(db.all('utilisateurs')))
+    return differences
+
+
+def _top(items: List[TopItem], top_n: int) -> List[TopItem]:
+    return sorted((item for item in items if item.places > 0), key=lambda item: item.places, reverse=True)[:top_n]
+
+
+def _top_users(db: Any, ranking: Optional[Dict[str, Any]], top_n: int) -> List[TopItem]:
+    if ranking is None:
+        sure = []
+    else:
+        # Au-dessous du seuil, un utilisateur absent du classement pourrait passer devant
+        sure = [entry for entry in ranking['entries'] if entry[1] >= ranking['seuil']]
+    if ranking is None or (len(sure) < top_n and ranking['seuil'] > 0):
+        # Classement calculé en mémoire, sans écriture (top_n > TOP_USERS_KEPT ou
+        # classement absent) : c'est storage._rank_user qui le tient à jour
+        sure = storage.user_ranking(db.all('utilisateurs'), max(top_n, storage.TOP_USERS_KEPT))['entries']
+    items = []
+    for user_id, count in sure[:top_n]:
+        user = db.get('utilisateurs', user_id) or {}
+        items.append(TopItem(f"{user.get('prenom', '')} {user.get('nom', '')}", count))
+    return items
+
+
+def compute_statistics(top_n: int = 5) -> CinemaStats:
+    """Calcule les statistiques du cinéma à partir des compteurs.
+
+    Le coût dépend du nombre de compteurs (films, représentations, horaires et
+    catégories ayant des réservations), pas du nombre de réservations ni
+    d'utilisateurs. Si la base n'a pas encore de compteurs, ils sont d'abord
+    construits par rebuild_stats ; sinon rien n'est écrit.
+    """
+    db = storage.get_database()
+    counters = {r['id']: r for r in db.all(STATS_COLLECTION)}
+    totals = counters.get(STATS_GLOBAL)
+    if totals is None or any(f not in totals for f in STATS_COUNTS.values()):
+        rebuild_stats()
+        counters = {r['id']: r for r in db.all(STATS_COLLECTION)}
+        totals = counters[STATS_GLOBAL]
+
+    stats = CinemaStats(
+        nb_films=totals['films'],
+        nb_salles=totals['salles'],
+        nb_representations=totals['representations'],
+        nb_utilisateurs=totals['utilisateurs'],
+        nb_reservations=totals.get('reservations', 0),
+        capacite_totale=totals.get('capacite', 0),
+        places_reservees=totals.get('places', 0),
+        revenus_totaux=totals.get('revenus', 0.0),
+    )
+    if stats.capacite_totale > 0 and stats.nb_representations > 0:
+        stats.taux_occupation = stats.places_reservees / (stats.capacite_totale * stats.nb_representations) * 100
+
+    # Classement sur les ids, puis titre des seuls films retenus.
+    # Films supprimés : leurs réservations restent comptées sous 'Film inconnu'
+    stats.top_films = _top([
+        TopItem(key[len('film:'):], r.get('places', 0), r.get('revenus', 0.0))
+        for key, r in counters.items() if key.startswith('film:')
+    ], top_n)
+    for item in stats.top_films:
+        film = db.get('films', item.label)
+        item.label = film.get('titre', '') if film else 'Film inconnu'
+
+    stats.top_categories = _top([TopItem(key[len('categorie:'):], r.get('places', 0), r.get('revenus', 0.0))
+                                 for key, r in counters.items() if key.startswith('categorie:')], top_n)
+    stats.top_horaires = _top([TopItem(key[len('horaire:'):], r.get('places', 0))
+                               for key, r in counters.items() if key.startswith('horaire:')], top_n)
+    stats.top_utilisateurs = _top_users(db, counters.get(STATS_TOP_USERS), top_n)
+    return stats
@@ -2,6 +2,7 @@ from typing import List, Optional, Tuple
 from datetime import datetime, date
 from python.models import Film, Salle_info, Utilisateur, Reservation, Representation
 from python.visuals import clear_screen
+from python.seat_finder import SeatFinder
 import storage
 import getpass
 
@@ -34,6 +35,16 @@ def calculate_ticket_price(salle: Salle_info, seat: str) -> float:
         return 9.0  # Normal price
 
 
+def format_horaires(film: Film) -> str:
+    """Horaires d'un film avec les places restantes de chaque séance (index de disponibilité)"""
+    disponibilites = storage.film_availability(film.id)
+    parts = []
+    for horaire in film.horaires:
+        label = storage.availability_label(disponibilites.get(horaire))
+        parts.append(f"{horaire} ({label})" if label else horaire)
+    return ', '.join(parts)
+
+
 def list_films():
     """Display all available films"""
     clear_screen()
@@ -47,7 +58,7 @@ def list_films():
             print(f"{i}. {f.titre}")
             print(f"   Durée: {f.duree}min | Catégorie: {f.categorie} | Âge minimum: {f.age_min}+")
             if f.horaires:
-                print(f"   Horaires: {', '.join(f.horaires)}")
+                print(f"   Horaires: {format_horaires(f)}")
             print()
     
     input("Appuyez sur Entrée pour revenir au menu...")
@@ -108,7 +119,7 @@ def search_films():
             print(f"{i}. {f.titre}")
             print(f"   Durée: {f.duree}min | Catégorie: {f.categorie} | Âge minimum: {f.age_min}+")
             if f.horaires:
-                print(f"   Horaires: {', '.join(f.horaires)}")
+                print(f"   Horaires: {format_horaires(f)}")
             print()
     
     input("Appuyez sur Entrée pour revenir au menu...")
@@ -148,6 +159,25 @@ def display_seating_map(seating_map: List[List[str]], salle: Salle_info) -> None
     print()
 
 
+def propose_best_seats(seating_map: List[List[str]], salle: Salle_info, num_seats: int,
+                       already_selected: List[str]) -> List[str]:
+    """Propose le meilleur bloc de places contiguës et retourne les places acceptées (liste vide sinon)"""
+    finder = SeatFinder(seating_map, salle.nombre_rangees_vip)
+    for seat in already_selected:
+        finder.take(ord(seat[0]) - 65, int(seat[1:]) - 1)
+    choix_vip = input("Préférence: 1) VIP  2) Normal  3) Indifférent [3]: ").strip()
+    prefer_vip = {'1': True, '2': False}.get(choix_vip)
+    block = finder.best_block(num_seats, prefer_vip)
+    if block is None:
+        print(f"❌ Aucun bloc de {num_seats} places côte à côte n'est disponible.")
+        input("Appuyez sur Entrée...")
+        return []
+    kind = "VIP" if block.vip else "Normal"
+    if input(f"Places proposées ({kind}): {', '.join(block.seats)}. Accepter ? (o/n): ").strip().lower() != 'o':
+        return []
+    return block.seats
+
+
 def select_seats(seating_map: List[List[str]], salle: Salle_info, num_seats: int) -> List[str]:
     """Allow user to select seats interactively"""
     selected_seats = []
@@ -158,11 +188,16 @@ def select_seats(seating_map: List[List[str]], salle: Salle_info, num_seats: int
         print(f"\nSièges sélectionnés: {', '.join(selected_seats) if selected_seats else 'Aucun'}")
         print(f"Sièges restants à sélectionner: {num_seats - len(selected_seats)}")
         
-        seat_input = input("\nEntrez un siège (ex: A5) ou 'annuler' pour recommencer: ").strip().upper()
+        seat_input = input("\nEntrez un siège (ex: A5), 'auto' pour les meilleures places côte à côte "
+                           "ou 'annuler' pour recommencer: ").strip().upper()
         
         if seat_input == "ANNULER":
             selected_seats = []
             continue
+
+        if seat_input == "AUTO":
+            selected_seats += propose_best_seats(seating_map, salle, num_seats - len(selected_seats), selected_seats)
+            continue
         
         # Validate format
         if len(seat_input) < 2 or not seat_input[0].isalpha() or not seat_input[1:].isdigit():
@@ -253,8 +288,10 @@ def buy_ticket(user: Utilisateur):
         return
     
     print("Horaires disponibles:\n")
+    disponibilites = storage.film_availability(film.id)
     for i, horaire in enumerate(film.horaires, 1):
-        print(f"{i}. {horaire}")
+        label = storage.availability_label(disponibilites.get(horaire))
+        print(f"{i}. {horaire}" + (f" ({label})" if label else ""))
     
     try:
         choix_horaire = int(input("\nChoisissez un horaire (0 pour annuler): "))
@@ -271,40 +308,17 @@ def buy_ticket(user: Utilisateur):
         input("Appuyez sur Entrée...")
         return
     
-    # Find representation and assigned room
-    representations = storage.list_representations()
-    representation = None
-    for rep in representations:
-        if rep.film_id == film.id and rep.horaire == horaire:
-            representation = rep
-            break
-    
-    if not representation:
-        print(f"\n❌ Aucune représentation trouvée pour {film.titre} à {horaire}.")
-        input("Appuyez sur Entrée...")
-        return
-    
-    # Find which room this representation is in
-    salles = storage.list_salles()
-    salle = None
-    for s in salles:
-        if representation.id in s.id_representations:
-            salle = s
-            break
-    
-    if not salle:
-        print(f"\n❌ Aucune salle assignée pour cette représentation.")
-        input("Appuyez sur Entrée...")
-        return
-    
-    # Step 3: Get seating map
-    salles_entry = storage.get_salle_seating(salle.id, representation.id)
-    if not salles_entry or not salles_entry.seating_map:
-        print("\n❌ Plan de salle non disponible.")
+    # Find representation, assigned room and seating map (lectures indexées)
+    try:
+        showing = storage.resolve_showing(film.id, horaire)
+    except ValueError as e:
+        print(f"\n❌ {e}.")
         input("Appuyez sur Entrée...")
         return
     
-    seating_map = salles_entry.seating_map
+    representation = showing.representation
+    salle = showing.salle
+    seating_map = showing.seating.seating_map
     
     # Step 4: Select number of seats
     clear_screen()
@@ -355,35 +369,23 @@ def buy_ticket(user: Utilisateur):
         input("Appuyez sur Entrée...")
         return
     
-    # Step 8: Process payment (simulated)
+    # Steps 8-10: places, réservation et compteur enregistrés en une seule transaction
+    try:
+        reservation = storage.book_seats(user.id, representation.id, selected_seats)
+    except storage.SeatsUnavailableError as e:
+        print(f"\n❌ Places déjà réservées entre-temps: {', '.join(e.seats)}")
+        input("Appuyez sur Entrée...")
+        return
+    except ValueError as e:
+        print(f"\n❌ {e}")
+        input("Appuyez sur Entrée...")
+        return
+    user.nombre_resa = storage.get_utilisateur(user.id).nombre_resa
+    
+    # Process payment (simulated)
     print("\n💳 Traitement du paiement...")
     print("✅ Paiement accepté!")
     
-    # Step 9: Update seating map
-    for seat in selected_seats:
-        row_letter = seat[0]
-        col_num = int(seat[1:])
-        row_idx = ord(row_letter) - 65
-        col_idx = col_num - 1
-        seating_map[row_idx][col_idx] = 'x'
-    
-    storage.update_salle_seating(salle.id, representation.id, seating_map)
-    
-    # Step 10: Create reservation
-    reservation = Reservation(
-        utilisateur_id=user.id,
-        salle_id=salle.id,
-        film_id=film.id,
-        representation_id=representation.id,
-        horaire=horaire,
-        places=selected_seats
-    )
-    storage.add_reservation(reservation)
-    
-    # Update user reservation count
-    user.nombre_resa += 1
-    storage.update_utilisateur(user)
-    
     # Step 11: Confirmation message
     clear_screen()
     print("=" * 50)
@@ -485,33 +487,16 @@ def cancel_reservation(user: Utilisateur, reservations: List[Reservation]):
             input("Appuyez sur Entrée...")
             return
         
-        # Free up seats in seating map
-        representation = storage.get_representation(reservation.representation_id)
-        
-        if representation:
-            salles_entry = storage.get_salle_seating(reservation.salle_id, representation.id)
-            if salles_entry and salles_entry.seating_map:
-                seating_map = salles_entry.seating_map
-                
-                for seat in reservation.places:
-                    row_letter = seat[0]
-                    col_num = int(seat[1:])
-                    row_idx = ord(row_letter) - 65
-                    col_idx = col_num - 1
-                    
-                    if 0 <= row_idx < len(seating_map) and 0 <= col_idx < len(seating_map[0]):
-                        seating_map[row_idx][col_idx] = 'o'
-                
-                storage.update_salle_seating(reservation.salle_id, representation.id, seating_map)
-        
-        # Remove reservation from database
-        db = storage.load_db()
-        db['reservations'] = [r for r in db.get('reservations', []) if r.get('id') != reservation.id]
-        storage.save_db(db)
+        # Free up seats, remove the reservation and update counters in one transaction
+        if not storage.cancel_reservation(reservation.id):
+            print("\nRéservation introuvable (déjà annulée ?).")
+            input("Appuyez sur Entrée...")
+            return
         
         # Update user reservation count
-        user.nombre_resa = max(0, user.nombre_resa - 1)
-        storage.update_utilisateur(user)
+        stored_user = storage.get_utilisateur(user.id)
+        if stored_user:
+            user.nombre_resa = stored_user.nombre_resa
         
         print("\n✅ Réservation annulée avec succès.")
         
@@ -582,6 +567,9 @@ def modif_profile_personnel_info(user: Utilisateur):
     user.email = new_email
     
     storage.update_utilisateur(user)
+    if change_pwd == "oui":
+        # Les sessions ouvertes avec l'ancien mot de passe ne sont plus valables
+        storage.end_user_sessions(user.id)
     
     print("\n✅ Informations mises à jour avec succès.")
     input("Appuyez sur Entrée...")
\ No newline at end of file
@@ -1,13 +1,57 @@
-from art import text2art
+# Module importé au démarrage de main.py : seulement des modules standard légers
+# (ni pathlib ni typing, art importé au premier besoin)
+import json
 import random
 import os
 
 FONTS = ["big", "colossal", "slant", "3-d"]
 
+# Bannières pré-calculées (python manage.py precompute-banners) : art n'est alors plus importé au démarrage
+BANNER_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'banners.json')
+
+_banners = None  # "police|texte" -> bannière, chargé au premier appel
+
+
+def _load_banners():
+    global _banners
+    if _banners is None:
+        try:
+            with open(BANNER_CACHE_PATH, encoding='utf-8') as f:
+                _banners = json.load(f)
+        except (OSError, ValueError):
+            _banners = {}
+    return _banners
+
+
+def render_banner(word: str, font: str) -> str:
+    """Bannière de `word` dans `font`, calculée une seule fois par police (art importé au premier besoin)"""
+    banners = _load_banners()
+    key = f"{font}|{word}"
+    if key not in banners:
+        from art import text2art
+        banners[key] = text2art(word, font=font, chr_ignore=True)
+    return banners[key]
+
+
 def ascii_art(word):
     """ ASCII art for our cinema application with random fonts """
-    font = random.choice(FONTS)
-    return text2art(word, font=font, chr_ignore=True)
+    return render_banner(word, random.choice(FONTS))
+
+
+def precompute_banners(words) -> int:
+    """Écrit dans BANNER_CACHE_PATH les bannières de `words` pour toutes les polices et retourne leur nombre"""
+    from python.database import atomic_write
+    banners = _load_banners()
+    for word in words:
+        for font in FONTS:
+            render_banner(word, font)
+    atomic_write(BANNER_CACHE_PATH, json.dumps(banners, ensure_ascii=False).encode('utf-8'))
+    return len(banners)
+
 
 def clear_screen():
-    os.system("cls" if os.name == "nt" else "clear")
\ No newline at end of file
+    if os.name == "nt":
+        os.system("cls")
+    else:
+        # Séquences ANSI (comme `clear`) : pas de processus lancé à chaque menu
+        print("\033[H\033[2J\033[3J", end="", flush=True)
@@ -1,11 +1,62 @@
-import json
+import heapq
+import os
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, ContextManager, Iterable, Iterator, List, Optional, Tuple, Union, TYPE_CHECKING
 
-from python.models import Film, Salle_info, Utilisateur, Representation, Reservation, Salles
+from python.models import Film, Salle_info, Utilisateur, Representation, Reservation, Salles, PlanSalle, SeatMap, PRIX_NORMAL, PRIX_VIP
+from python.database import Database, record_key
+from python.sessions import SessionStore
+from python.intervals import IntervalIndex, interval, format_horaire
+
+if TYPE_CHECKING:
+    from python.sqlite_backend import SqliteDatabase
 
 
 DB_PATH = Path(__file__).parent / 'db.json'
+SQLITE_PATH = Path(__file__).parent / 'db.sqlite3'
+
+# Backend de stockage : 'json' (db.json) ou 'sqlite' (db.sqlite3), surchargeable par CYNEMA_BACKEND
+BACKEND = os.environ.get('CYNEMA_BACKEND', 'json')
+
+# Journal des mutations (db.json.wal), compacté dans db.json toutes les JOURNAL_COMPACT_EVERY écritures
+JOURNAL_MODE = True
+JOURNAL_COMPACT_EVERY = 500
+# Nombre de snapshots précédents conservés (db.json.1, db.json.2, ...) ; 0 pour désactiver
+SNAPSHOT_BACKUPS = 0
+
+# Sessions : durée de vie glissante (s), nombre maximal de sessions et fichier de
+# persistance optionnel (CYNEMA_SESSION_FILE ; en mémoire seulement par défaut)
+SESSION_TTL = 30 * 60
+SESSION_MAX = 1000
+SESSION_PATH: Optional[Path] = Path(os.environ['CYNEMA_SESSION_FILE']) if os.environ.get('CYNEMA_SESSION_FILE') else None
+
+# Compteurs de statistiques tenus à jour à chaque réservation / annulation (cf. python/stats.py)
+STATS_COLLECTION = 'stats'
+STATS_GLOBAL = 'global'
+# Nombre d'enregistrements tenu dans le compteur global (plus la capacité des salles) : collection -> champ
+STATS_COUNTS = {'films': 'films', 'salle_info': 'salles', 'representations': 'representations',
+                'utilisateurs': 'utilisateurs'}
+# Classement des utilisateurs par nombre_resa : les TOP_USERS_KEPT premiers (cf. _rank_user)
+STATS_TOP_USERS = 'top_utilisateurs'
+TOP_USERS_KEPT = 20
+
+# Plans de salle : un enregistrement par représentation, de clé representation_id
+# (remplace l'ancienne collection `salles`, cf. migrate_seat_maps)
+SEAT_MAPS_COLLECTION = 'seat_maps'
+
+# Places libres (normales / VIP) de chaque représentation, tenues à jour à chaque
+# écriture d'un plan de salle : les listes de films n'ouvrent pas les plans
+AVAILABILITY_COLLECTION = 'availability'
+
+# Minutes de nettoyage exigées entre deux séances d'une même salle
+CLEANING_BUFFER = 15
+
+_database: Optional[Union[Database, 'SqliteDatabase']] = None
+_sessions: Optional[SessionStore] = None
+# Plannings des salles (salle_id -> IntervalIndex), valables pour une version de la base
+_schedules: Dict[str, IntervalIndex] = {}
+_schedules_version: Any = None
 
 
 def _empty_db() -> Dict[str, List[Dict[str, Any]]]:
@@ -15,97 +66,208 @@ def _empty_db() -> Dict[str, List[Dict[str, Any]]]:
         "utilisateurs": [],
         "representations": [],
         "reservations": [],
-        "salles": []
+        "seat_maps": [],
+        "stats": [],
+        "availability": []
     }
 
 
+def get_database() -> Union[Database, 'SqliteDatabase']:
+    """Retourne le handle partagé sur la base du backend configuré (recréé si la configuration a changé)"""
+    global _database
+    path = SQLITE_PATH if BACKEND == 'sqlite' else DB_PATH
+    if _database is None or _database.path != path:
+        if BACKEND == 'sqlite':
+            from python.sqlite_backend import SqliteDatabase
+            _database = SqliteDatabase(path)
+        elif BACKEND == 'json':
+            _database = Database(path, _empty_db, journal=JOURNAL_MODE, compact_every=JOURNAL_COMPACT_EVERY,
+                                 backups=SNAPSHOT_BACKUPS)
+        else:
+            raise ValueError(f"Backend de stockage inconnu: {BACKEND}")
+    return _database
+
+
 def load_db() -> Dict[str, List[Dict[str, Any]]]:
-    if not DB_PATH.exists():
-        save_db(_empty_db())
-        return _empty_db()
-    with DB_PATH.open('r', encoding='utf-8') as f:
-        return json.load(f)
+    """Retourne la base en cache (relue seulement si db.json a changé).
+
+    Les enregistrements retournés sont partagés avec le cache : les modifier puis appeler save_db().
+    """
+    return get_database().data()
+
+
+def iter_records(collections: Optional[Iterable[str]] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Parcourt les couples (collection, enregistrement) de la base sans construire de copie complète"""
+    return get_database().iter_records(collections)
 
 
 def save_db(db: Dict[str, List[Dict[str, Any]]]):
-    with DB_PATH.open('w', encoding='utf-8') as f:
-        json.dump(db, f, ensure_ascii=False, indent=2, separators=(',', ':'))
+    """Réécrit toute la base (et vide le journal)"""
+    get_database().save(db)
+
+
+def compact() -> None:
+    """Intègre le journal des mutations dans db.json"""
+    get_database().compact()
+
+
+def transaction() -> ContextManager[Union[Database, 'SqliteDatabase']]:
+    """Regroupe plusieurs lectures/écritures sous le verrou d'écriture de la base.
+
+    Utilisation : `with storage.transaction(): ...` ; les fonctions de ce module
+    appelées dans le bloc en font partie. Les écritures sont enregistrées ensemble
+    à la sortie du bloc, ou annulées si une exception en sort.
+    """
+    return get_database().transaction()
+
+
+def migrate_json_to_sqlite(source: Optional[Path] = None, target: Optional[Path] = None) -> Dict[str, int]:
+    """Copie une base db.json (journal compris) dans une base SQLite et retourne le nombre d'enregistrements par collection"""
+    from python.sqlite_backend import SqliteDatabase
+    source = Path(source or DB_PATH)
+    if not source.exists():
+        raise FileNotFoundError(f"Base introuvable: {source}")
+    data = Database(source, _empty_db).data()
+    sqlite_db = SqliteDatabase(Path(target or SQLITE_PATH))
+    try:
+        sqlite_db.save(data)
+    finally:
+        sqlite_db.close()
+    return {collection: len(records) for collection, records in data.items()}
 
 
 def list_films() -> List[Film]:
-    db = load_db()
-    return [Film.from_dict(d) for d in db.get('films', [])]
+    return [Film.from_dict(d) for d in get_database().all('films')]
+
+
+def _insert_counted(collection: str, record: Dict[str, Any]) -> None:
+    """Ajoute (ou remplace) un enregistrement et met à jour le compteur global de sa collection"""
+    with transaction() as db:
+        old = db.get(collection, record_key(collection, record))
+        db.insert(collection, record)
+        _count_change(db, collection, old, record)
 
 
 def add_film(film: Film) -> None:
-    db = load_db()
-    db.setdefault('films', [])
-    db['films'].append(film.to_dict())
-    save_db(db)
+    _insert_counted('films', film.to_dict())
 
 def get_film(film_id: str) -> Optional[Film]:
-    db = load_db()
-    for film_dict in db.get("films", []):
-        if film_dict.get("id") == film_id:
-            return Film.from_dict(film_dict)
-    return None
+    film_dict = get_database().get('films', film_id)
+    return Film.from_dict(film_dict) if film_dict else None
 
 def list_salles() -> List[Salle_info]:
-    db = load_db()
-    return [Salle_info.from_dict(d) for d in db.get('salle_info', [])]
+    return [Salle_info.from_dict(d) for d in get_database().all('salle_info')]
 
 
 def add_salle(salle: Salle_info) -> None:
-    db = load_db()
-    db.setdefault('salle_info', [])
-    db['salle_info'].append(salle.to_dict())
-    save_db(db)
+    _insert_counted('salle_info', salle.to_dict())
 
 def get_salle(salle_id: str) -> Optional[Salle_info]:
     """Get a specific salle by ID"""
-    db = load_db()
-    for salle_dict in db.get("salle_info", []):
-        if salle_dict.get("id") == salle_id:
-            return Salle_info.from_dict(salle_dict)
-    return None
+    salle_dict = get_database().get('salle_info', salle_id)
+    return Salle_info.from_dict(salle_dict) if salle_dict else None
 
 
 def list_representations() -> List[Representation]:
-    db = load_db()
-    return [Representation.from_dict(d) for d in db.get('representations', [])]
+    return [Representation.from_dict(d) for d in get_database().all('representations')]
 
 def get_representation(representation_id: str) -> Optional[Representation]:
-    db = load_db()
-    for rep_dict in db.get("representations", []):
-        if rep_dict.get("id") == representation_id:
-            return Representation.from_dict(rep_dict)
-    return None
+    rep_dict = get_database().get('representations', representation_id)
+    return Representation.from_dict(rep_dict) if rep_dict else None
+
+
+def get_representation_room(representation_id: str) -> Optional[Salle_info]:
+    """Salle à laquelle la représentation est assignée (index salle_info.id_representations)"""
+    salles = get_database().find('salle_info', 'id_representations', representation_id)
+    return Salle_info.from_dict(salles[0]) if salles else None
+
+
+@dataclass
+class Showing:
+    """Séance prête à réserver : film, représentation, salle et plan de salle"""
+    film: Film
+    representation: Representation
+    salle: Salle_info
+    seating: PlanSalle
+
+
+def resolve_showing(film_id: str, horaire: str) -> Showing:
+    """Retrouve en quelques lectures indexées la séance d'un film à un horaire.
+
+    Lève ValueError (message affichable) si le film, la représentation, la salle
+    ou le plan de salle n'existe pas.
+    """
+    db = get_database()
+    film = db.get('films', film_id)
+    if film is None:
+        raise ValueError("Film non trouvé")
+    rep = next((r for r in db.find('representations', 'film_id', film_id) if r.get('horaire') == horaire), None)
+    if rep is None:
+        raise ValueError(f"Aucune représentation trouvée pour {film.get('titre', '')} à {horaire}")
+    salles = db.find('salle_info', 'id_representations', rep['id'])
+    if not salles:
+        raise ValueError("Aucune salle assignée à cette représentation")
+    entry = _find_salles_entry(salles[0]['id'], rep['id'])
+    seating = PlanSalle.from_dict(entry) if entry is not None else None
+    if seating is None or not seating.seating_map:
+        raise ValueError("Plan de salle non disponible")
+    return Showing(Film.from_dict(film), Representation.from_dict(rep), Salle_info.from_dict(salles[0]), seating)
 
 
 def add_representation(representation: Representation) -> None:
-    db = load_db()
-    db.setdefault('representations', [])
-    db['representations'].append(representation.to_dict())
-    save_db(db)
-
-def assign_representation_to_room(representation_id: str, salle_id: str) -> Tuple[bool, str]:
-    """Assigne une représentation à une salle et retourne (success, error_message)"""
+    _insert_counted('representations', representation.to_dict())
+
+def _schedules_for(db: Union[Database, 'SqliteDatabase']) -> Dict[str, IntervalIndex]:
+    """Cache des plannings, vidé dès que la base a changé depuis sa construction"""
+    global _schedules, _schedules_version
+    version = (id(db), db.generation)
+    if version != _schedules_version:
+        _schedules, _schedules_version = {}, version
+    return _schedules
+
+
+def room_schedule(salle_id: str) -> IntervalIndex:
+    """Planning d'une salle : intervalles [début, fin) en minutes de ses représentations.
+
+    Construit au premier appel puis réutilisé tant que la base ne change pas ;
+    les représentations sans horaire valide sont ignorées.
+    """
+    db = get_database()
+    schedules = _schedules_for(db)
+    if salle_id not in schedules:
+        salle = db.get('salle_info', salle_id) or {}
+        intervals = []
+        for representation_id in salle.get('id_representations', []):
+            rep = db.get('representations', representation_id)
+            if rep is None:
+                continue
+            try:
+                start, end = interval(rep.get('horaire', ''), rep.get('horaire_fin', ''))
+            except ValueError:
+                continue
+            intervals.append((start, end, representation_id))
+        schedules[salle_id] = IntervalIndex(intervals)
+    return schedules[salle_id]
+
+
+def find_free_slots(salle_id: str, duree: int, buffer: Optional[int] = None) -> List[Tuple[str, str]]:
+    """Fenêtres ('HH:MM', 'HH:MM') de la journée où une séance de `duree` minutes peut avoir lieu dans la salle"""
+    buffer = CLEANING_BUFFER if buffer is None else buffer
+    return [(format_horaire(start), format_horaire(end))
+            for start, end in room_schedule(salle_id).free_slots(duree, buffer)]
+
+
+def assign_representation_to_room(representation_id: str, salle_id: str,
+                                  buffer: Optional[int] = None) -> Tuple[bool, str]:
+    """Assigne une représentation à une salle et retourne (success, error_message).
+
+    L'assignation est refusée si la séance chevauche une autre séance de la salle,
+    tampon de nettoyage (`buffer`, CLEANING_BUFFER minutes par défaut) compris.
+    """
+    buffer = CLEANING_BUFFER if buffer is None else buffer
     try:
-        db = load_db()
-        
         # Vérifier que la salle existe
-        salle_obj = None
-        salles = db.get('salle_info', [])
-        for salle_dict in salles:
-            if salle_dict.get('id') == salle_id:
-                salle_obj = Salle_info.from_dict(salle_dict)
-                # Ajouter la représentation à la liste
-                id_representations = salle_dict.get('id_representations', [])
-                if representation_id not in id_representations:
-                    id_representations.append(representation_id)
-                    salle_dict['id_representations'] = id_representations
-                break
-        
+        salle_obj = get_salle(salle_id)
         if salle_obj is None:
             return False, "Salle non trouvée"
         
@@ -120,78 +282,219 @@ def assign_representation_to_room(representation_id: str, salle_id: str) -> Tupl
         except Exception as e:
             return False, f"Erreur lors de la génération du plan: {str(e)}"
         
-        # Créer une entrée Salles pour cette assignation
-        from python.models import Salles
-        db.setdefault('salles', [])
-        salles_entry = Salles(salle_id=salle_id, representation_id=[representation_id], seating_map=rep.seating_map)
-        db['salles'].append(salles_entry.to_dict())
+        try:
+            start, end = interval(rep.horaire, rep.horaire_fin)
+        except ValueError as e:
+            return False, str(e)
+
+        with transaction() as db:
+            # Relire la salle sous le verrou pour ne pas écraser une autre assignation
+            salle_obj = get_salle(salle_id) or salle_obj
+            # Une représentation n'a qu'un plan de salle, donc une seule salle
+            existing = _seat_map_record(db, representation_id)
+            if existing is not None and existing.get('salle_id') != salle_id:
+                return False, "Représentation déjà assignée à une autre salle"
+            schedule = room_schedule(salle_id)
+            conflits = schedule.overlaps(start, end, buffer, exclude=representation_id)
+            if conflits:
+                details = []
+                for conflit_id in conflits:
+                    autre = db.get('representations', conflit_id) or {}
+                    details.append(f"{autre.get('horaire', '?')}-{autre.get('horaire_fin', '?')} ({conflit_id})")
+                return False, f"Conflit d'horaire avec: {', '.join(details)}"
+            # Ajouter la représentation à la liste
+            if representation_id not in salle_obj.id_representations:
+                salle_obj.id_representations = salle_obj.id_representations + [representation_id]
+                db.update('salle_info', salle_id, salle_obj.to_dict())
+            
+            # Créer le plan de salle de la représentation (sans écraser un plan déjà réservé)
+            if existing is None:
+                _write_seat_map(db, representation_id, salle_id, rep.seating_map)
+
+            # Mise à jour incrémentale du planning plutôt qu'une reconstruction
+            if representation_id not in (item_id for _, _, item_id in schedule):
+                schedule.add(start, end, representation_id)
+            _schedules_for(db)[salle_id] = schedule
         
-        save_db(db)
         return True, "Assignation réussie"
     except Exception as e:
         return False, f"Erreur: {str(e)}"
 
 
+def _seat_map_record(db: Union[Database, 'SqliteDatabase'], representation_id: str) -> Optional[Dict[str, Any]]:
+    """Plan de salle d'une représentation, lu par clé dans seat_maps.
+
+    Une base non migrée est lue dans l'ancienne collection `salles` (première
+    entrée contenant la représentation).
+    """
+    record = db.get(SEAT_MAPS_COLLECTION, representation_id)
+    if record is None:
+        legacy = db.find('salles', 'representation_id', representation_id)
+        if legacy:
+            record = {'representation_id': representation_id, 'salle_id': legacy[0].get('salle_id', ''),
+                      'seating_map': legacy[0].get('seating_map')}
+    return record
+
+
+def _write_seat_map(db: Union[Database, 'SqliteDatabase'], representation_id: str, salle_id: str,
+                    seating_map: SeatMap) -> None:
+    """Écrit le plan d'une seule représentation (les autres plans ne sont pas réécrits)"""
+    db.insert(SEAT_MAPS_COLLECTION, PlanSalle(representation_id, salle_id, seating_map).to_dict())
+    refresh_availability(representation_id)
+
+
+def get_seat_map(representation_id: str) -> Optional[PlanSalle]:
+    """Plan de salle d'une représentation (None si elle n'est assignée à aucune salle)"""
+    record = _seat_map_record(get_database(), representation_id)
+    return PlanSalle.from_dict(record) if record is not None else None
+
+
 def add_salles_entry(salles_entry: Salles) -> None:
-    db = load_db()
-    db.setdefault('salles', [])
-    db['salles'].append(salles_entry.to_dict())
-    save_db(db)
+    """Enregistre une entrée au format Salles : chaque représentation reçoit sa propre copie du plan"""
+    with transaction() as db:
+        for representation_id in salles_entry.representation_id:
+            _write_seat_map(db, representation_id, salles_entry.salle_id, salles_entry.seating_map.copy())
+
+
+def _find_salles_entry(salle_id: str, representation_id: str) -> Optional[Dict[str, Any]]:
+    """Retrouve le plan de salle d'une représentation s'il appartient à la salle `salle_id`"""
+    record = _seat_map_record(get_database(), representation_id)
+    if record is None or record.get('salle_id') != salle_id:
+        return None
+    return record
 
 
 def get_salle_seating(salle_id: str, representation_id: str) -> Optional[Salles]:
     """Récupère le plan de salle pour une représentation donnée"""
-    db = load_db()
-    for s in db.get('salles', []):
-        # Récupérer la liste des représentations (c'est une liste)
-        rep_ids = s.get('representation_id', [])
-        # Vérifier si la salle_id correspond et si la représentation est assignée
-        if s.get('salle_id') == salle_id and representation_id in rep_ids:
-            return Salles.from_dict(s)
-    return None
+    s = _find_salles_entry(salle_id, representation_id)
+    if s is None:
+        return None
+    # SeatMap.from_value décode un nouveau plan : l'appelant peut le modifier avant update_salle_seating
+    return Salles(salle_id=salle_id, representation_id=[representation_id],
+                  seating_map=SeatMap.from_value(s.get('seating_map')))
 
 
 def list_salles_entries() -> List[Salles]:
-    db = load_db()
-    return [Salles.from_dict(d) for d in db.get('salles', [])]
-
-
-def update_salle_seating(salle_id: str, representation_id: str, seating_map: List[List[str]]) -> None:
-    """Met à jour le plan de salle pour une représentation donnée"""
-    db = load_db()
-    salles_list = db.get('salles', [])
-    
-    for salles_entry in salles_list:
-        if salles_entry.get('salle_id') == salle_id:
-            rep_ids = salles_entry.get('representation_id', [])
-            if representation_id in rep_ids:
-                salles_entry['seating_map'] = seating_map
-                save_db(db)
-                return
-    
-    # If not found, create a new entry
-    salles_entry = Salles(salle_id=salle_id, representation_id=[representation_id], seating_map=seating_map)
-    salles_list.append(salles_entry.to_dict())
-    save_db(db)
+    db = get_database()
+    entries = [Salles(salle_id=d.get('salle_id', ''), representation_id=[d.get('representation_id', '')],
+                      seating_map=SeatMap.from_value(d.get('seating_map')))
+               for d in db.all(SEAT_MAPS_COLLECTION)]
+    # Entrées de l'ancienne collection pas encore migrées
+    migrated = {d.get('representation_id') for d in db.all(SEAT_MAPS_COLLECTION)}
+    entries.extend(Salles.from_dict(d) for d in db.all('salles')
+                   if not migrated.issuperset(d.get('representation_id', [])))
+    return entries
+
+
+def update_salle_seating(salle_id: str, representation_id: str, seating_map: Union[SeatMap, List[List[str]]]) -> None:
+    """Met à jour le plan de salle pour une représentation donnée (SeatMap ou ancien format liste de listes)"""
+    with transaction() as db:
+        _write_seat_map(db, representation_id, salle_id, SeatMap.from_value(seating_map))
+
+
+def migrate_seat_maps() -> int:
+    """Convertit l'ancienne collection `salles` en seat_maps puis la vide.
+
+    Une entrée partagée par plusieurs représentations donne une copie du plan à
+    chacune. Retourne le nombre de plans créés.
+    """
+    created = 0
+    with transaction() as db:
+        for entry in list(db.all('salles')):
+            for representation_id in entry.get('representation_id', []):
+                if db.get(SEAT_MAPS_COLLECTION, representation_id) is None:
+                    seating_map = SeatMap.from_value(entry.get('seating_map'))
+                    db.insert(SEAT_MAPS_COLLECTION,
+                              PlanSalle(representation_id, entry.get('salle_id', ''), seating_map).to_dict())
+                    created += 1
+            db.delete('salles', record_key('salles', entry))
+    return created
+
+
+def _compute_availability(db: Union[Database, 'SqliteDatabase'], representation_id: str) -> Optional[Dict[str, Any]]:
+    """Places libres normales et VIP du plan de salle de la représentation (celui utilisé par book_seats)"""
+    record = _seat_map_record(db, representation_id)
+    if record is None:
+        return None
+    salle = db.get('salle_info', record.get('salle_id', ''))
+    if salle is None:
+        return None
+    seating_map = SeatMap.from_value(record.get('seating_map'))
+    vip_rows = min(max(0, int(salle.get('nombre_rangees_vip', 0))), seating_map.rows)
+    libres_vip = vip_rows * seating_map.cols - sum(seating_map.row_taken_count(r) for r in range(vip_rows))
+    return {'id': representation_id, 'salle_id': salle['id'],
+            'libres_normales': seating_map.available_count() - libres_vip, 'libres_vip': libres_vip}
+
+
+def refresh_availability(representation_id: str) -> None:
+    """Recalcule les places libres d'une représentation après une écriture de son plan de salle"""
+    with transaction() as db:
+        record = _compute_availability(db, representation_id)
+        if record is None:
+            db.delete(AVAILABILITY_COLLECTION, representation_id)
+        elif db.get(AVAILABILITY_COLLECTION, representation_id) != record:
+            db.insert(AVAILABILITY_COLLECTION, record)
+
+
+def rebuild_availability() -> int:
+    """Recalcule les places libres de toutes les représentations (bases antérieures à l'index)"""
+    with transaction() as db:
+        stored = {r['id'] for r in db.all(AVAILABILITY_COLLECTION)}
+        representation_ids = [r['id'] for r in db.all('representations')]
+        for representation_id in set(stored) - set(representation_ids):
+            db.delete(AVAILABILITY_COLLECTION, representation_id)
+        for representation_id in representation_ids:
+            refresh_availability(representation_id)
+    return len(representation_ids)
+
+
+def get_availability(representation_id: str) -> Optional[Dict[str, Any]]:
+    """Places libres d'une représentation ({'libres_normales', 'libres_vip', ...}), None si elle n'a pas de salle"""
+    db = get_database()
+    record = db.get(AVAILABILITY_COLLECTION, representation_id)
+    # Base antérieure à l'index : calcul à la volée
+    return record if record is not None else _compute_availability(db, representation_id)
+
+
+def film_availability(film_id: str) -> Dict[str, Dict[str, int]]:
+    """Places libres par horaire des représentations d'un film ayant une salle : horaire -> {'libres_normales', 'libres_vip'}"""
+    result: Dict[str, Dict[str, int]] = {}
+    for rep in get_database().find('representations', 'film_id', film_id):
+        record = get_availability(rep['id'])
+        if record is None:
+            continue
+        slot = result.setdefault(rep.get('horaire', ''), {'libres_normales': 0, 'libres_vip': 0})
+        slot['libres_normales'] += record.get('libres_normales', 0)
+        slot['libres_vip'] += record.get('libres_vip', 0)
+    return result
+
+
+def availability_label(record: Optional[Dict[str, int]]) -> str:
+    """'12 places restantes', 'complet', ou '' pour un horaire sans salle assignée"""
+    if record is None:
+        return ''
+    libres = record.get('libres_normales', 0) + record.get('libres_vip', 0)
+    if libres <= 0:
+        return 'complet'
+    return f"{libres} place{'s' if libres > 1 else ''} restante{'s' if libres > 1 else ''}"
 
     
 def list_utilisateurs() -> List[Utilisateur]:
-    db = load_db()
-    return [Utilisateur.from_dict(d) for d in db.get('utilisateurs', [])]
+    return [Utilisateur.from_dict(d) for d in get_database().all('utilisateurs')]
+
+
+def get_utilisateur(user_id: str) -> Optional[Utilisateur]:
+    user_dict = get_database().get('utilisateurs', user_id)
+    return Utilisateur.from_dict(user_dict) if user_dict else None
 
 
 def add_utilisateur(user: Utilisateur) -> None:
-    db = load_db()
-    db.setdefault('utilisateurs', [])
-    db['utilisateurs'].append(user.to_dict())
-    save_db(db)
+    _insert_counted('utilisateurs', user.to_dict())
 
 
 def find_user_by_email(email: str) -> Optional[Utilisateur]:
-    for u in list_utilisateurs():
-        if u.email.lower() == email.lower():
-            return u
-    return None
+    user_dict = get_database().get_user_by_email(email)
+    return Utilisateur.from_dict(user_dict) if user_dict else None
 
 
 def create_user(nom: str, prenom: str, date_naissance: str, email: str, password: str, role: str = 'client') -> Utilisateur:
@@ -204,11 +507,26 @@ def create_user(nom: str, prenom: str, date_naissance: str, email: str, password
     return u
 
 
+def _check_password(u: Utilisateur, password: str) -> bool:
+    """Vérifie le mot de passe et, si le hash est moins coûteux que ITERATIONS, le recalcule"""
+    if not u.verify_password(password):
+        return False
+    if u.needs_rehash():
+        u.set_password(password)
+        with transaction() as db:
+            stored = db.get('utilisateurs', u.id)
+            if stored is not None:
+                db.update('utilisateurs', u.id, dict(stored, password_salt=u.password_salt,
+                                                     password_hash=u.password_hash,
+                                                     password_iterations=u.password_iterations))
+    return True
+
+
 def authenticate_user(email: str, password: str) -> Optional[Utilisateur]:
     u = find_user_by_email(email)
     if u is None:
         return None
-    if u.verify_password(password):
+    if _check_password(u, password):
         return u
     return None
 
@@ -218,39 +536,401 @@ def authenticate_admin(email: str, password: str) -> Optional[Utilisateur]:
         return None
     if u.role != 'admin':
         return None
-    if u.verify_password(password):
+    if _check_password(u, password):
         return u
     return None
 
+
+def get_sessions() -> SessionStore:
+    """Retourne le store de sessions partagé (recréé si la configuration a changé)"""
+    global _sessions
+    if (_sessions is None or _sessions.path != SESSION_PATH or _sessions.ttl != SESSION_TTL
+            or _sessions.max_sessions != SESSION_MAX):
+        _sessions = SessionStore(ttl=SESSION_TTL, max_sessions=SESSION_MAX, path=SESSION_PATH)
+    return _sessions
+
+
+def start_session(user: Utilisateur) -> str:
+    """Ouvre une session pour un utilisateur déjà authentifié et retourne son jeton"""
+    return get_sessions().create(user.id)
+
+
+def resume_session(token: str) -> Optional[Utilisateur]:
+    """Retourne l'utilisateur (relu depuis la base) d'une session valide, sans vérifier le mot de passe"""
+    user_id = get_sessions().get(token)
+    return get_utilisateur(user_id) if user_id else None
+
+
+def end_session(token: str) -> None:
+    get_sessions().revoke(token)
+
+
+def end_user_sessions(user_id: str) -> int:
+    """Ferme toutes les sessions d'un utilisateur (après un changement de mot de passe)"""
+    return get_sessions().revoke_user(user_id)
+
 def update_utilisateur(user: Utilisateur) -> None:
-    db = load_db()
-    utilisateurs = db.get('utilisateurs', [])
-    for i, user_dict in enumerate(utilisateurs):
-        if user_dict.get('id') == user.id:
-            utilisateurs[i] = user.to_dict()
-            break
-    save_db(db)
+    with transaction() as db:
+        old = db.get('utilisateurs', user.id)
+        db.update('utilisateurs', user.id, user.to_dict())
+        if old is not None and old.get('nombre_resa', 0) != user.nombre_resa:
+            _rank_user(db, user.id, user.nombre_resa)
 
 
 def list_reservations() -> List[Reservation]:
     """Retourne la liste de toutes les réservations"""
-    db = load_db()
-    return [Reservation.from_dict(d) for d in db.get('reservations', [])]
+    return [Reservation.from_dict(d) for d in get_database().all('reservations')]
+
+
+def get_reservation(reservation_id: str) -> Optional[Reservation]:
+    """Retourne une réservation par son id"""
+    res_dict = get_database().get('reservations', reservation_id)
+    return Reservation.from_dict(res_dict) if res_dict else None
 
 
 def add_reservation(reservation: Reservation) -> None:
     """Ajoute une nouvelle réservation"""
-    db = load_db()
-    db.setdefault('reservations', [])
-    db['reservations'].append(reservation.to_dict())
-    save_db(db)
+    get_database().insert('reservations', reservation.to_dict())
+
+
+def delete_reservation(reservation_id: str) -> None:
+    """Supprime une réservation"""
+    get_database().delete('reservations', reservation_id)
+
+
+def reservation_revenue(places: List[str], nombre_rangees_vip: int) -> float:
+    """Prix d'une réservation : PRIX_VIP par place en rangée VIP, PRIX_NORMAL sinon"""
+    return sum(PRIX_VIP if ord(place[0]) - 65 < nombre_rangees_vip else PRIX_NORMAL for place in places if place)
+
+
+def stats_key(kind: str, value: str) -> str:
+    """Clé d'un compteur de statistiques : 'film:<id>', 'representation:<id>' ou 'horaire:<HH:MM>'"""
+    return f"{kind}:{value}"
+
+
+def reservation_counters(reservation: Dict[str, Any], salle: Optional[Dict[str, Any]],
+                         film: Optional[Dict[str, Any]] = None) -> Dict[str, Dict[str, float]]:
+    """Contribution d'une réservation à chaque compteur : {clé: {champ: valeur}}.
+
+    La catégorie n'est comptée que si le film existe encore.
+    """
+    places = reservation.get('places', [])
+    revenu = reservation_revenue(places, salle.get('nombre_rangees_vip', 0)) if salle else 0.0
+    counters = {
+        STATS_GLOBAL: {'reservations': 1, 'places': len(places), 'revenus': revenu},
+        stats_key('film', reservation.get('film_id', '')): {'places': len(places), 'revenus': revenu},
+        stats_key('representation', reservation.get('representation_id', '')): {'places': len(places)},
+        stats_key('horaire', reservation.get('horaire', '')): {'places': len(places)},
+    }
+    if film is not None:
+        counters[stats_key('categorie', film.get('categorie', ''))] = {'places': len(places), 'revenus': revenu}
+    return counters
+
+
+def salle_capacity(salle: Optional[Dict[str, Any]]) -> int:
+    """Nombre de places d'une salle (0 si elle n'existe pas)"""
+    return salle.get('nombre_rangees_total', 0) * salle.get('nombre_colonnes', 0) if salle else 0
+
+
+def _count_change(db: Union[Database, 'SqliteDatabase'], collection: str,
+                  old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> None:
+    """Met à jour le compteur global après un ajout (old None), un remplacement ou une suppression (new None).
+
+    Sans compteur global à jour (base antérieure), rien n'est fait : python.stats
+    le reconstruit au premier calcul.
+    """
+    field_name = STATS_COUNTS.get(collection)
+    totals = db.get(STATS_COLLECTION, STATS_GLOBAL)
+    if field_name is None or totals is None or field_name not in totals:
+        return
+    record = dict(totals)
+    record[field_name] += (new is not None) - (old is not None)
+    if collection == 'salle_info':
+        record['capacite'] = record.get('capacite', 0) + salle_capacity(new) - salle_capacity(old)
+    db.insert(STATS_COLLECTION, record)
+
+
+def user_ranking(utilisateurs: Iterable[Dict[str, Any]], kept: int = TOP_USERS_KEPT) -> Dict[str, Any]:
+    """Classement exact des `kept` premiers utilisateurs par nombre_resa (enregistrement STATS_TOP_USERS)"""
+    best = heapq.nsmallest(kept + 1, ((-u.get('nombre_resa', 0), u['id']) for u in utilisateurs
+                                      if u.get('nombre_resa', 0) > 0))
+    entries = [[user_id, -count] for count, user_id in best[:kept]]
+    seuil = -best[kept][0] if len(best) > kept else 0
+    return {'id': STATS_TOP_USERS, 'entries': entries, 'seuil': seuil}
+
+
+def _rank_user(db: Union[Database, 'SqliteDatabase'], user_id: str, nombre_resa: int) -> None:
+    """Reporte le nouveau nombre_resa d'un utilisateur dans le classement, dans la transaction en cours.
+
+    Le classement garde au plus TOP_USERS_KEPT utilisateurs avec leur nombre_resa
+    exact, et `seuil`, un majorant du nombre_resa des utilisateurs absents : une
+    entrée au moins égale au seuil est sûre d'être à sa place (cf. python.stats).
+    Si une entrée passe sous le seuil ou sort du classement (annulations), il est
+    recalculé ici, pendant l'écriture, pour que compute_statistics n'ait pas à le faire.
+    """
+    ranking = db.get(STATS_COLLECTION, STATS_TOP_USERS)
+    if ranking is None:
+        return
+    entries = [entry for entry in ranking['entries'] if entry[0] != user_id]
+    seuil = ranking['seuil']
+    was_ranked = len(entries) < len(ranking['entries'])
+    if nombre_resa > 0 and (was_ranked or nombre_resa > seuil or len(entries) < TOP_USERS_KEPT):
+        entries.append([user_id, nombre_resa])
+    entries.sort(key=lambda entry: (-entry[1], entry[0]))
+    for _, count in entries[TOP_USERS_KEPT:]:
+        seuil = max(seuil, count)
+    entries = entries[:TOP_USERS_KEPT]
+    if seuil > 0 and (len(entries) < TOP_USERS_KEPT or entries[-1][1] < seuil):
+        db.insert(STATS_COLLECTION, user_ranking(db.all('utilisateurs')))
+    else:
+        db.insert(STATS_COLLECTION, {'id': STATS_TOP_USERS, 'entries': entries, 'seuil': seuil})
+
+
+def _bump_stats(db: Union[Database, 'SqliteDatabase'], reservation: Dict[str, Any], sign: int) -> None:
+    """Ajoute (sign=1) ou retire (sign=-1) une réservation des compteurs, dans la transaction en cours.
+
+    Si les compteurs n'existent pas encore (base antérieure), rien n'est fait :
+    python.stats les reconstruit à partir des réservations au premier calcul.
+    """
+    if db.get(STATS_COLLECTION, STATS_GLOBAL) is None:
+        return
+    salle = db.get('salle_info', reservation.get('salle_id', ''))
+    film = db.get('films', reservation.get('film_id', ''))
+    for key, delta in reservation_counters(reservation, salle, film).items():
+        record = dict(db.get(STATS_COLLECTION, key) or {'id': key})
+        for field_name, value in delta.items():
+            record[field_name] = record.get(field_name, 0) + sign * value
+        if key != STATS_GLOBAL and not any(record.get(f) for f in delta):
+            # Compteur revenu à zéro : supprimé, comme s'il n'avait jamais existé
+            db.delete(STATS_COLLECTION, key)
+        else:
+            db.insert(STATS_COLLECTION, record)
+
+
+def list_reservation_details() -> List[Dict[str, Any]]:
+    """Jointure des réservations avec leur film, leur salle et leur utilisateur, en un seul passage.
+
+    Les films, salles et utilisateurs sont indexés une fois par id (O(R + F + S + U)).
+    Retourne une ligne (dict) par réservation : champs de la réservation plus
+    `film_titre`, `salle_numero`, `utilisateur_nom`, `utilisateur_email`, `revenu`
+    (0 si la salle est inconnue) et `date` (AAAA-MM-JJ).
+    """
+    db = get_database()
+    titres = {f['id']: f.get('titre', '') for f in db.all('films')}
+    salles = {s['id']: s for s in db.all('salle_info')}
+    users = {u['id']: u for u in db.all('utilisateurs')}
+    
+    rows = []
+    for r in db.all('reservations'):
+        user = users.get(r.get('utilisateur_id'))
+        salle = salles.get(r.get('salle_id'))
+        places = list(r.get('places', []))
+        created_at = r.get('created_at', '')
+        rows.append({
+            'id': r.get('id', ''),
+            'film_id': r.get('film_id', ''),
+            'film_titre': titres.get(r.get('film_id'), 'Film inconnu'),
+            'utilisateur_id': r.get('utilisateur_id', ''),
+            'utilisateur_nom': f"{user.get('nom', '')} {user.get('prenom', '')}" if user else 'Utilisateur inconnu',
+            'utilisateur_email': user.get('email', '') if user else '',
+            'representation_id': r.get('representation_id', ''),
+            'salle_id': r.get('salle_id', ''),
+            'salle_numero': salle.get('numero') if salle else None,
+            'horaire': r.get('horaire', ''),
+            'places': places,
+            'revenu': reservation_revenue(places, salle.get('nombre_rangees_vip', 0)) if salle else 0.0,
+            'created_at': created_at,
+            'date': created_at[:10],
+        })
+    return rows
+
+
+class SeatsUnavailableError(ValueError):
+    """Levée par book_seats quand des places demandées sont déjà prises"""
+
+    def __init__(self, seats: List[str]):
+        super().__init__(f"Places déjà réservées: {', '.join(seats)}")
+        self.seats = seats
+
+
+def _seat_position(seat: str) -> Tuple[int, int]:
+    """Convertit une place 'B7' en indices (rangée, colonne) du plan de salle"""
+    return ord(seat[0]) - 65, int(seat[1:]) - 1
+
+
+def book_seats(user_id: str, representation_id: str, seats: List[str]) -> Reservation:
+    """Réserve des places pour une représentation en une seule transaction.
+
+    Vérifie et marque les places sur le plan de salle, enregistre la réservation et
+    incrémente le nombre de réservations de l'utilisateur (une seule écriture).
+    Lève SeatsUnavailableError (attribut `seats`) sans rien modifier si des places
+    sont déjà prises, ValueError si la représentation, l'utilisateur ou une place est invalide.
+    """
+    seats = list(dict.fromkeys(seat.strip().upper() for seat in seats))
+    if not seats:
+        raise ValueError("Aucune place sélectionnée")
+    
+    with transaction() as db:
+        rep = db.get('representations', representation_id)
+        if rep is None:
+            raise ValueError("Représentation non trouvée")
+        user = db.get('utilisateurs', user_id)
+        if user is None:
+            raise ValueError("Utilisateur non trouvé")
+        entry = _seat_map_record(db, representation_id)
+        seating_map = SeatMap.from_value(entry.get('seating_map')) if entry else None
+        if not seating_map:
+            raise ValueError("Plan de salle non disponible")
+        
+        # Compare-and-set : toutes les places doivent être libres sur le plan actuel
+        taken = []
+        for seat in seats:
+            try:
+                row_idx, col_idx = _seat_position(seat)
+            except (IndexError, ValueError):
+                raise ValueError(f"Place invalide: {seat}")
+            if not (0 <= row_idx < seating_map.rows and 0 <= col_idx < seating_map.cols):
+                raise ValueError(f"Place invalide: {seat}")
+            if seating_map.is_taken(row_idx, col_idx):
+                taken.append(seat)
+            else:
+                seating_map.set_taken(row_idx, col_idx)
+        if taken:
+            raise SeatsUnavailableError(taken)
+        
+        reservation = Reservation(
+            utilisateur_id=user_id,
+            salle_id=entry['salle_id'],
+            film_id=rep['film_id'],
+            representation_id=representation_id,
+            horaire=rep['horaire'],
+            places=seats
+        )
+        _write_seat_map(db, representation_id, entry['salle_id'], seating_map)
+        db.insert('reservations', reservation.to_dict())
+        db.update('utilisateurs', user_id, dict(user, nombre_resa=user.get('nombre_resa', 0) + 1))
+        _rank_user(db, user_id, user.get('nombre_resa', 0) + 1)
+        _bump_stats(db, reservation.to_dict(), 1)
+    return reservation
+
+
+def cancel_reservation(reservation_id: str) -> bool:
+    """Annule une réservation en une seule transaction.
+
+    Libère ses places sur le plan de salle, la supprime, décrémente le nombre de
+    réservations de l'utilisateur et met à jour les compteurs de statistiques.
+    Retourne False si la réservation n'existe plus.
+    """
+    with transaction() as db:
+        res = db.get('reservations', reservation_id)
+        if res is None:
+            return False
+        
+        representation_id = res.get('representation_id')
+        if not representation_id:
+            # Anciennes réservations sans representation_id : retrouver la représentation par film et horaire
+            representation_id = next((r['id'] for r in db.find('representations', 'film_id', res.get('film_id', ''))
+                                      if r.get('horaire') == res.get('horaire')), '')
+        entry = _seat_map_record(db, representation_id) if representation_id else None
+        if entry is not None and entry.get('seating_map'):
+            seating_map = SeatMap.from_value(entry['seating_map'])
+            for seat in res.get('places', []):
+                try:
+                    row_idx, col_idx = _seat_position(seat)
+                except (IndexError, ValueError):
+                    continue
+                if 0 <= row_idx < seating_map.rows and 0 <= col_idx < seating_map.cols:
+                    seating_map.set_taken(row_idx, col_idx, False)
+            _write_seat_map(db, representation_id, entry['salle_id'], seating_map)
+        
+        db.delete('reservations', reservation_id)
+        user = db.get('utilisateurs', res.get('utilisateur_id', ''))
+        if user is not None:
+            nombre_resa = max(0, user.get('nombre_resa', 0) - 1)
+            db.update('utilisateurs', user['id'], dict(user, nombre_resa=nombre_resa))
+            _rank_user(db, user['id'], nombre_resa)
+        _bump_stats(db, res, -1)
+    return True
 
 
 def get_user_reservations(user_id: str) -> List[Reservation]:
     """Retourne toutes les réservations d'un utilisateur"""
-    db = load_db()
-    reservations = []
-    for res_dict in db.get('reservations', []):
-        if res_dict.get('utilisateur_id') == user_id:
-            reservations.append(Reservation.from_dict(res_dict))
-    return reservations
\ No newline at end of file
+    return [Reservation.from_dict(d) for d in get_database().find('reservations', 'utilisateur_id', user_id)]
+
+
+def get_representation_reservations(representation_id: str) -> List[Reservation]:
+    """Retourne toutes les réservations d'une représentation"""
+    return [Reservation.from_dict(d) for d in get_database().find('reservations', 'representation_id', representation_id)]
+
+
+def get_film_reservations(film_id: str) -> List[Reservation]:
+    """Retourne toutes les réservations d'un film"""
+    return [Reservation.from_dict(d) for d in get_database().find('reservations', 'film_id', film_id)]
+
+
+def delete_salle(salle_id: str) -> None:
+    """Supprime une salle et ses plans de salle ; ses représentations restent, sans salle assignée"""
+    with transaction() as db:
+        salle = db.get('salle_info', salle_id)
+        if salle is None:
+            return
+        # Sans la salle, le prix des places n'est plus connu : les réservations restent comptées, sans revenu
+        reservations = db.find('reservations', 'salle_id', salle_id)
+        for res_dict in reservations:
+            _bump_stats(db, res_dict, -1)
+        for record in db.find(SEAT_MAPS_COLLECTION, 'salle_id', salle_id):
+            db.delete(SEAT_MAPS_COLLECTION, record['representation_id'])
+            db.delete(AVAILABILITY_COLLECTION, record['representation_id'])
+        # Ancienne collection salles (base non migrée)
+        for entry in db.find('salles', 'salle_id', salle_id):
+            db.delete('salles', record_key('salles', entry))
+        db.delete('salle_info', salle_id)
+        _count_change(db, 'salle_info', salle, None)
+        for res_dict in reservations:
+            _bump_stats(db, res_dict, 1)
+
+
+def delete_film(film_id: str) -> None:
+    """Supprime un film et ses représentations (avec leurs réservations, plans de salle et assignations)"""
+    with transaction() as db:
+        for rep_dict in db.find('representations', 'film_id', film_id):
+            delete_representation(rep_dict['id'])
+        # Réservations restantes (représentation déjà supprimée)
+        for res_dict in db.find('reservations', 'film_id', film_id):
+            db.delete('reservations', res_dict['id'])
+            _bump_stats(db, res_dict, -1)
+        film = db.get('films', film_id)
+        db.delete('films', film_id)
+        if film is not None:
+            _count_change(db, 'films', film, None)
+
+
+def delete_representation(representation_id: str) -> None:
+    """Supprime une représentation, ses réservations et ses plans de salle"""
+    with transaction() as db:
+        # Supprimer les réservations associées
+        for res_dict in db.find('reservations', 'representation_id', representation_id):
+            db.delete('reservations', res_dict['id'])
+            _bump_stats(db, res_dict, -1)
+    
+        # Retirer la représentation des salles et des entrées de seating
+        for salle_dict in db.find('salle_info', 'id_representations', representation_id):
+            ids = [rid for rid in salle_dict.get('id_representations', []) if rid != representation_id]
+            db.update('salle_info', salle_dict['id'], dict(salle_dict, id_representations=ids))
+    
+        db.delete(SEAT_MAPS_COLLECTION, representation_id)
+        # Ancienne collection salles (base non migrée)
+        for entry in db.find('salles', 'representation_id', representation_id):
+            rep_ids = [rid for rid in entry.get('representation_id', []) if rid != representation_id]
+            key = record_key('salles', entry)
+            if rep_ids:
+                db.update('salles', key, dict(entry, representation_id=rep_ids))
+            else:
+                # sinon, on supprime entièrement l'entrée
+                db.delete('salles', key)
+        db.delete(AVAILABILITY_COLLECTION, representation_id)
+    
+        rep = db.get('representations', representation_id)
+        db.delete('representations', representation_id)
+        if rep is not None:
+            _count_change(db, 'representations', rep, None)
\ No newline at end of file
@@ -0,0 +1,21 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Les modules du projet (storage, python.*) s'importent depuis la racine du dépôt
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import storage  # noqa: E402
+
+
+@pytest.fixture(params=['json', 'sqlite'])
+def base(request, tmp_path, monkeypatch):
+    """storage branché sur une base vide dans un dossier temporaire, pour chaque backend"""
+    monkeypatch.setattr(storage, 'BACKEND', request.param)
+    monkeypatch.setattr(storage, 'DB_PATH', tmp_path / 'db.json')
+    monkeypatch.setattr(storage, 'SQLITE_PATH', tmp_path / 'db.sqlite3')
+    monkeypatch.setattr(storage, 'SESSION_PATH', None)
+    monkeypatch.setattr(storage, '_database', None)
+    monkeypatch.setattr(storage, '_schedules_version', None)
+    return storage
@@ -0,0 +1,108 @@
+import gzip
+import io
+import json
+
+import pytest
+
+from python import archive
+from python.models import Film, Representation, Salle_info, Utilisateur
+from python.stats import compute_statistics, rebuild_stats
+
+
+def remplir(base, email):
+    """Un client, un film, une salle et une représentation réservée"""
+    user = Utilisateur(nom='Martin', prenom='Léa', date_naissance='2000-01-01', email=email)
+    film = Film(titre='Dune', duree=150, categorie='SF', age_min=0, horaires=['20:00'])
+    salle = Salle_info(numero=1, nombre_rangees_total=2, nombre_rangees_vip=1, nombre_colonnes=3)
+    rep = Representation(film_id=film.id, horaire='20:00', horaire_fin='22:30')
+    base.add_utilisateur(user)
+    base.add_film(film)
+    base.add_salle(salle)
+    base.add_representation(rep)
+    assert base.assign_representation_to_room(rep.id, salle.id)[0]
+    compute_statistics()
+    base.book_seats(user.id, rep.id, ['A1', 'B2'])
+    base.rebuild_availability()
+
+
+def exporter():
+    stream = io.StringIO()
+    archive.export_ndjson(stream)
+    return stream.getvalue()
+
+
+def contenu(base):
+    db = base.get_database()
+    return {collection: sorted(db.all(collection), key=lambda r: json.dumps(r, sort_keys=True))
+            for collection in db.collections() if db.all(collection)}
+
+
+def test_aller_retour(base, tmp_path):
+    remplir(base, 'lea@example.com')
+    avant = contenu(base)
+    chemin = tmp_path / 'sauvegarde.ndjson.gz'
+    with archive.open_archive(str(chemin), 'w') as f:
+        counts = archive.export_ndjson(f)
+    assert counts['reservations'] == 1
+    assert gzip.open(chemin, 'rt', encoding='utf-8').readline().startswith('{"collection":')
+
+    with archive.open_archive(str(chemin), 'r') as f:
+        archive.import_ndjson(f, replace=True, batch_size=2)
+    assert contenu(base) == avant
+    assert rebuild_stats(fix=False) == []
+
+
+def test_import_par_collection_et_validation_seule(base):
+    remplir(base, 'lea@example.com')
+    lignes = [line for _, line in archive.export_lines(['films'])]
+    assert len(lignes) == 1 and json.loads(lignes[0])['collection'] == 'films'
+    avant = contenu(base)
+    counts = archive.import_ndjson(io.StringIO(exporter()), replace=True, dry_run=True)
+    assert counts['films'] == 1
+    assert contenu(base) == avant
+
+
+@pytest.mark.parametrize('ligne, message', [
+    ('pas du json', 'JSON invalide'),
+    ('[1, 2]', 'attendu'),
+    ('{"collection": "films", "record": {"titre": "x"}}', 'sans identifiant'),
+    ('{"collection": "films", "record": {"id": "f", "duree": "long"}}', 'duree'),
+])
+def test_lignes_invalides(base, ligne, message):
+    with pytest.raises(ValueError, match=message):
+        archive.import_ndjson(io.StringIO(ligne + '\n'), dry_run=True)
+
+
+def test_import_fusionne_recalcule_les_compteurs(base):
+    """Régression : l'import copiait les compteurs de l'archive par-dessus ceux de la base"""
+    remplir(base, 'lea@example.com')
+    sauvegarde = exporter()
+    base.save_db({collection: [] for collection in base.get_database().collections()})
+    remplir(base, 'paul@example.com')
+
+    counts = archive.import_ndjson(io.StringIO(sauvegarde))
+
+    assert base.STATS_COLLECTION not in counts and base.AVAILABILITY_COLLECTION not in counts
+    assert rebuild_stats(fix=False) == []
+    stats = compute_statistics()
+    assert (stats.nb_utilisateurs, stats.nb_films, stats.nb_reservations) == (2, 2, 2)
+    assert [item.places for item in stats.top_utilisateurs] == [1, 1]
+    db = base.get_database()
+    assert {r['id'] for r in db.all(base.AVAILABILITY_COLLECTION)} == {r['id'] for r in db.all('representations')}
+
+
+def test_replace_garde_la_base_si_le_premier_lot_echoue(base, monkeypatch):
+    remplir(base, 'lea@example.com')
+    sauvegarde = exporter()
+    avant = contenu(base)
+    db = base.get_database()
+
+    def echec(collection, record):
+        raise OSError("disque plein")
+
+    with monkeypatch.context() as m:
+        m.setattr(db, 'insert', echec)
+        with pytest.raises(OSError):
+            archive.import_ndjson(io.StringIO(sauvegarde), replace=True)
+    base._database = None  # relue depuis le disque
+    assert contenu(base) == avant
@@ -0,0 +1,95 @@
+import pytest
+
+from python.intervals import DAY, IntervalIndex, format_horaire, interval, parse_horaire
+from python.models import Representation, Salle_info
+
+
+def test_conversion_des_horaires():
+    assert parse_horaire('00:00') == 0
+    assert parse_horaire(' 23:59 ') == DAY - 1
+    assert format_horaire(DAY + 75) == '01:15'
+    for invalide in ('24:00', '12:60', '1230', '', None):
+        with pytest.raises(ValueError):
+            parse_horaire(invalide)
+
+
+def test_seance_apres_minuit():
+    assert interval('20:00', '22:00') == (1200, 1320)
+    assert interval('23:00', '01:00') == (1380, DAY + 60)
+
+
+def test_intervalles_semi_ouverts():
+    index = IntervalIndex([(600, 720, 'a')])
+    assert index.is_free(720, 800)
+    assert index.is_free(480, 600)
+    assert not index.is_free(719, 800)
+    assert index.overlaps(650, 660) == ['a']
+
+
+def test_tampon_de_nettoyage():
+    index = IntervalIndex([(840, 960, 'a')])  # 14:00 - 16:00
+    assert not index.is_free(960, 1080, buffer=15)
+    assert not index.is_free(974, 1080, buffer=15)
+    assert index.is_free(975, 1080, buffer=15)
+    assert index.is_free(705, 825, buffer=15)
+    assert not index.is_free(706, 826, buffer=15)
+
+
+def test_conflits_autour_de_minuit():
+    index = IntervalIndex([(1380, DAY + 60, 'nuit')])  # 23:00 - 01:00
+    # Le lendemain matin : la séance de la veille déborde jusqu'à 01:00
+    assert index.overlaps(0, 90) == ['nuit']
+    assert not index.is_free(60, 120, buffer=15)
+    assert index.is_free(75, 120, buffer=15)
+    # Une séance de fin de soirée qui se termine après minuit gêne celle de 23:00 à rebours
+    index = IntervalIndex([(30, 150, 'matin')])  # 00:30 - 02:30
+    assert index.overlaps(1380, DAY + 20, buffer=15) == ['matin']
+    assert index.is_free(1380, DAY + 15, buffer=15)
+
+
+def test_ajout_retrait_et_exclusion():
+    index = IntervalIndex([(600, 700, 'a'), (800, 900, 'b')])
+    index.add(650, 820, 'c')
+    assert sorted(index.overlaps(690, 810)) == ['a', 'b', 'c']
+    assert index.overlaps(660, 670, exclude='c') == ['a']
+    assert index.remove('c') and not index.remove('c')
+    assert index.is_free(705, 795)
+    assert len(index) == 2
+    with pytest.raises(ValueError):
+        index.add(100, 100, 'vide')
+
+
+def test_longue_seance_qui_recouvre_les_suivantes():
+    index = IntervalIndex([(0, 1000, 'long')] + [(10 * i, 10 * i + 5, i) for i in range(1, 99)])
+    assert index.overlaps(606, 609) == ['long']
+    assert sorted(index.overlaps(600, 612), key=str) == [60, 61, 'long']
+
+
+def test_creneaux_libres_avec_tampon_et_minuit():
+    index = IntervalIndex([(1380, DAY + 60, 'nuit'), (840, 960, 'a')])
+    # 01:00 + 15 min -> 13:45 ; 16:15 -> 22:45 (23:00 - 15 min)
+    assert index.free_slots(120, buffer=15) == [(75, 825), (975, 1365)]
+    # Aucune fenêtre assez longue
+    assert index.free_slots(600, buffer=15) == [(75, 825)]
+    assert IntervalIndex().free_slots(90) == [(0, DAY)]
+
+
+def test_planning_d_une_salle(base):
+    salle = Salle_info(numero=1, nombre_rangees_total=2, nombre_rangees_vip=0, nombre_colonnes=3)
+    base.add_salle(salle)
+    seances = {
+        'soir': ('22:00', '23:50'),
+        'trop_tot': ('00:00', '02:00'),  # 10 min après la fin de 'soir'
+        'apres_nettoyage': ('00:05', '02:00'),
+    }
+    for rep_id, (debut, fin) in seances.items():
+        base.add_representation(Representation(film_id='f', horaire=debut, horaire_fin=fin, id=rep_id))
+
+    assert base.assign_representation_to_room('soir', salle.id) == (True, "Assignation réussie")
+    succes, message = base.assign_representation_to_room('trop_tot', salle.id)
+    assert not succes and 'soir' in message
+    assert base.assign_representation_to_room('apres_nettoyage', salle.id)[0]
+    # Réassigner une séance à sa propre salle n'est pas un conflit avec elle-même
+    assert base.assign_representation_to_room('soir', salle.id)[0]
+    assert base.find_free_slots(salle.id, 120) == [('02:15', '21:45')]
+    assert base.get_salle(salle.id).id_representations == ['soir', 'apres_nettoyage']
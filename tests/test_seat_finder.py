@@ -0,0 +1,89 @@
+import random
+
+import pytest
+
+from python.models import SeatMap
+from python.seat_finder import VIP_PENALTY, SeatFinder, find_best_seats
+
+
+def plan(lignes):
+    return SeatMap.from_rows([list(ligne) for ligne in lignes])
+
+
+def test_salle_vide_bloc_au_centre():
+    block = SeatFinder(SeatMap(9, 12)).best_block(4)
+    assert (block.row, block.start, block.size) == (4, 4, 4)
+    assert block.seats == ['E5', 'E6', 'E7', 'E8']
+    assert block.positions == [(4, 4), (4, 5), (4, 6), (4, 7)]
+
+
+def test_groupe_trop_grand_ou_taille_invalide():
+    finder = SeatFinder(plan(['ooxoo', 'xooox']))
+    assert finder.best_block(4) is None
+    assert finder.best_block(3).row == 1
+    with pytest.raises(ValueError):
+        finder.best_block(0)
+    assert SeatFinder(SeatMap()).best_block(1) is None
+
+
+def test_evite_de_laisser_une_place_isolee():
+    # Suite libre de 5 places : un bloc de 3 centré laisserait une place isolée de chaque côté
+    block = SeatFinder(plan(['xooooox'])).best_block(3)
+    assert block.start in (1, 3)
+
+
+def test_preference_vip():
+    seats = SeatMap(6, 8)
+    finder = SeatFinder(seats, nombre_rangees_vip=2)
+    assert finder.best_block(2, prefer_vip=True).row == 1
+    assert finder.best_block(2, prefer_vip=True).vip
+    assert not finder.best_block(2, prefer_vip=False).vip
+    # Sans rangée VIP libre, le bloc est pris ailleurs, avec la pénalité
+    for row in range(2):
+        for col in range(8):
+            seats.set_taken(row, col)
+    block = SeatFinder(seats, nombre_rangees_vip=2).best_block(2, prefer_vip=True)
+    assert not block.vip and block.score >= VIP_PENALTY
+
+
+def test_take_met_a_jour_les_suites():
+    finder = SeatFinder(plan(['oooooo']))
+    finder.take(0, 2)
+    assert finder.best_block(4) is None
+    assert finder.best_block(3).start == 3
+
+
+def test_find_best_seats_ancien_format():
+    assert find_best_seats([['x', 'o', 'o'], ['o', 'o', 'x']], 0, 2) in (['A2', 'A3'], ['B1', 'B2'])
+    assert find_best_seats([['x', 'x']], 0, 1) is None
+
+
+@pytest.mark.parametrize('graine', range(20))
+def test_meme_score_qu_une_recherche_exhaustive(graine):
+    rng = random.Random(graine)
+    rows, cols = rng.randint(1, 12), rng.randint(1, 20)
+    seats = SeatMap(rows, cols)
+    for row in range(rows):
+        for col in range(cols):
+            if rng.random() < 0.4:
+                seats.set_taken(row, col)
+    vip = rng.randint(0, rows)
+    finder = SeatFinder(seats, vip)
+    positions = dict((row, score) for score, row in finder._row_order)
+    for size in (1, 2, 4, 7):
+        for prefer_vip in (None, True, False):
+            attendu = None
+            for row in range(rows):
+                row_score = positions[row]
+                if prefer_vip is not None and (row < vip) != prefer_vip:
+                    row_score += VIP_PENALTY
+                for run in finder._runs[row]:
+                    for start in range(run[0], run[0] + run[1] - size + 1):
+                        score = finder._score(row_score, start, size, run)
+                        attendu = score if attendu is None else min(attendu, score)
+            block = finder.best_block(size, prefer_vip)
+            if attendu is None:
+                assert block is None
+            else:
+                assert block.score == pytest.approx(attendu)
+                assert all(not seats.is_taken(r, c) for r, c in block.positions)
@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from python.models import Representation, SeatMap
+
+
+def test_plan_vide_par_defaut():
+    plan = SeatMap()
+    assert (plan.rows, plan.cols, len(plan)) == (0, 0, 0)
+    assert plan.available_count() == 0
+    assert SeatMap.from_value(None) == SeatMap()
+
+
+def test_acces_et_modification_des_places():
+    plan = SeatMap(3, 10)
+    plan.set_taken(0, 0)
+    plan.set_taken(2, 9)
+    plan[1][8] = 'x'
+    assert plan.is_taken(0, 0) and plan.is_taken(2, 9) and plan.is_taken(1, 8)
+    assert plan[1][8] == 'x' and plan[1][7] == 'o'
+    plan.set_taken(2, 9, False)
+    assert not plan.is_taken(2, 9)
+    assert plan.taken_count() == 2
+    assert plan.available_count() == 28
+    assert [plan.row_taken_count(r) for r in range(3)] == [1, 1, 0]
+
+
+@pytest.mark.parametrize('cols', [1, 7, 8, 9, 16, 17])
+def test_serialisation_aller_retour(cols):
+    """Rangées qui finissent au milieu ou à la limite d'un octet"""
+    plan = SeatMap(4, cols)
+    for r in range(4):
+        plan.set_taken(r, (r * 3) % cols)
+    plan.set_taken(3, cols - 1)
+    data = json.loads(json.dumps(plan.to_dict()))
+    assert set(data) == {'rows', 'cols', 'bits'}
+    copie = SeatMap.from_value(data)
+    assert copie == plan
+    assert copie.to_rows() == plan.to_rows()
+
+
+def test_bits_de_taille_incoherente():
+    data = SeatMap(2, 9).to_dict()
+    data['rows'] = 3
+    with pytest.raises(ValueError):
+        SeatMap.from_value(data)
+
+
+def test_lecture_de_l_ancien_format():
+    lignes = [['o', 'x', 'o'], ['x', 'x', 'o']]
+    plan = SeatMap.from_value(lignes)
+    assert (plan.rows, plan.cols) == (2, 3)
+    assert plan == lignes
+    assert plan.to_rows() == lignes
+    assert plan.available_count() == 3
+
+
+def test_ancien_format_rangees_incompletes():
+    """Les cases manquantes d'une rangée courte ne deviennent pas des places libres"""
+    plan = SeatMap.from_rows([['o', 'o', 'o'], ['o']])
+    assert plan.cols == 3
+    assert plan[1].count('o') == 1
+    assert plan.is_taken(1, 1) and plan.is_taken(1, 2)
+
+
+def test_etat_invalide():
+    with pytest.raises(ValueError):
+        SeatMap.parse_state('?')
+
+
+def test_suites_de_places_libres():
+    plan = SeatMap(1, 12)
+    for col in (0, 4, 5, 11):
+        plan.set_taken(0, col)
+    assert plan.free_runs(0) == [(1, 3), (6, 5)]
+    assert SeatMap(1, 9).free_runs(0) == [(0, 9)]
+
+
+def test_copie_independante():
+    plan = SeatMap(2, 2)
+    copie = plan.copy()
+    copie.set_taken(0, 0)
+    assert not plan.is_taken(0, 0)
+    assert SeatMap.from_value(plan) is not plan
+
+
+def test_representation_serialise_son_plan():
+    rep = Representation(film_id='f', horaire='20:00', horaire_fin='22:00', seating_map=SeatMap(2, 5))
+    rep.seating_map.set_taken(1, 4)
+    copie = Representation.from_dict(json.loads(json.dumps(rep.to_dict())))
+    assert copie.seating_map == rep.seating_map
+    assert copie.get_available_seats_count() == 9
@@ -0,0 +1,107 @@
+import pytest
+
+from python.models import Film, Representation, Salle_info, SeatMap, Utilisateur
+from python.stats import compute_statistics, rebuild_stats
+
+
+@pytest.fixture
+def cinema(base):
+    """Un film, une salle de 3x4 (une rangée VIP), deux représentations assignées et un client"""
+    film = Film(titre='Dune', duree=150, categorie='SF', age_min=0, horaires=['14:00', '18:00'])
+    salle = Salle_info(numero=1, nombre_rangees_total=3, nombre_rangees_vip=1, nombre_colonnes=4)
+    user = Utilisateur(nom='Martin', prenom='Léa', date_naissance='2000-01-01', email='lea@example.com')
+    base.add_film(film)
+    base.add_salle(salle)
+    base.add_utilisateur(user)
+    reps = [Representation(film_id=film.id, horaire=h, horaire_fin=f, id=f"r{i}")
+            for i, (h, f) in enumerate([('14:00', '16:30'), ('18:00', '20:30')])]
+    for rep in reps:
+        base.add_representation(rep)
+        assert base.assign_representation_to_room(rep.id, salle.id)[0]
+    compute_statistics()  # construit les compteurs
+    return film, salle, reps, user
+
+
+def test_migration_de_l_ancienne_collection_salles(base):
+    salle = Salle_info(numero=2, nombre_rangees_total=2, nombre_rangees_vip=0, nombre_colonnes=3)
+    base.add_salle(salle)
+    db = base.get_database()
+    # Ancien format : une entrée partagée par deux représentations, plan en liste de listes
+    db.insert('salles', {'salle_id': salle.id, 'representation_id': ['a', 'b'],
+                         'seating_map': [['o', 'x', 'o'], ['o', 'o', 'o']]})
+
+    # Avant migration, le plan est lu dans l'ancienne collection
+    assert base.get_salle_seating(salle.id, 'b').seating_map == [['o', 'x', 'o'], ['o', 'o', 'o']]
+
+    assert base.migrate_seat_maps() == 2
+    assert db.all('salles') == []
+    plans = {p['representation_id']: p for p in db.all(base.SEAT_MAPS_COLLECTION)}
+    assert set(plans) == {'a', 'b'}
+    assert all(p['salle_id'] == salle.id for p in plans.values())
+
+    # Chaque représentation a sa propre copie du plan
+    plan_a = base.get_seat_map('a').seating_map
+    plan_a.set_taken(1, 1)
+    base.update_salle_seating(salle.id, 'a', plan_a)
+    assert base.get_seat_map('a').seating_map.taken_count() == 2
+    assert base.get_seat_map('b').seating_map.taken_count() == 1
+
+    assert base.migrate_seat_maps() == 0
+
+
+def test_migration_ne_remplace_pas_un_plan_existant(base):
+    db = base.get_database()
+    base.update_salle_seating('s', 'a', SeatMap(1, 2))
+    db.insert('salles', {'salle_id': 's', 'representation_id': ['a'], 'seating_map': [['x', 'x']]})
+    assert base.migrate_seat_maps() == 0
+    assert base.get_seat_map('a').seating_map.taken_count() == 0
+    assert db.all('salles') == []
+
+
+def test_une_reservation_n_ecrit_que_le_plan_de_sa_representation(cinema, base):
+    film, salle, (rep1, rep2), user = cinema
+    reservation = base.book_seats(user.id, rep1.id, ['A1', 'B2'])
+    assert reservation.salle_id == salle.id
+    assert base.get_seat_map(rep1.id).seating_map.taken_count() == 2
+    assert base.get_seat_map(rep2.id).seating_map.taken_count() == 0
+    assert base.get_availability(rep1.id) == {'id': rep1.id, 'salle_id': salle.id,
+                                              'libres_normales': 7, 'libres_vip': 3}
+    with pytest.raises(base.SeatsUnavailableError):
+        base.book_seats(user.id, rep1.id, ['B2'])
+
+
+def test_suppression_d_un_film(cinema, base):
+    film, salle, reps, user = cinema
+    for rep in reps:
+        base.book_seats(user.id, rep.id, ['C1'])
+    base.delete_film(film.id)
+
+    db = base.get_database()
+    assert base.get_film(film.id) is None
+    assert db.all('representations') == []
+    assert db.all('reservations') == []
+    assert db.all(base.SEAT_MAPS_COLLECTION) == []
+    assert db.all(base.AVAILABILITY_COLLECTION) == []
+    assert base.get_salle(salle.id).id_representations == []
+    assert rebuild_stats(fix=False) == []
+
+
+def test_suppression_d_une_salle(cinema, base):
+    film, salle, (rep1, rep2), user = cinema
+    base.book_seats(user.id, rep1.id, ['A1', 'C1'])
+    db = base.get_database()
+    db.insert('salles', {'salle_id': salle.id, 'representation_id': ['ancienne'], 'seating_map': [['o']]})
+
+    base.delete_salle(salle.id)
+
+    assert base.get_salle(salle.id) is None
+    assert db.find(base.SEAT_MAPS_COLLECTION, 'salle_id', salle.id) == []
+    assert db.find('salles', 'salle_id', salle.id) == []
+    assert base.get_availability(rep1.id) is None
+    # Les représentations restent, sans salle ; la réservation reste comptée, sans revenu
+    assert len(db.all('representations')) == 2
+    assert rebuild_stats(fix=False) == []
+    stats = compute_statistics()
+    assert (stats.nb_salles, stats.capacite_totale) == (0, 0)
+    assert (stats.nb_reservations, stats.places_reservees, stats.revenus_totaux) == (1, 2, 0.0)
+    base.delete_salle(salle.id)  # salle déjà supprimée : sans effet